@@ -0,0 +1,34 @@
+"""add hot query indexes
+
+Revision ID: 3f9c2a7d41b8
+Revises: eba8bf8809b6
+Create Date: 2026-10-18 09:12:44.310562
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2a7d41b8'
+down_revision: Union[str, Sequence[str], None] = 'eba8bf8809b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_bookings_service_id_start_time_end_time', 'bookings', ['service_id', 'start_time', 'end_time'], unique=False)
+    op.create_index('ix_bookings_user_id_start_time', 'bookings', ['user_id', 'start_time'], unique=False)
+    op.create_index('ix_bookings_status_start_time', 'bookings', ['status', 'start_time'], unique=False)
+    op.create_index(op.f('ix_reviews_booking_id'), 'reviews', ['booking_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_reviews_booking_id'), table_name='reviews')
+    op.drop_index('ix_bookings_status_start_time', table_name='bookings')
+    op.drop_index('ix_bookings_user_id_start_time', table_name='bookings')
+    op.drop_index('ix_bookings_service_id_start_time_end_time', table_name='bookings')
@@ -0,0 +1,45 @@
+"""add service full text search
+
+Revision ID: 5b7e19c3d2a6
+Revises: 8d51e0c6a2f4
+Create Date: 2026-10-18 14:12:09.318452
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b7e19c3d2a6'
+down_revision: Union[str, Sequence[str], None] = '8d51e0c6a2f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute(
+            "ALTER TABLE services ADD COLUMN search_vector tsvector GENERATED ALWAYS AS "
+            "(to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, ''))) STORED"
+        )
+        op.create_index('ix_services_search_vector', 'services', ['search_vector'], unique=False, postgresql_using='gin')
+    elif dialect == 'sqlite':
+        op.execute("CREATE VIRTUAL TABLE IF NOT EXISTS services_fts USING fts5(title, description)")
+        op.execute(
+            "INSERT INTO services_fts (rowid, title, description) "
+            "SELECT id, coalesce(title, ''), coalesce(description, '') FROM services"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.drop_index('ix_services_search_vector', table_name='services', postgresql_using='gin')
+        op.drop_column('services', 'search_vector')
+    elif dialect == 'sqlite':
+        op.execute("DROP TABLE IF EXISTS services_fts")
@@ -0,0 +1,32 @@
+"""add keyset pagination indexes
+
+Revision ID: 8d51e0c6a2f4
+Revises: 3f9c2a7d41b8
+Create Date: 2026-10-18 11:03:27.845190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d51e0c6a2f4'
+down_revision: Union[str, Sequence[str], None] = '3f9c2a7d41b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'], unique=False)
+    op.create_index('ix_services_created_at_id', 'services', ['created_at', 'id'], unique=False)
+    op.create_index('ix_bookings_start_time_id', 'bookings', ['start_time', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_bookings_start_time_id', table_name='bookings')
+    op.drop_index('ix_services_created_at_id', table_name='services')
+    op.drop_index('ix_users_created_at_id', table_name='users')
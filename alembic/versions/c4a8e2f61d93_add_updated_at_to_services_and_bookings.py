@@ -0,0 +1,32 @@
+"""add updated_at to services and bookings
+
+Revision ID: c4a8e2f61d93
+Revises: 5b7e19c3d2a6
+Create Date: 2026-10-18 15:40:52.604117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a8e2f61d93'
+down_revision: Union[str, Sequence[str], None] = '5b7e19c3d2a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('services', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.add_column('bookings', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE services SET updated_at = created_at")
+    op.execute("UPDATE bookings SET updated_at = created_at")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('bookings', 'updated_at')
+    op.drop_column('services', 'updated_at')
@@ -0,0 +1,42 @@
+"""add service rating aggregates
+
+Revision ID: e27b5f0a9c14
+Revises: c4a8e2f61d93
+Create Date: 2026-10-18 16:58:31.270915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e27b5f0a9c14'
+down_revision: Union[str, Sequence[str], None] = 'c4a8e2f61d93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('services', sa.Column('rating_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('services', sa.Column('rating_sum', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('services', sa.Column('rating_score', sa.Float(), server_default='0', nullable=False))
+    op.execute(
+        "UPDATE services SET "
+        "rating_count = (SELECT count(reviews.rating) FROM reviews JOIN bookings ON bookings.id = reviews.booking_id "
+        "WHERE bookings.service_id = services.id), "
+        "rating_sum = (SELECT coalesce(sum(reviews.rating), 0) FROM reviews JOIN bookings ON bookings.id = reviews.booking_id "
+        "WHERE bookings.service_id = services.id)"
+    )
+    op.execute("UPDATE services SET rating_score = CAST(rating_sum AS FLOAT) / rating_count WHERE rating_count > 0")
+    op.create_index('ix_services_rating_score_rating_count_id', 'services', ['rating_score', 'rating_count', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_services_rating_score_rating_count_id', table_name='services')
+    op.drop_column('services', 'rating_score')
+    op.drop_column('services', 'rating_sum')
+    op.drop_column('services', 'rating_count')
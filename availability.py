@@ -0,0 +1,192 @@
+import math
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from time import monotonic
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from booking_index import BookingChange, booking_index
+from models.booking import Booking, BookingStatus
+from settings import settings
+from timeutil import to_naive_utc
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def _minute_mask(start: int, end: int) -> int:
+    """Bits ``start`` (inclusive) to ``end`` (exclusive) set."""
+    if end <= start:
+        return 0
+    return ((1 << (end - start)) - 1) << start
+
+
+def _day_bits(day: date, start_time: datetime, end_time: datetime) -> int:
+    """Minutes of ``day`` covered by the interval, one bit per minute."""
+    midnight = datetime.combine(day, time())
+    start = (start_time - midnight) / timedelta(minutes=1)
+    end = (end_time - midnight) / timedelta(minutes=1)
+    # Any booking touching part of a minute blocks the whole minute.
+    return _minute_mask(max(0, math.floor(start)), min(MINUTES_PER_DAY, math.ceil(end)))
+
+
+def _days(start_time: datetime, end_time: datetime):
+    day = start_time.date()
+    last = (end_time - timedelta(microseconds=1)).date()
+    while day <= last:
+        yield day
+        day += timedelta(days=1)
+
+
+@lru_cache(maxsize=64)
+def _grid_mask(width: int, granularity: int) -> int:
+    mask = 0
+    for minute in range(0, width, granularity):
+        mask |= 1 << minute
+    return mask
+
+
+def free_starts(occupied: int, window_start: int, window_end: int, duration: int, granularity: int) -> list[int]:
+    """Minute offsets where ``duration`` free minutes fit inside the window.
+
+    Works on the whole window at once: ``runs`` has bit m set when the
+    ``length`` minutes starting at m are all free, and is doubled until it
+    covers ``duration``, so the cost is O(log duration) big-int operations.
+    """
+    free = ~occupied & _minute_mask(window_start, window_end)
+    runs, length = free, 1
+    while length * 2 <= duration:
+        runs &= runs >> length
+        length *= 2
+    if length < duration:
+        runs &= runs >> (duration - length)
+    runs &= _grid_mask(window_end, granularity)
+
+    bits = format(runs, "b")[::-1]
+    return [minute for minute in range(0, len(bits), granularity) if bits[minute] == "1"]
+
+
+class AvailabilityCache:
+    """Per-service, per-day occupancy bitmaps (one bit per minute).
+
+    Booking times are naive UTC as stored (see schemas.booking). Missing
+    days are built with one query per request, new bookings are painted
+    into cached days as they commit, and days a booking moved out of are
+    dropped and rebuilt on the next read. Days expire after ``ttl_seconds``,
+    which bounds staleness when another worker changed the bookings. The
+    query runs outside the lock, and a load that started before a change
+    or invalidation is not stored.
+    """
+
+    def __init__(self, ttl_seconds: float = 60, max_days: int = 50_000):
+        self.ttl_seconds = ttl_seconds
+        self.generation = 0
+        self._days: OrderedDict[tuple[int, date], tuple[float, int]] = OrderedDict()
+        self._max_days = max_days
+        self._lock = threading.Lock()
+
+    def _load(self, db: Session, service_id: int, days: list[date]) -> dict[date, int]:
+        window_start = datetime.combine(days[0], time())
+        window_end = datetime.combine(days[-1], time()) + timedelta(days=1)
+        loaded = dict.fromkeys(days, 0)
+        rows = db.execute(
+            select(Booking.start_time, Booking.end_time).where(
+                Booking.service_id == service_id,
+                Booking.status != BookingStatus.cancelled,
+                Booking.start_time < window_end,
+                Booking.end_time > window_start,
+            )
+        )
+        for start_time, end_time in rows:
+            for day in _days(start_time, end_time):
+                if day in loaded:
+                    loaded[day] |= _day_bits(day, start_time, end_time)
+        return loaded
+
+    def _store(self, key: tuple[int, date], bits: int):
+        self._days[key] = (monotonic() + self.ttl_seconds, bits)
+        self._days.move_to_end(key)
+        while len(self._days) > self._max_days:
+            self._days.popitem(last=False)
+
+    def occupancy(self, db: Session, service_id: int, first_day: date, last_day: date, store: bool = True) -> int:
+        """Occupied minutes from ``first_day`` to ``last_day`` as one bitmap.
+
+        Days loaded without ``store`` (e.g. from a replica) are not cached.
+        """
+        days = [first_day + timedelta(days=i) for i in range((last_day - first_day).days + 1)]
+        bitmaps = {}
+        with self._lock:
+            now = monotonic()
+            for day in days:
+                key = (service_id, day)
+                entry = self._days.get(key)
+                if entry is not None and entry[0] >= now:
+                    self._days.move_to_end(key)
+                    bitmaps[day] = entry[1]
+            generation = self.generation
+        missing = [day for day in days if day not in bitmaps]
+        if missing:
+            loaded = self._load(db, service_id, missing)
+            bitmaps.update(loaded)
+            with self._lock:
+                if store and generation == self.generation:
+                    for day, bits in loaded.items():
+                        self._store((service_id, day), bits)
+        occupied = 0
+        for i, day in enumerate(days):
+            occupied |= bitmaps[day] << (i * MINUTES_PER_DAY)
+        return occupied
+
+    def find_slots(
+        self,
+        db: Session,
+        service_id: int,
+        from_time: datetime,
+        to_time: datetime,
+        duration_minutes: int,
+        granularity: int,
+        store: bool = True,
+    ) -> list[tuple[datetime, datetime]]:
+        from_time, to_time = to_naive_utc(from_time), to_naive_utc(to_time)
+        first_day = from_time.date()
+        last_day = (to_time - timedelta(microseconds=1)).date()
+        midnight = datetime.combine(first_day, time())
+        occupied = self.occupancy(db, service_id, first_day, last_day, store)
+
+        window_start = math.ceil((from_time - midnight) / timedelta(minutes=1))
+        window_end = math.floor((to_time - midnight) / timedelta(minutes=1))
+        duration = timedelta(minutes=duration_minutes)
+        return [
+            (midnight + timedelta(minutes=m), midnight + timedelta(minutes=m) + duration)
+            for m in free_starts(occupied, window_start, window_end, duration_minutes, granularity)
+        ]
+
+    def apply(self, changes: list[BookingChange]):
+        with self._lock:
+            self.generation += 1
+            for change in changes:
+                if change.previous is not None:
+                    for day in _days(*change.previous):
+                        self._days.pop((change.service_id, day), None)
+                if change.active and change.start_time is not None and change.end_time is not None:
+                    for day in _days(change.start_time, change.end_time):
+                        key = (change.service_id, day)
+                        if key in self._days:
+                            expires_at, bits = self._days[key]
+                            self._days[key] = (expires_at, bits | _day_bits(day, change.start_time, change.end_time))
+
+    def invalidate(self, service_id: int | None = None):
+        with self._lock:
+            self.generation += 1
+            if service_id is None:
+                self._days.clear()
+            else:
+                for key in [key for key in self._days if key[0] == service_id]:
+                    del self._days[key]
+
+
+availability_cache = AvailabilityCache(ttl_seconds=settings.AVAILABILITY_CACHE_TTL_SECONDS)
+booking_index.subscribe(availability_cache.apply)
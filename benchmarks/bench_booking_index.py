@@ -0,0 +1,104 @@
+"""Create-path conflict check latency: interval index vs database query.
+
+Every run starts from ``size`` bookings of one service and then books random
+slots across their whole history (half of them taken), so creates land at
+random positions rather than at the end. ``index`` times the interval index
+alone; the create columns time ``routes.booking._create_booking`` (lock,
+conflict check, INSERT, commit) with BOOKING_INDEX_MODE "index" and "db".
+Run from the project root:
+
+    python -m benchmarks.bench_booking_index --sizes 10000 100000 1000000
+"""
+import argparse
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+import models  # noqa: F401 - registers the tables on Base.metadata
+from booking_index import ServiceIntervals, booking_index
+from database import Base
+from models.booking import Booking, BookingStatus
+from routes.booking import _create_booking
+from schemas.booking import BookingCreate
+from settings import settings
+
+SLOT = timedelta(minutes=30)
+BASE = datetime(2020, 1, 1)
+
+
+def _slots(size: int, probes: int, seed: int) -> list[int]:
+    """Random slots over the history; the even ones are already booked."""
+    rng = random.Random(seed)
+    return [rng.randrange(2 * size) for _ in range(probes)]
+
+
+def bench_index(size: int, probes: int) -> float:
+    intervals = ServiceIntervals.from_bookings((i, BASE + 2 * i * SLOT, BASE + (2 * i + 1) * SLOT) for i in range(size))
+    started = time.perf_counter()
+    for i, slot in enumerate(_slots(size, probes, seed=size)):
+        start = BASE + slot * SLOT
+        if not intervals.overlapping(start, start + SLOT):
+            intervals.add(size + i, start, start + SLOT)
+    return (time.perf_counter() - started) / probes
+
+
+def bench_create(size: int, probes: int, mode: str) -> float:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Booking),
+            [
+                {"user_id": 1, "service_id": 1, "start_time": BASE + 2 * i * SLOT,
+                 "end_time": BASE + (2 * i + 1) * SLOT, "status": BookingStatus.confirmed}
+                for i in range(size)
+            ],
+        )
+    settings.BOOKING_INDEX_MODE = mode
+    booking_index.invalidate()
+    db = Session()
+    # Warm the index outside the timing, as a running worker would have it
+    booking_index.overlapping(db, 1, BASE, BASE + SLOT)
+    db.rollback()
+    started = time.perf_counter()
+    for slot in _slots(size, probes, seed=size):
+        start = BASE + slot * SLOT
+        try:
+            _create_booking(db, BookingCreate(user_id=1, service_id=1, start_time=start, end_time=start + SLOT))
+        except HTTPException:
+            pass
+    elapsed = (time.perf_counter() - started) / probes
+    db.close()
+    booking_index.invalidate()
+    engine.dispose()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--probes", type=int, default=200)
+    parser.add_argument("--skip-create", action="store_true")
+    args = parser.parse_args()
+
+    print(f"{'bookings':>10} {'index us/op':>12} {'create us (index)':>18} {'create us (db)':>15}")
+    for size in args.sizes:
+        index_us = bench_index(size, args.probes) * 1e6
+        if args.skip_create:
+            create_index = create_db = "-"
+        else:
+            create_index = f"{bench_create(size, args.probes, 'index') * 1e6:.1f}"
+            create_db = f"{bench_create(size, args.probes, 'db') * 1e6:.1f}"
+        print(f"{size:>10} {index_us:>12.1f} {create_index:>18} {create_db:>15}")
+
+
+if __name__ == "__main__":
+    main()
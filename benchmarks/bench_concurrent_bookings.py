@@ -0,0 +1,113 @@
+"""Concurrent booking stress test: throughput and double bookings.
+
+Every thread tries to book the same slots of a few services in a random
+order, going through the same lock/check/insert/commit steps as
+``POST /bookings``. Run from the project root:
+
+    python -m benchmarks.bench_concurrent_bookings --threads 16 --services 4 --slots 200
+    python -m benchmarks.bench_concurrent_bookings --no-lock   # shows the race
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from booking_index import booking_index
+from crud.crud_booking import booking_service
+from database import Base
+from locks import lock_service
+from models.service import Service
+from schemas.booking import BookingCreate
+
+BASE = datetime(2030, 1, 1)
+SLOT = timedelta(minutes=30)
+
+OVERLAPS_SQL = text(
+    """
+    SELECT COUNT(*) FROM bookings a JOIN bookings b
+      ON a.service_id = b.service_id AND a.id < b.id
+     AND a.start_time < b.end_time AND a.end_time > b.start_time
+    """
+)
+
+
+def book(Session, service_id: int, slot: int, use_lock: bool) -> bool:
+    db = Session()
+    try:
+        start_time = BASE + slot * SLOT
+        if use_lock:
+            lock_service(db, service_id)
+        if booking_service.has_conflict(db, start_time, start_time + SLOT, service_id):
+            return False
+        booking_service.create_booking(
+            db, BookingCreate(user_id=1, service_id=service_id, start_time=start_time, end_time=start_time + SLOT)
+        )
+        db.commit()
+        return True
+    finally:
+        db.close()
+
+
+def run(database_url: str, threads: int, services: int, slots: int, use_lock: bool = True):
+    """Returns ``(created, attempts, seconds, overlaps)``."""
+    engine = create_engine(database_url, connect_args={"check_same_thread": False, "timeout": 30})
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with Session() as db:
+        service_ids = []
+        for i in range(services):
+            service = Service(title=f"Stress {i}", description="", price=1.0, duration_minutes=30)
+            db.add(service)
+            db.flush()
+            service_ids.append(service.id)
+        db.commit()
+    booking_index.invalidate()
+
+    work = [(service_id, slot) for service_id in service_ids for slot in range(slots)]
+    created = []
+
+    def worker(seed: int):
+        items = work[:]
+        random.Random(seed).shuffle(items)
+        created.append(sum(book(Session, service_id, slot, use_lock) for service_id, slot in items))
+
+    pool = [threading.Thread(target=worker, args=(seed,)) for seed in range(threads)]
+    started = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    with engine.connect() as conn:
+        overlaps = conn.execute(OVERLAPS_SQL).scalar()
+    engine.dispose()
+    return sum(created), threads * len(work), elapsed, overlaps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--database-url")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--services", type=int, default=4)
+    parser.add_argument("--slots", type=int, default=200)
+    parser.add_argument("--no-lock", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite:///{tmp}/stress.db"
+        created, attempts, elapsed, overlaps = run(url, args.threads, args.services, args.slots, not args.no_lock)
+    print(f"attempts={attempts} created={created} overlaps={overlaps}")
+    print(f"{attempts / elapsed:.0f} attempts/s, {created / elapsed:.0f} bookings/s over {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""decode_token cost: cold (full JWT verify) vs hot (verified-token cache).
+
+Run from the project root:
+
+    python -m benchmarks.bench_decode_token --number 20000
+"""
+import argparse
+import os
+import timeit
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from security import create_access_token, decode_token, token_cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    token = create_access_token(sub="bench@example.com", roles=["user"], user_id=1)
+
+    def cold():
+        token_cache._claims.clear()
+        decode_token(token)
+
+    def clear_only():
+        token_cache._claims.clear()
+
+    decode_token(token)
+    results = {
+        "cold": min(timeit.repeat(cold, number=args.number, repeat=args.repeat)),
+        "clear": min(timeit.repeat(clear_only, number=args.number, repeat=args.repeat)),
+        "hot": min(timeit.repeat(lambda: decode_token(token), number=args.number, repeat=args.repeat)),
+    }
+    cold_us = (results["cold"] - results["clear"]) / args.number * 1e6
+    hot_us = results["hot"] / args.number * 1e6
+    print(f"{'path':<6} {'us/call':>8}")
+    print(f"{'cold':<6} {cold_us:>8.2f}")
+    print(f"{'hot':<6} {hot_us:>8.2f}")
+    print(f"speed-up {cold_us / hot_us:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
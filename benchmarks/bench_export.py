@@ -0,0 +1,84 @@
+"""Peak memory of the streaming booking export vs building one JSON list.
+
+Run from the project root:
+
+    python -m benchmarks.bench_export --rows 1000000
+    python -m benchmarks.bench_export --rows 200000 --compare-list
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from crud.crud_booking import booking_service
+from database import Base
+from export import FORMATTERS
+from models.booking import Booking, BookingStatus
+from schemas.booking import Booking as BookingSchema
+
+BASE = datetime(2020, 1, 1)
+
+
+def measure(fn):
+    tracemalloc.start()
+    started = time.perf_counter()
+    size = fn()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=sorted(FORMATTERS), default="ndjson")
+    parser.add_argument("--compare-list", action="store_true", help="also time GET /bookings style list serialisation")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/export.db")
+        Base.metadata.create_all(bind=engine)
+        batch = 100_000
+        for offset in range(0, args.rows, batch):
+            with engine.begin() as conn:
+                conn.execute(
+                    insert(Booking),
+                    [
+                        {"user_id": i % 1000, "service_id": i % 50, "start_time": BASE + timedelta(minutes=30 * i),
+                         "end_time": BASE + timedelta(minutes=30 * i + 30), "status": BookingStatus.confirmed,
+                         "created_at": BASE}
+                        for i in range(offset, min(offset + batch, args.rows))
+                    ],
+                )
+        Session = sessionmaker(bind=engine)
+
+        def stream():
+            with Session() as db:
+                return sum(len(chunk) for chunk in FORMATTERS[args.format](booking_service.iter_bookings(db)))
+
+        def as_list():
+            with Session() as db:
+                # What FastAPI does for response_model=List[Booking]
+                adapter = TypeAdapter(list[BookingSchema])
+                bookings = adapter.validate_python(booking_service.get_all_bookings(db, limit=args.rows), from_attributes=True)
+                return len(adapter.dump_json(bookings))
+
+        runs = [("stream " + args.format, stream)] + ([("json list", as_list)] if args.compare_list else [])
+        print(f"{'mode':<14} {'rows':>9} {'MB out':>8} {'seconds':>8} {'peak MB':>8}")
+        for name, fn in runs:
+            size, elapsed, peak = measure(fn)
+            print(f"{name:<14} {args.rows:>9} {size / 1e6:>8.1f} {elapsed:>8.2f} {peak / 1e6:>8.1f}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
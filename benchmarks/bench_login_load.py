@@ -0,0 +1,101 @@
+"""Login throughput vs latency of another endpoint during a login storm.
+
+Drives the app in-process with concurrent logins while a probe keeps
+calling GET /users/{id}, which reads the users table on every call (unlike
+GET /auth/users/me, answered from the principal cache). Run from the
+project root:
+
+    python -m benchmarks.bench_login_load --logins 200 --concurrency 50
+    python -m benchmarks.bench_login_load --workers 1 --max-queue 4 --rounds 12
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=10, help="bcrypt cost")
+    parser.add_argument("--workers", type=int, default=2, help="PASSWORD_HASH_WORKERS")
+    parser.add_argument("--max-queue", type=int, default=32, help="PASSWORD_HASH_MAX_QUEUE")
+    parser.add_argument("--probes", type=int, default=200)
+    return parser.parse_args()
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    return sorted(samples)[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+async def probe(client, path: str, count: int, stop: asyncio.Event | None = None) -> list[float]:
+    latencies = []
+    while len(latencies) < count and not (stop and stop.is_set()):
+        started = time.perf_counter()
+        response = await client.get(path)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(0.005)
+    return latencies
+
+
+async def run(args):
+    import httpx
+    from database import Base, init_engine
+    from main import app
+
+    Base.metadata.create_all(bind=init_engine())
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        credentials = {"username": "bench@example.com", "password": "password"}
+        registered = await client.post(
+            "/auth/register", json={"name": "Bench", "email": credentials["username"], "password": "password"}
+        )
+        path = f"/users/{registered.json()['id']}"
+
+        idle = await probe(client, path, args.probes)
+
+        limit = asyncio.Semaphore(args.concurrency)
+        statuses = []
+
+        async def login():
+            async with limit:
+                statuses.append((await client.post("/auth/login", data=credentials)).status_code)
+
+        stop = asyncio.Event()
+        probing = asyncio.create_task(probe(client, path, 10**9, stop))
+        started = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(args.logins)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        loaded = await probing
+
+    ok = statuses.count(200)
+    print(f"bcrypt rounds {args.rounds}, {args.workers} workers, queue {args.max_queue}")
+    print(f"logins: {ok} ok, {statuses.count(429)} shed (429) in {elapsed:.2f}s -> {ok / elapsed:.1f} logins/s")
+    print(f"{'probe':<10} {'n':>5} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for name, samples in (("idle", idle), ("storm", loaded or [float("nan")])):
+        print(
+            f"{name:<10} {len(samples):>5} {statistics.median(samples) * 1e3:>8.1f} "
+            f"{percentile(samples, 0.99) * 1e3:>8.1f} {max(samples) * 1e3:>8.1f}"
+        )
+
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = f"sqlite:///{tmp}/bench.db"
+        os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+        os.environ["PASSWORD_HASH_WORKERS"] = str(args.workers)
+        os.environ["PASSWORD_HASH_MAX_QUEUE"] = str(args.max_queue)
+        os.environ["BOOKING_SWEEP_ENABLED"] = "false"
+        # Every login is the same user, so the rate limiter would shed them, not the pool
+        os.environ["AUTH_RATE_LIMIT_ENABLED"] = "false"
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Page latency at page 1 vs deep pages: OFFSET vs keyset cursor.
+
+Run from the project root:
+
+    python -m benchmarks.bench_pagination --rows 600000 --limit 50 --pages 1 100 1000 10000
+"""
+import argparse
+import os
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from crud.crud_booking import booking_service
+from database import Base
+from models.booking import Booking, BookingStatus
+from pagination import encode_cursor
+
+BASE = datetime(2020, 1, 1)
+
+
+def timed(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=600_000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 100, 1_000, 10_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Booking),
+            [
+                {"user_id": i % 1000, "service_id": i % 50, "start_time": BASE + timedelta(minutes=30 * i),
+                 "end_time": BASE + timedelta(minutes=30 * i + 30), "status": BookingStatus.confirmed}
+                for i in range(args.rows)
+            ],
+        )
+    db = sessionmaker(bind=engine)()
+
+    print(f"{'page':>8} {'offset ms':>10} {'cursor ms':>10}")
+    for page in args.pages:
+        skip = (page - 1) * args.limit
+        if skip >= args.rows:
+            print(f"{page:>8} {'(past end)':>21}")
+            continue
+        cursor = None
+        if skip:
+            previous = booking_service.get_all_bookings(db, skip=skip - 1, limit=1)[0]
+            cursor = encode_cursor(previous, booking_service.order_by)
+        offset_s = timed(lambda: booking_service.get_all_bookings(db, skip=skip, limit=args.limit), args.repeat)
+        cursor_s = timed(lambda: booking_service.get_all_bookings(db, cursor=cursor, limit=args.limit), args.repeat)
+        print(f"{page:>8} {offset_s * 1e3:>10.2f} {cursor_s * 1e3:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Service search latency: substring LIKE vs the full-text index.
+
+Run from the project root:
+
+    python -m benchmarks.bench_service_search --rows 500000
+    python -m benchmarks.bench_service_search --database-url postgresql://... --rows 500000
+
+LIKE has to scan until it fills a page, so it is slowest for rare or missing
+terms; ranked search reads only the matching rows but must score all of them,
+so very common terms cost more than an unranked first page.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import sessionmaker
+
+from crud.crud_service import service_service
+from database import Base
+from models.service import Service
+
+WORDS = (
+    "massage haircut manicure pedicure facial yoga pilates coaching tutoring repair cleaning plumbing "
+    "consultation therapy grooming tattoo piercing photography lesson training styling colouring "
+    "waxing tanning nutrition physio dental checkup driving guitar piano swimming"
+).split()
+QUERIES = ["massage", "guitar lesson", "deep tissue", "pho", "zzzz"]
+
+
+def timed(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat
+
+
+def populate(engine, rows: int):
+    rng = random.Random(0)
+    batch = 50_000
+    for offset in range(0, rows, batch):
+        with engine.begin() as conn:
+            conn.execute(
+                insert(Service),
+                [
+                    {"title": " ".join(rng.sample(WORDS, 2)).capitalize(), "description": " ".join(rng.choices(WORDS, k=12)),
+                     "price": float(rng.randint(10, 500)), "duration_minutes": 60, "is_active": rng.random() < 0.9}
+                    for _ in range(offset, min(offset + batch, rows))
+                ],
+            )
+    if engine.dialect.name == "sqlite":
+        # Bulk backfill, as the migration does; CRUDService keeps it in step afterwards.
+        with engine.begin() as conn:
+            conn.execute(text("INSERT INTO services_fts (rowid, title, description) SELECT id, title, description FROM services"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database-url", help="empty database to use instead of a temporary SQLite file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(args.database_url or f"sqlite:///{tmp}/search.db")
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        populate(engine, args.rows)
+        db = sessionmaker(bind=engine)()
+
+        print(f"{'query':<14} {'like ms':>9} {'fulltext ms':>12} {'hits':>5}")
+        for q in QUERIES:
+            kwargs = {"q": q, "active": True, "limit": args.limit}
+            like_s = timed(lambda: service_service.get_services(db, **kwargs), args.repeat)
+            fts_s = timed(lambda: service_service.get_services(db, search="fulltext", **kwargs), args.repeat)
+            hits = len(service_service.get_services(db, search="fulltext", **kwargs))
+            print(f"{q:<14} {like_s * 1e3:>9.2f} {fts_s * 1e3:>12.2f} {hits:>5}")
+        db.close()
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+import random
+import threading
+from datetime import datetime
+from typing import Callable, NamedTuple
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from models.booking import Booking, BookingStatus
+
+_PENDING_KEY = "booking_index_changes"
+
+
+def is_active(status) -> bool:
+    return getattr(status, "value", status) != BookingStatus.cancelled.value
+
+
+class BookingChange(NamedTuple):
+    """A committed change to one booking.
+
+    ``previous`` is the interval the booking occupied before the change, or
+    ``None`` if it did not occupy one (new or previously cancelled booking).
+    """
+
+    service_id: int
+    booking_id: int
+    start_time: datetime | None
+    end_time: datetime | None
+    active: bool
+    previous: tuple[datetime, datetime] | None = None
+    user_id: int | None = None
+
+
+class _Node:
+    __slots__ = ("start", "booking_id", "end", "priority", "max_end", "left", "right")
+
+    def __init__(self, start: datetime, booking_id: int, end: datetime, priority: float):
+        self.start = start
+        self.booking_id = booking_id
+        self.end = end
+        self.priority = priority
+        self.max_end = end
+        self.left: _Node | None = None
+        self.right: _Node | None = None
+
+    def update(self):
+        max_end = self.end
+        if self.left is not None and self.left.max_end > max_end:
+            max_end = self.left.max_end
+        if self.right is not None and self.right.max_end > max_end:
+            max_end = self.right.max_end
+        self.max_end = max_end
+
+
+def _split(node: _Node | None, key: tuple) -> tuple[_Node | None, _Node | None]:
+    """The nodes ordered before ``key`` and the rest."""
+    if node is None:
+        return None, None
+    if (node.start, node.booking_id) < key:
+        node.right, right = _split(node.right, key)
+        node.update()
+        return node, right
+    left, node.left = _split(node.left, key)
+    node.update()
+    return left, node
+
+
+def _merge(left: _Node | None, right: _Node | None) -> _Node | None:
+    """Join two treaps whose keys are all ordered ``left`` before ``right``."""
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        left.update()
+        return left
+    right.left = _merge(left, right.left)
+    right.update()
+    return right
+
+
+def _build(entries: list[tuple[datetime, int, datetime]], lo: int, hi: int) -> tuple[_Node | None, int]:
+    """A perfectly balanced tree of the sorted ``entries[lo:hi]``, and its height."""
+    if lo >= hi:
+        return None, 0
+    mid = (lo + hi) // 2
+    left, left_height = _build(entries, lo, mid)
+    right, right_height = _build(entries, mid + 1, hi)
+    height = max(left_height, right_height) + 1
+    # Above any random priority, so later inserts settle below the built tree
+    node = _Node(*entries[mid], priority=1.0 + height)
+    node.left, node.right = left, right
+    node.update()
+    return node, height
+
+
+class ServiceIntervals:
+    """Non-cancelled bookings of one service, as an interval tree.
+
+    Times are compared exactly as stored (naive UTC, see schemas.booking).
+
+    A treap ordered by start time whose nodes also know the latest end in
+    their subtree: adding or removing a booking costs O(log n), and an
+    overlap lookup O(log n + k) for k overlaps, however long other bookings
+    are. ``from_bookings`` builds a balanced tree from a table load in O(n
+    log n).
+    """
+
+    def __init__(self):
+        self._root: _Node | None = None
+        self._by_id: dict[int, tuple[datetime, datetime]] = {}
+
+    @classmethod
+    def from_bookings(cls, rows) -> "ServiceIntervals":
+        """Build from ``(booking_id, start_time, end_time)`` rows."""
+        intervals = cls()
+        entries = sorted((start_time, booking_id, end_time) for booking_id, start_time, end_time in rows)
+        intervals._root, _ = _build(entries, 0, len(entries))
+        intervals._by_id = {booking_id: (start_time, end_time) for start_time, booking_id, end_time in entries}
+        return intervals
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def add(self, booking_id: int, start_time: datetime, end_time: datetime):
+        self.remove(booking_id)
+        left, right = _split(self._root, (start_time, booking_id))
+        self._root = _merge(_merge(left, _Node(start_time, booking_id, end_time, random.random())), right)
+        self._by_id[booking_id] = (start_time, end_time)
+
+    def remove(self, booking_id: int):
+        entry = self._by_id.pop(booking_id, None)
+        if entry is None:
+            return
+        left, rest = _split(self._root, (entry[0], booking_id))
+        # (start, id, 0) orders right after (start, id), so this splits off just that node
+        _, right = _split(rest, (entry[0], booking_id, 0))
+        self._root = _merge(left, right)
+
+    def overlapping(self, start_time: datetime, end_time: datetime, exclude_id: int | None = None):
+        """Ids of the bookings overlapping ``[start_time, end_time)``, by start time."""
+        found = []
+        stack = []
+        node = self._root
+        while stack or node is not None:
+            if node is not None:
+                # Nothing in a subtree ending by start_time can overlap
+                if node.max_end > start_time:
+                    stack.append(node)
+                    node = node.left
+                else:
+                    node = None
+                continue
+            node = stack.pop()
+            if node.start >= end_time:
+                break
+            if node.end > start_time and node.booking_id != exclude_id:
+                found.append(node.booking_id)
+            node = node.right
+        return found
+
+
+class BookingIndex:
+    """Process-wide registry of per-service interval indexes.
+
+    A service is loaded from the ``bookings`` table the first time it is
+    checked. Writes made through ``CRUDBooking`` are staged on the session and
+    only applied once the transaction commits, so rolled back bookings never
+    reach the index.
+    """
+
+    def __init__(self):
+        self._services: dict[int, ServiceIntervals] = {}
+        self._listeners: list[Callable[[list[BookingChange]], None]] = []
+        self._lock = threading.RLock()
+
+    def _load(self, db: Session, service_id: int) -> ServiceIntervals:
+        rows = db.execute(
+            select(Booking.id, Booking.start_time, Booking.end_time).where(
+                Booking.service_id == service_id,
+                Booking.status != BookingStatus.cancelled,
+            )
+        )
+        return ServiceIntervals.from_bookings(
+            row for row in rows if row.start_time is not None and row.end_time is not None
+        )
+
+    def _get(self, db: Session, service_id: int) -> ServiceIntervals:
+        intervals = self._services.get(service_id)
+        if intervals is None:
+            with self._lock:
+                intervals = self._services.get(service_id)
+                if intervals is None:
+                    intervals = self._load(db, service_id)
+                    self._services[service_id] = intervals
+        return intervals
+
+    def overlapping(
+        self,
+        db: Session,
+        service_id: int,
+        start_time: datetime,
+        end_time: datetime,
+        exclude_id: int | None = None,
+    ) -> list[int]:
+        intervals = self._get(db, service_id)
+        with self._lock:
+            return intervals.overlapping(start_time, end_time, exclude_id)
+
+    def stage(self, db: Session, change: BookingChange):
+        """Apply ``change`` once the session's transaction commits."""
+        db.info.setdefault(_PENDING_KEY, []).append(change)
+
+    def stage_upsert(self, db: Session, booking: Booking, previous: tuple[datetime, datetime] | None = None):
+        self.stage(
+            db,
+            BookingChange(
+                booking.service_id,
+                booking.id,
+                booking.start_time,
+                booking.end_time,
+                is_active(booking.status),
+                previous,
+                booking.user_id,
+            ),
+        )
+
+    def stage_remove(self, db: Session, booking: Booking):
+        previous = (booking.start_time, booking.end_time) if is_active(booking.status) else None
+        self.stage(db, BookingChange(booking.service_id, booking.id, None, None, False, previous, booking.user_id))
+
+    def subscribe(self, listener: Callable[[list[BookingChange]], None]):
+        """Call ``listener`` with every batch of committed booking changes."""
+        self._listeners.append(listener)
+
+    def apply(self, changes: list[BookingChange]):
+        with self._lock:
+            for change in changes:
+                intervals = self._services.get(change.service_id)
+                if intervals is None:
+                    # Not warmed yet; the first lookup will read it from the table.
+                    continue
+                if change.active and change.start_time is not None and change.end_time is not None:
+                    intervals.add(change.booking_id, change.start_time, change.end_time)
+                else:
+                    intervals.remove(change.booking_id)
+        for listener in self._listeners:
+            listener(changes)
+
+    def invalidate(self, service_id: int | None = None):
+        with self._lock:
+            if service_id is None:
+                self._services.clear()
+            else:
+                self._services.pop(service_id, None)
+
+
+booking_index = BookingIndex()
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending(session: Session):
+    changes = session.info.pop(_PENDING_KEY, None)
+    if changes:
+        booking_index.apply(changes)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_pending(session: Session, transaction):
+    # Runs after after_commit, so anything left here was rolled back or closed.
+    if transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
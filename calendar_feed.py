@@ -0,0 +1,149 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timedelta
+
+from fastapi import Response
+
+from booking_index import BookingChange, booking_index
+from conditional import etag_matches
+from settings import settings
+from timeutil import to_naive_utc
+
+# Bookings that started longer ago than this are left out of feeds.
+FEED_HISTORY = timedelta(days=30)
+
+FEED_STATUS = {"pending": "TENTATIVE", "confirmed": "CONFIRMED", "completed": "CONFIRMED"}
+
+
+def _ics_time(value: datetime) -> str:
+    return to_naive_utc(value).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _ics_text(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\r\n", "\\n").replace("\n", "\\n")
+    )
+
+
+def _fold(line: str) -> str:
+    # RFC 5545 limits lines to 75 octets; continuation lines start with a space.
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line
+    parts, start = [], 0
+    while start < len(encoded):
+        end = min(start + (75 if not parts else 74), len(encoded))
+        while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode())
+        start = end
+    return "\r\n ".join(parts)
+
+
+def render_calendar(name: str, bookings, summary: str | None = None) -> bytes:
+    """Render ``(id, start, end, status, created_at, title)`` rows as iCalendar.
+
+    ``summary`` replaces the service title, e.g. to publish busy blocks only.
+    Output depends only on the rows, so identical feeds hash to the same ETag
+    on every worker.
+    """
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//BookIt//Bookings//EN",
+        "CALSCALE:GREGORIAN",
+        f"X-WR-CALNAME:{_ics_text(name)}",
+    ]
+    for booking_id, start_time, end_time, status, created_at, title in bookings:
+        status = getattr(status, "value", status)
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:booking-{booking_id}@bookit",
+            f"DTSTAMP:{_ics_time(created_at or start_time)}",
+            f"DTSTART:{_ics_time(start_time)}",
+            f"DTEND:{_ics_time(end_time)}",
+            f"SUMMARY:{_ics_text(summary or title or 'Booking')}",
+            f"STATUS:{FEED_STATUS.get(status, 'CONFIRMED')}",
+            "END:VEVENT",
+        ]
+    lines.append("END:VCALENDAR")
+    return ("\r\n".join(_fold(line) for line in lines) + "\r\n").encode()
+
+
+def feed_etag(body: bytes) -> str:
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+class FeedCache:
+    """Rendered calendar feeds keyed by ``("user", id)`` or ``("service", id)``.
+
+    Every feed has a version counter bumped by committed booking changes. A
+    cached feed is served while its version is current and it is younger than
+    ``ttl_seconds``; the TTL bounds staleness when another worker changed the
+    bookings.
+    """
+
+    def __init__(self, ttl_seconds: float = 300, max_entries: int = 10_000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._versions: defaultdict[tuple[str, int], int] = defaultdict(int)
+        self._feeds: OrderedDict[tuple[str, int], tuple[int, float, str, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def version(self, key: tuple[str, int]) -> int:
+        with self._lock:
+            return self._versions[key]
+
+    def get(self, key: tuple[str, int]) -> tuple[str, bytes] | None:
+        """``(etag, body)`` of the cached feed if it is still current."""
+        with self._lock:
+            entry = self._feeds.get(key)
+            if entry is None:
+                return None
+            version, expires_at, etag, body = entry
+            if version != self._versions[key] or expires_at < time.monotonic():
+                del self._feeds[key]
+                return None
+            self._feeds.move_to_end(key)
+            return etag, body
+
+    def put(self, key: tuple[str, int], version: int, body: bytes) -> str:
+        etag = feed_etag(body)
+        with self._lock:
+            self._feeds[key] = (version, time.monotonic() + self.ttl_seconds, etag, body)
+            self._feeds.move_to_end(key)
+            while len(self._feeds) > self.max_entries:
+                self._feeds.popitem(last=False)
+        return etag
+
+    def apply(self, changes: list[BookingChange]):
+        with self._lock:
+            for change in changes:
+                self._versions[("service", change.service_id)] += 1
+                if change.user_id is not None:
+                    self._versions[("user", change.user_id)] += 1
+
+
+feed_cache = FeedCache(ttl_seconds=settings.CALENDAR_FEED_TTL_SECONDS)
+booking_index.subscribe(feed_cache.apply)
+
+
+def feed_response(key: tuple[str, int], if_none_match: str | None, render, store: bool = True) -> Response:
+    """Serve the feed for ``key``, calling ``render()`` only on a cache miss.
+
+    A poll whose If-None-Match matches the current feed gets a bodiless 304.
+    Without ``store`` (e.g. for replica reads) a render is not cached.
+    """
+    cached = feed_cache.get(key)
+    if cached is None:
+        version = feed_cache.version(key)
+        body = render()
+        etag = feed_cache.put(key, version, body) if store else feed_etag(body)
+    else:
+        etag, body = cached
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="text/calendar; charset=utf-8", headers=headers)
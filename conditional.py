@@ -0,0 +1,67 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an If-None-Match header value matches ``etag`` (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+def version_etag(rows) -> str:
+    """Weak ETag for rows that have ``id`` and ``updated_at``, in response order.
+
+    Only the version columns are read, so it can be computed from a query
+    that does not load the full rows.
+    """
+    digest = hashlib.sha256()
+    for row in rows:
+        updated_at = row.updated_at.isoformat() if row.updated_at else ""
+        digest.update(f"{row.id}:{updated_at};".encode())
+    return f'W/"{digest.hexdigest()[:32]}"'
+
+
+def content_etag(body: bytes) -> str:
+    """Weak ETag for a response whose validity no row version captures."""
+    return f'W/"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def last_modified(rows) -> datetime | None:
+    return max((row.updated_at for row in rows if row.updated_at), default=None)
+
+
+def validator_headers(etag: str, modified: datetime | None, cache_control: str = "no-cache") -> dict:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if modified is not None:
+        # Timestamps are stored as naive UTC
+        headers["Last-Modified"] = format_datetime(modified.replace(tzinfo=timezone.utc), usegmt=True)
+    return headers
+
+
+def not_modified(
+    if_none_match: str | None,
+    if_modified_since: str | None,
+    etag: str,
+    modified: datetime | None,
+) -> bool:
+    """Whether a GET can be answered with 304 (RFC 9110, section 13.2.2).
+
+    If-Modified-Since is only consulted when there is no If-None-Match.
+    """
+    if if_none_match:
+        return etag_matches(if_none_match, etag)
+    if not if_modified_since or modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP dates have whole-second resolution
+    return modified.replace(tzinfo=timezone.utc, microsecond=0) <= since
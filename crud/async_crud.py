@@ -0,0 +1,24 @@
+class AsyncCRUD:
+    """Awaitable twin of a CRUD object.
+
+    ``await async_crud.method(db, ...)`` runs ``crud.method(session, ...)``
+    through ``db.run_sync``, where ``db`` is what ``get_async_db`` yields.
+    Non-callable attributes such as ``order_by`` are passed through.
+    Generators (``iter_bookings``) need the session while they are consumed
+    and stay on the sync API.
+    """
+
+    def __init__(self, crud):
+        self._crud = crud
+
+    def __getattr__(self, name):
+        attr = getattr(self._crud, name)
+        if not callable(attr):
+            return attr
+
+        async def method(db, *args, **kwargs):
+            return await db.run_sync(attr, *args, **kwargs)
+
+        method.__name__ = method.__qualname__ = name
+        setattr(self, name, method)
+        return method
@@ -1,51 +1,268 @@
+import logging
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from models.booking import Booking
+from sqlalchemy import and_, insert, select, update
+from models.booking import Booking, BookingStatus
+from models.service import Service
 from schemas.booking import BookingCreate, BookingUpdate
+from booking_index import BookingChange, ServiceIntervals, booking_index, is_active
+from timeutil import to_naive_utc
+from pagination import paginate
+from settings import settings
 from datetime import datetime
+from crud.async_crud import AsyncCRUD
+
+logger = logging.getLogger(__name__)
+
+
+def booking_index_mode(dialect_name: str) -> str:
+    """BOOKING_INDEX_MODE, defaulting to "db" on PostgreSQL.
+
+    Another worker's commits never reach this process's booking index, so
+    only a database check under the service lock is safe with several
+    workers.
+    """
+    if settings.BOOKING_INDEX_MODE:
+        return settings.BOOKING_INDEX_MODE
+    return "db" if dialect_name == "postgresql" else "index"
+
 
 class CRUDBooking:
+    order_by = (Booking.start_time, Booking.id)
+    export_columns = (
+        Booking.id,
+        Booking.user_id,
+        Booking.service_id,
+        Booking.start_time,
+        Booking.end_time,
+        Booking.status,
+        Booking.created_at,
+    )
+    # Enough to build a page's ETag and its next cursor without loading rows
+    version_columns = (Booking.id, Booking.start_time, Booking.updated_at)
+
     @staticmethod
     def create_booking(db: Session, booking: BookingCreate):
         db_booking = Booking(**booking.model_dump())
         db.add(db_booking)
+        # INSERT ... RETURNING the id; every other column is set in Python
         db.flush()
-        db.refresh(db_booking)
+        booking_index.stage_upsert(db, db_booking)
         return db_booking
 
+    @staticmethod
+    def create_bookings(db: Session, bookings: list[BookingCreate]):
+        """Insert every booking that fits, checking them in submission order.
+
+        Candidates are checked against existing bookings fetched in a single
+        query and against earlier items of the same batch, then inserted with
+        one bulk INSERT. Returns one ``(booking, detail)`` pair per item, with
+        ``booking`` set for created items and ``detail`` for rejected ones.
+        """
+        results: list[tuple[Booking | None, str | None]] = [(None, None)] * len(bookings)
+        service_ids = {booking.service_id for booking in bookings}
+        known_services = set(db.scalars(select(Service.id).where(Service.id.in_(service_ids))))
+
+        candidates = []
+        for i, booking in enumerate(bookings):
+            # Already naive UTC (schemas.booking), exactly as they are inserted
+            start_time, end_time = booking.start_time, booking.end_time
+            if booking.service_id not in known_services:
+                results[i] = (None, "Service not found")
+            elif end_time <= start_time:
+                results[i] = (None, "end_time must be after start_time")
+            else:
+                candidates.append((i, booking.service_id, start_time, end_time))
+        if not candidates:
+            return results
+
+        intervals: dict[int, ServiceIntervals] = {}
+        existing = db.execute(
+            select(Booking.id, Booking.service_id, Booking.start_time, Booking.end_time).where(
+                Booking.service_id.in_({service_id for _, service_id, _, _ in candidates}),
+                Booking.status != BookingStatus.cancelled,
+                Booking.start_time < max(end_time for _, _, _, end_time in candidates),
+                Booking.end_time > min(start_time for _, _, start_time, _ in candidates),
+            )
+        )
+        for booking_id, service_id, start_time, end_time in existing:
+            if start_time is not None and end_time is not None:
+                intervals.setdefault(service_id, ServiceIntervals()).add(booking_id, start_time, end_time)
+
+        accepted = []
+        for i, service_id, start_time, end_time in candidates:
+            service_intervals = intervals.setdefault(service_id, ServiceIntervals())
+            if service_intervals.overlapping(start_time, end_time):
+                results[i] = (None, "Booking conflict")
+            else:
+                # Negative ids keep batch items apart from stored bookings.
+                service_intervals.add(-(i + 1), start_time, end_time)
+                accepted.append(i)
+        if not accepted:
+            return results
+
+        created = db.scalars(
+            insert(Booking).returning(Booking, sort_by_parameter_order=True),
+            [bookings[i].model_dump() for i in accepted],
+        ).all()
+        for i, db_booking in zip(accepted, created):
+            booking_index.stage_upsert(db, db_booking)
+            results[i] = (db_booking, None)
+        return results
+
     @staticmethod
     def get_booking(db: Session, booking_id: int):
         return db.query(Booking).filter(Booking.id == booking_id).first()
 
     @staticmethod
-    def get_bookings(db: Session, user_id: int, skip: int = 0, limit: int = 100):
-        return db.query(Booking).filter(Booking.user_id == user_id).offset(skip).limit(limit).all()
+    def get_booking_version(db: Session, booking_id: int):
+        """``(id, user_id, updated_at)`` of a booking, without loading the row."""
+        return db.query(Booking.id, Booking.user_id, Booking.updated_at).filter(Booking.id == booking_id).first()
 
     @staticmethod
-    def get_all_bookings(db: Session, skip: int = 0, limit: int = 100):
-        return db.query(Booking).offset(skip).limit(limit).all()
+    def get_bookings(
+        db: Session,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: str | None = None,
+        versions_only: bool = False,
+    ):
+        query = db.query(Booking).filter(Booking.user_id == user_id)
+        if versions_only:
+            query = query.with_entities(*CRUDBooking.version_columns)
+        return paginate(query, CRUDBooking.order_by, cursor=cursor, skip=skip, limit=limit)
+
+    @staticmethod
+    def get_all_bookings(
+        db: Session,
+        status: str | None = None,
+        from_date: datetime | None = None,
+        to_date: datetime | None = None,
+        service_id: int | None = None,
+        user_id: int | None = None,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: str | None = None,
+        versions_only: bool = False,
+    ):
+        """Bookings matching every given filter, ordered by start time.
+
+        ``from_date``/``to_date`` bound the start time (inclusive/exclusive).
+        Each filter combination is served by one of the ``bookings`` indexes.
+        ``versions_only`` returns just the ``version_columns`` of the page.
+        """
+        query = CRUDBooking._filter(db.query(Booking), status, from_date, to_date, service_id, user_id)
+        if versions_only:
+            query = query.with_entities(*CRUDBooking.version_columns)
+        return paginate(query, CRUDBooking.order_by, cursor=cursor, skip=skip, limit=limit)
+
+    @staticmethod
+    def iter_bookings(
+        db: Session,
+        status: str | None = None,
+        from_date: datetime | None = None,
+        to_date: datetime | None = None,
+        service_id: int | None = None,
+        user_id: int | None = None,
+        batch_size: int = 1000,
+    ):
+        """Stream matching bookings as plain rows, ``batch_size`` at a time.
+
+        Rows come from a server-side cursor instead of ORM objects, so memory
+        stays flat however many bookings match.
+        """
+        query = CRUDBooking._filter(db.query(*CRUDBooking.export_columns), status, from_date, to_date, service_id, user_id)
+        return query.order_by(*CRUDBooking.order_by).yield_per(batch_size)
+
+    @staticmethod
+    def get_calendar_bookings(db: Session, since: datetime, user_id: int | None = None, service_id: int | None = None):
+        """Non-cancelled bookings starting from ``since`` with their service title."""
+        query = (
+            db.query(Booking.id, Booking.start_time, Booking.end_time, Booking.status, Booking.created_at, Service.title)
+            .join(Service, Service.id == Booking.service_id)
+            .filter(Booking.status != BookingStatus.cancelled, Booking.start_time >= since)
+        )
+        if user_id is not None:
+            query = query.filter(Booking.user_id == user_id)
+        if service_id is not None:
+            query = query.filter(Booking.service_id == service_id)
+        return query.order_by(*CRUDBooking.order_by).all()
+
+    @staticmethod
+    def _filter(query, status, from_date, to_date, service_id, user_id):
+        if status is not None:
+            query = query.filter(Booking.status == BookingStatus(getattr(status, "value", status)))
+        if service_id is not None:
+            query = query.filter(Booking.service_id == service_id)
+        if user_id is not None:
+            query = query.filter(Booking.user_id == user_id)
+        if from_date is not None:
+            query = query.filter(Booking.start_time >= to_naive_utc(from_date))
+        if to_date is not None:
+            query = query.filter(Booking.start_time < to_naive_utc(to_date))
+        return query
 
     @staticmethod
     def update_booking(db: Session, booking_id: int, booking: BookingUpdate):
-        db_booking = db.query(Booking).filter(Booking.id == booking_id).first()
+        # The route has usually loaded it already (to authorise); get() reuses that
+        db_booking = db.get(Booking, booking_id)
         if db_booking:
+            previous = (db_booking.start_time, db_booking.end_time) if is_active(db_booking.status) else None
             update_data = booking.dict(exclude_unset=True)
             for key, value in update_data.items():
                 setattr(db_booking, key, value)
             db.flush()
-            db.refresh(db_booking)
+            booking_index.stage_upsert(db, db_booking, previous)
         return db_booking
 
     @staticmethod
     def delete_booking(db: Session, booking_id: int):
-        db_booking = db.query(Booking).filter(Booking.id == booking_id).first()
+        db_booking = db.get(Booking, booking_id)
         if db_booking:
+            booking_index.stage_remove(db, db_booking)
             db.delete(db_booking)
             db.commit()
         return db_booking
 
     @staticmethod
-    def get_conflicting_bookings(db: Session, start_time: datetime, end_time: datetime, service_id: int, booking_id: int = None):
+    def complete_finished_bookings(db: Session, now: datetime, batch_size: int) -> int:
+        """Mark up to ``batch_size`` confirmed bookings that ended by ``now`` completed."""
+        batch = select(Booking.id).where(
+            Booking.status == BookingStatus.confirmed,
+            # Redundant with end_time but lets the (status, start_time) index drive it
+            Booking.start_time < now,
+            Booking.end_time <= now,
+        ).limit(batch_size)
+        result = db.execute(
+            update(Booking)
+            .where(Booking.id.in_(batch))
+            .values(status=BookingStatus.completed)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    @staticmethod
+    def cancel_stale_pending_bookings(db: Session, cutoff: datetime, batch_size: int) -> int:
+        """Cancel up to ``batch_size`` pending bookings that started before ``cutoff``."""
+        batch = select(Booking.id).where(
+            Booking.status == BookingStatus.pending,
+            Booking.start_time < cutoff,
+        ).limit(batch_size)
+        rows = db.execute(
+            update(Booking)
+            .where(Booking.id.in_(batch))
+            .values(status=BookingStatus.cancelled)
+            .returning(Booking.id, Booking.service_id, Booking.start_time, Booking.end_time, Booking.user_id)
+            .execution_options(synchronize_session=False)
+        ).all()
+        for booking_id, service_id, start_time, end_time, user_id in rows:
+            booking_index.stage(
+                db, BookingChange(service_id, booking_id, None, None, False, (start_time, end_time), user_id)
+            )
+        return len(rows)
+
+    @staticmethod
+    def _conflict_query(db: Session, start_time: datetime, end_time: datetime, service_id: int, booking_id: int = None):
         query = db.query(Booking).filter(
             Booking.service_id == service_id,
             Booking.status != 'cancelled',
@@ -56,6 +273,28 @@ class CRUDBooking:
         )
         if booking_id:
             query = query.filter(Booking.id != booking_id)
-        return query.all()
+        return query
+
+    @staticmethod
+    def get_conflicting_bookings(db: Session, start_time: datetime, end_time: datetime, service_id: int, booking_id: int = None):
+        return CRUDBooking._conflict_query(db, start_time, end_time, service_id, booking_id).all()
+
+    @staticmethod
+    def has_conflict(db: Session, start_time: datetime, end_time: datetime, service_id: int, booking_id: int = None) -> bool:
+        mode = booking_index_mode(db.get_bind().dialect.name)
+        if mode == "db":
+            query = CRUDBooking._conflict_query(db, start_time, end_time, service_id, booking_id)
+            return db.query(query.exists()).scalar()
+
+        in_index = bool(booking_index.overlapping(db, service_id, start_time, end_time, exclude_id=booking_id))
+        if mode == "verify":
+            query = CRUDBooking._conflict_query(db, start_time, end_time, service_id, booking_id)
+            in_db = db.query(query.exists()).scalar()
+            if in_db != in_index:
+                logger.warning("Booking index disagrees with database for service %s, reloading", service_id)
+                booking_index.invalidate(service_id)
+            return in_db
+        return in_index
 
-booking_service = CRUDBooking()
\ No newline at end of file
+booking_service = CRUDBooking()
+async_booking_service = AsyncCRUD(booking_service)
@@ -1,15 +1,46 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import Float, case, cast, select, update
+from sqlalchemy.orm import Session, contains_eager
 from models.review import Review
 from models.booking import Booking
+from models.service import Service
 from schemas.review import ReviewCreate, ReviewUpdate
+from pagination import paginate
+from service_cache import service_cache
+from crud.async_crud import AsyncCRUD
 
 class CRUDReview:
+    order_by = (Review.created_at, Review.id)
+    # Cursor columns and direction for each ``sort`` of get_reviews_by_service
+    sorts = {
+        "created": (order_by, False),
+        "recent": ((Review.created_at, Review.id), True),
+        "rating": ((Review.rating, Review.id), True),
+    }
+
+    @staticmethod
+    def _adjust_rating(db: Session, booking_id: int, count_delta: int, sum_delta: int):
+        """Apply a review change to its service's rating aggregates in one UPDATE."""
+        rating_count = Service.rating_count + count_delta
+        rating_sum = Service.rating_sum + sum_delta
+        db.execute(
+            update(Service)
+            .where(Service.id == select(Booking.service_id).where(Booking.id == booking_id).scalar_subquery())
+            .values(
+                rating_count=rating_count,
+                rating_sum=rating_sum,
+                rating_score=case((rating_count > 0, cast(rating_sum, Float) / rating_count), else_=0.0),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        service_cache.invalidate_on_commit(db)
+
     @staticmethod
-    def create_review(db: Session, review: ReviewCreate, user_id: int):
-        db_review = Review(**review.dict(), user_id=user_id)
+    def create_review(db: Session, review: ReviewCreate):
+        db_review = Review(**review.model_dump())
         db.add(db_review)
+        # INSERT ... RETURNING the id; every other column is set in Python
         db.flush()
-        db.refresh(db_review)
+        CRUDReview._adjust_rating(db, db_review.booking_id, 1, db_review.rating)
         return db_review
 
     @staticmethod
@@ -17,25 +48,47 @@ class CRUDReview:
         return db.query(Review).filter(Review.id == review_id).first()
 
     @staticmethod
-    def get_reviews_by_service(db: Session, service_id: int):
-        return db.query(Review).join(Booking).filter(Booking.service_id == service_id).all()
+    def get_reviews_by_service(
+        db: Session,
+        service_id: int,
+        limit: int = 100,
+        cursor: str | None = None,
+        sort: str = "created",
+        expand: bool = False,
+    ):
+        """One page of a service's reviews.
+
+        ``sort`` is "created" (oldest first), "recent" or "rating" (highest
+        first). ``expand`` loads each review's booking and reviewer in the
+        same query, for ``Review.booking_date`` and ``Review.reviewer_name``.
+        """
+        query = db.query(Review).join(Review.booking).filter(Booking.service_id == service_id)
+        if expand:
+            query = query.outerjoin(Booking.user).options(contains_eager(Review.booking).contains_eager(Booking.user))
+        order_by, descending = CRUDReview.sorts[sort]
+        return paginate(query, order_by, cursor=cursor, limit=limit, descending=descending)
 
     @staticmethod
     def update_review(db: Session, review_id: int, review: ReviewUpdate):
-        db_review = CRUDReview.get_review(db, review_id)
+        # The route has usually loaded it already (to authorise); get() reuses that
+        db_review = db.get(Review, review_id)
         if db_review:
-            for key, value in review.dict().items():
+            previous_rating = db_review.rating
+            for key, value in review.model_dump().items():
                 setattr(db_review, key, value)
             db.flush()
-            db.refresh(db_review)
+            if db_review.rating != previous_rating:
+                CRUDReview._adjust_rating(db, db_review.booking_id, 0, db_review.rating - previous_rating)
         return db_review
 
     @staticmethod
     def delete_review(db: Session, review_id: int):
-        db_review = CRUDReview.get_review(db, review_id)
+        db_review = db.get(Review, review_id)
         if db_review:
+            CRUDReview._adjust_rating(db, db_review.booking_id, -1, -db_review.rating)
             db.delete(db_review)
             db.commit()
         return db_review
 
-review_service = CRUDReview()
\ No newline at end of file
+review_service = CRUDReview()
+async_review_service = AsyncCRUD(review_service)
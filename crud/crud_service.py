@@ -1,9 +1,22 @@
+from sqlalchemy import and_, case, func, true, update
 from sqlalchemy.orm import Session
 from models.service import Service
 from schemas.service import ServiceCreate, ServiceUpdate
+from pagination import paginate
+from search import apply_search, index_service, remove_service
+from service_cache import service_cache
+from crud.async_crud import AsyncCRUD
+
+
+# Lower bounds of the facet price buckets; the last bucket is open-ended.
+DEFAULT_PRICE_EDGES = (0, 25, 50, 100, 250, 500)
 
 
 class CRUDService:
+    order_by = (Service.created_at, Service.id)
+    # Best rated first; walks ix_services_rating_score_rating_count_id backwards
+    rating_order_by = (Service.rating_score.desc(), Service.rating_count.desc(), Service.id.desc())
+
     @staticmethod
     def create_service(db: Session, service: ServiceCreate):
         db_service = Service(
@@ -14,8 +27,10 @@ class CRUDService:
             is_active=service.is_active,
         )
         db.add(db_service)
+        # INSERT ... RETURNING the id (and any server defaults)
         db.flush()
-        db.refresh(db_service)
+        index_service(db, db_service)
+        service_cache.invalidate_on_commit(db)
         return db_service
 
     @staticmethod
@@ -31,36 +46,127 @@ class CRUDService:
         price_min: float | None = None,
         price_max: float | None = None,
         active: bool | None = None,
+        cursor: str | None = None,
+        search: str = "substring",
+        min_rating: float | None = None,
+        sort: str = "created",
     ):
+        """Services matching the filters.
+
+        ``search="fulltext"`` matches ``q`` against the full-text index and
+        orders by relevance, paginated with ``skip``; otherwise ``q`` is a
+        substring match and results are in creation order.
+        ``sort="rating"`` orders by average rating instead (also with
+        ``skip``); unrated services come last.
+        """
+        fulltext = bool(q) and search == "fulltext"
+        query = CRUDService._matching(db, q, search, min_rating).filter(
+            *CRUDService._price_conditions(price_min, price_max),
+            *CRUDService._active_conditions(active),
+        )
+        if sort == "rating":
+            query = query.order_by(None).order_by(*CRUDService.rating_order_by)
+        if fulltext or sort == "rating":
+            return query.offset(skip).limit(limit).all()
+        return paginate(query, CRUDService.order_by, cursor=cursor, skip=skip, limit=limit)
+
+    @staticmethod
+    def get_facets(
+        db: Session,
+        q: str | None = None,
+        price_min: float | None = None,
+        price_max: float | None = None,
+        active: bool | None = None,
+        search: str = "substring",
+        min_rating: float | None = None,
+        price_edges=DEFAULT_PRICE_EDGES,
+    ) -> dict:
+        """Counts for a catalogue filter sidebar, from one aggregate query.
+
+        ``total`` counts services matching every filter. The active/inactive
+        counts ignore ``active`` and the price histogram ignores
+        ``price_min``/``price_max``, so each shows what picking another value
+        of that filter would return.
+        """
+        price_ok = and_(true(), *CRUDService._price_conditions(price_min, price_max))
+        active_ok = and_(true(), *CRUDService._active_conditions(active))
+        buckets = list(zip(price_edges, [*price_edges[1:], None]))
+
+        def count(condition):
+            return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+        columns = [
+            count(and_(price_ok, active_ok)),
+            count(and_(price_ok, Service.is_active.is_(True))),
+            count(and_(price_ok, Service.is_active.is_(False))),
+        ]
+        for low, high in buckets:
+            in_bucket = Service.price >= low if high is None else and_(Service.price >= low, Service.price < high)
+            columns.append(count(and_(active_ok, in_bucket)))
+        row = CRUDService._matching(db, q, search, min_rating).order_by(None).with_entities(*columns).one()
+        total, active_count, inactive_count, *histogram = row
+        return {
+            "total": total,
+            "active": active_count,
+            "inactive": inactive_count,
+            "price_histogram": [
+                {"min": low, "max": high, "count": bucket_count}
+                for (low, high), bucket_count in zip(buckets, histogram)
+            ],
+        }
+
+    @staticmethod
+    def _matching(db: Session, q: str | None, search: str, min_rating: float | None):
+        """Services matching ``q`` and ``min_rating``, the filters facets never ignore."""
         query = db.query(Service)
-        if q:
+        if q and search == "fulltext":
+            query = apply_search(query, db, q)
+        elif q:
             query = query.filter(
                 Service.title.contains(q) | Service.description.contains(q)
             )
+        if min_rating is not None:
+            query = query.filter(Service.rating_score >= min_rating, Service.rating_count > 0)
+        return query
+
+    @staticmethod
+    def _price_conditions(price_min: float | None, price_max: float | None) -> list:
+        conditions = []
         if price_min is not None:
-            query = query.filter(Service.price >= price_min)
+            conditions.append(Service.price >= price_min)
         if price_max is not None:
-            query = query.filter(Service.price <= price_max)
-        if active is not None:
-            query = query.filter(Service.is_active == active)
-        return query.offset(skip).limit(limit).all()
+            conditions.append(Service.price <= price_max)
+        return conditions
+
+    @staticmethod
+    def _active_conditions(active: bool | None) -> list:
+        return [] if active is None else [Service.is_active == active]
 
     @staticmethod
     def update_service(
-        db: Session, db_service: Service, service_in: ServiceUpdate
+        db: Session, service_id: int, service_in: ServiceUpdate
     ):
-        update_data = service_in.dict(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(db_service, key, value)
-        db.flush()
-        db.refresh(db_service)
+        """Apply ``service_in`` with one UPDATE ... RETURNING; None if there is no such service."""
+        update_data = service_in.model_dump(exclude_unset=True)
+        if not update_data:
+            return CRUDService.get_service(db, service_id)
+        db_service = db.scalars(
+            update(Service).where(Service.id == service_id).values(**update_data).returning(Service)
+        ).one_or_none()
+        if db_service is None:
+            return None
+        index_service(db, db_service)
+        service_cache.invalidate_on_commit(db)
         return db_service
 
     @staticmethod
     def delete_service(db: Session, db_service: Service):
+        remove_service(db, db_service.id)
+        service_cache.invalidate_on_commit(db)
         db.delete(db_service)
         db.commit()
         return db_service
     
     
-service_service = CRUDService()
\ No newline at end of file
+service_service = CRUDService()
+async_service_service = AsyncCRUD(service_service)
@@ -1,9 +1,15 @@
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from models.user import User
 from schemas.user import UserCreate, UserUpdate
+from pagination import paginate
+from principals import stage_user_change
+from crud.async_crud import AsyncCRUD
 
 
 class CRUDUser:
+    order_by = (User.created_at, User.id)
+
     @staticmethod
     def get_user(db: Session, user_id: int):
         return db.query(User).filter(User.id == user_id).first()
@@ -13,30 +19,39 @@ class CRUDUser:
         return db.query(User).filter(User.email == email).first()
 
     @staticmethod
-    def get_users(db: Session, skip: int = 0, limit: int = 100):
-        return db.query(User).offset(skip).limit(limit).all()
+    def get_users(db: Session, skip: int = 0, limit: int = 100, cursor: str | None = None):
+        return paginate(db.query(User), CRUDUser.order_by, cursor=cursor, skip=skip, limit=limit)
 
     @staticmethod
-    def create_user(db: Session, user: UserCreate):
-        from security import get_password_hash
-        hashed_password = get_password_hash(user.password)
+    def create_user(db: Session, user: UserCreate, password_hash: str | None = None):
+        """Create ``user``; pass ``password_hash`` if it was already hashed off-thread."""
+        if password_hash is None:
+            from security import get_password_hash
+            password_hash = get_password_hash(user.password)
         db_user = User(
             email=user.email, 
             name=user.name, 
-            password_hash=hashed_password)
+            password_hash=password_hash)
         db.add(db_user)
+        # INSERT ... RETURNING the id; every other column is set in Python
         db.flush()
-        db.refresh(db_user)
         return db_user
 
     @staticmethod
-    def update_user(db: Session, db_user: User, user_in: UserUpdate):
-        if user_in.name:
-            db_user.name = user_in.name
-        if user_in.email:
-            db_user.email = user_in.email
+    def set_password_hash(db: Session, db_user: User, password_hash: str):
+        db_user.password_hash = password_hash
         db.flush()
-        db.refresh(db_user)
+        return db_user
+
+    @staticmethod
+    def update_user(db: Session, user_id: int, user_in: UserUpdate):
+        """Apply ``user_in`` with one UPDATE ... RETURNING; None if there is no such user."""
+        values = {key: value for key, value in user_in.model_dump(include={"name", "email"}).items() if value}
+        if not values:
+            return CRUDUser.get_user(db, user_id)
+        db_user = db.scalars(update(User).where(User.id == user_id).values(**values).returning(User)).one_or_none()
+        if db_user is not None:
+            stage_user_change(db, user_id)
         return db_user
 
     @staticmethod
@@ -47,3 +62,4 @@ class CRUDUser:
 
 
 user_service = CRUDUser()
+async_user_service = AsyncCRUD(user_service)
@@ -1,22 +1,209 @@
 import os
+import time
+from contextlib import asynccontextmanager
+
+import anyio
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from pool_metrics import PoolMetrics, timed_pool_class
+from settings import settings
 
 load_dotenv()
 SQLALCHEMY_DATABASE_URL = os.environ.get("DATABASE_URL")
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def engine_options(url: str, pool_class: type[QueuePool], metrics: PoolMetrics) -> dict:
+    """create_engine keyword arguments for the pool settings.
+
+    In-memory SQLite keeps SQLAlchemy's single-connection pool, which has
+    no size or overflow.
+    """
+    options = {"pool_pre_ping": settings.DATABASE_POOL_PRE_PING, "pool_recycle": settings.DATABASE_POOL_RECYCLE}
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return options
+    return {
+        **options,
+        "poolclass": timed_pool_class(pool_class, metrics),
+        "pool_size": settings.DATABASE_POOL_SIZE,
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+        "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+    }
+
+
+pool_metrics = PoolMetrics()
+# Created by init_engine(), from the app's lifespan or the first session
+engine: Engine | None = None
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
 
 Base = declarative_base()
 
-from models import booking, review, service, user  
+
+def init_engine() -> Engine:
+    """The DATABASE_URL engine, created on the first call.
+
+    Creating it opens no connection; the pool connects on first checkout.
+    The schema is managed by Alembic (``alembic upgrade head``).
+    """
+    global engine
+    if engine is None:
+        engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL, QueuePool, pool_metrics))
+        pool_metrics.instrument(engine)
+        SessionLocal.configure(bind=engine)
+    return engine
+
+
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def async_database_url(url: str) -> str:
+    """``url`` with its async driver: asyncpg for PostgreSQL, aiosqlite for SQLite."""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend!r} databases")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+_async_engine = None
+_async_session_factory = None
+async_pool_metrics = PoolMetrics()
+
+
+def async_session_factory() -> async_sessionmaker:
+    """Factory for AsyncSessions on DATABASE_URL; the engine is created on first use."""
+    global _async_engine, _async_session_factory
+    if _async_session_factory is None:
+        url = async_database_url(SQLALCHEMY_DATABASE_URL)
+        _async_engine = create_async_engine(url, **engine_options(url, AsyncAdaptedQueuePool, async_pool_metrics))
+        async_pool_metrics.instrument(_async_engine.sync_engine)
+        # Rows stay readable after commit without a lazy load on the event loop
+        _async_session_factory = async_sessionmaker(
+            _async_engine, autoflush=False, expire_on_commit=False
+        )
+    return _async_session_factory
+
+
+async def dispose_async_engine():
+    """Close the async engine's pooled connections, if it was ever created."""
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = _async_session_factory = None
+
+
+def _pool_capacity(pool) -> int | None:
+    """Connections ``pool`` hands out before checkouts block, None if unbounded."""
+    if not isinstance(pool, QueuePool) or pool._max_overflow < 0:
+        return None
+    return pool.size() + pool._max_overflow
+
+
+class ThreadedSession:
+    """The part of AsyncSession's interface the routes use, over a sync Session.
+
+    Every call runs in the threadpool, so async routes keep working on the
+    sync driver when DATABASE_ASYNC is off. With ``slots``, a slot is held
+    from the first call until the session gives its connection back (commit,
+    rollback or close), so a route can release it during slow non-database
+    work with ``await db.rollback()``.
+    """
+
+    def __init__(self, session: Session, slots: anyio.Semaphore | None = None, metrics: PoolMetrics | None = None):
+        self.sync_session = session
+        self._slots = slots
+        self._metrics = metrics
+        self._holds_slot = False
+
+    async def _acquire_slot(self):
+        if self._slots is None or self._holds_slot:
+            return
+        started = time.perf_counter()
+        try:
+            with anyio.fail_after(settings.DATABASE_POOL_TIMEOUT):
+                await self._slots.acquire()
+        except TimeoutError:
+            if self._metrics is not None:
+                self._metrics.record_wait(time.perf_counter() - started, timed_out=True, slot=True)
+            # What the pool raises when a checkout waits out pool_timeout
+            raise exc.TimeoutError(
+                f"No connection slot free, timed out after {settings.DATABASE_POOL_TIMEOUT}s"
+            ) from None
+        if self._metrics is not None:
+            self._metrics.record_wait(time.perf_counter() - started, slot=True)
+        self._holds_slot = True
+
+    def _release_slot(self):
+        if self._holds_slot and not self.sync_session.in_transaction():
+            self._holds_slot = False
+            self._slots.release()
+
+    async def run_sync(self, fn, *args, **kwargs):
+        await self._acquire_slot()
+        try:
+            return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+        finally:
+            self._release_slot()
+
+    async def commit(self):
+        await run_in_threadpool(self.sync_session.commit)
+        self._release_slot()
+
+    async def rollback(self):
+        await run_in_threadpool(self.sync_session.rollback)
+        self._release_slot()
+
+    async def close(self):
+        await run_in_threadpool(self.sync_session.close)
+        self._release_slot()
+
+
+# A ThreadedSession keeps its connection between threadpool calls. With more
+# of them holding one than the pool holds, every thread can end up blocked in
+# checkout while the sessions holding connections wait for a thread, so
+# requests queue here, on the event loop, for a connection instead.
+_session_slots: dict[Engine, anyio.Semaphore | None] = {}
+
+
+@asynccontextmanager
+async def threaded_session(bind: Engine, metrics: PoolMetrics | None = None):
+    """A ThreadedSession on ``bind`` that waits for a free connection slot of
+    its pool before its first database call; waits are recorded in ``metrics``."""
+    if bind not in _session_slots:
+        capacity = _pool_capacity(bind.pool)
+        _session_slots[bind] = anyio.Semaphore(capacity) if capacity is not None else None
+    db = ThreadedSession(SessionLocal(bind=bind), _session_slots[bind], metrics)
+    try:
+        yield db
+    finally:
+        await db.close()
+
 
 def get_db():
+    init_engine()
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """An AsyncSession when DATABASE_ASYNC is on, else a ThreadedSession.
+
+    Either way ``await db.run_sync(fn, ...)`` calls ``fn(session, ...)``
+    with a sync Session, so CRUD code is shared by both modes.
+    """
+    if settings.DATABASE_ASYNC:
+        async with async_session_factory()() as db:
+            yield db
+        return
+    async with threaded_session(init_engine(), pool_metrics) as db:
+        yield db
@@ -0,0 +1,42 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+EXPORT_FIELDS = ("id", "user_id", "service_id", "start_time", "end_time", "status", "created_at")
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _plain(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return getattr(value, "value", value)
+
+
+def iter_ndjson(rows, chunk_rows: int = 1000):
+    """One JSON object per line, yielded ``chunk_rows`` lines at a time."""
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(EXPORT_FIELDS, map(_plain, row)))))
+        if len(lines) >= chunk_rows:
+            yield "\n".join(lines) + "\n"
+            lines.clear()
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def iter_csv(rows, chunk_rows: int = 1000):
+    """CSV with a header row, yielded ``chunk_rows`` rows at a time."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for i, row in enumerate(rows, 1):
+        writer.writerow([_plain(value) for value in row])
+        if i % chunk_rows == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+FORMATTERS = {"ndjson": iter_ndjson, "csv": iter_csv}
@@ -0,0 +1,75 @@
+import asyncio
+import threading
+from collections.abc import Iterable
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from sqlalchemy.util import await_only
+from sqlalchemy.util.concurrency import in_greenlet
+
+_HELD_KEY = "held_service_locks"
+# First key of pg_advisory_xact_lock(int, int), so booking locks cannot
+# collide with advisory locks taken for other purposes.
+BOOKING_LOCK_NAMESPACE = 0x426B
+
+# How often an AsyncSession waiting for a held service lock retries.
+LOCK_POLL_SECONDS = 0.001
+
+_service_locks: dict[int, threading.Lock] = {}
+_service_locks_guard = threading.Lock()
+
+
+def _process_lock(service_id: int) -> threading.Lock:
+    lock = _service_locks.get(service_id)
+    if lock is None:
+        with _service_locks_guard:
+            lock = _service_locks.setdefault(service_id, threading.Lock())
+    return lock
+
+
+def _acquire(lock: threading.Lock):
+    if not in_greenlet():
+        lock.acquire()
+        return
+    # Under an AsyncSession every transaction shares the event loop thread,
+    # so blocking here would stall the holder too; yield to the loop instead.
+    while not lock.acquire(blocking=False):
+        await_only(asyncio.sleep(LOCK_POLL_SECONDS))
+
+
+def lock_services(db: Session, service_ids: Iterable[int]):
+    """Serialise booking writes per service until the transaction ends.
+
+    Bookings for different services never wait on each other. Within this
+    process a per-service lock is held until commit or rollback, which also
+    covers the window in which the in-process booking index is updated. On
+    PostgreSQL a transaction-scoped advisory lock also serialises workers,
+    which only prevents overlaps when the conflict check reads the database
+    (BOOKING_INDEX_MODE "db", the PostgreSQL default): another worker's
+    commits are not in this process's index. Locks are taken in ascending service id order so batches
+    spanning several services cannot deadlock each other.
+    """
+    # Make sure a transaction is open so its end releases the locks.
+    db.connection()
+    held = db.info.setdefault(_HELD_KEY, {})
+    postgres = db.get_bind().dialect.name == "postgresql"
+    for service_id in sorted(set(service_ids) - held.keys()):
+        lock = _process_lock(service_id)
+        _acquire(lock)
+        held[service_id] = lock
+        if postgres:
+            db.execute(
+                text("SELECT pg_advisory_xact_lock(:namespace, :service_id)"),
+                {"namespace": BOOKING_LOCK_NAMESPACE, "service_id": service_id},
+            )
+
+
+def lock_service(db: Session, service_id: int):
+    lock_services(db, [service_id])
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _release_service_locks(session: Session, transaction):
+    if transaction.parent is None:
+        for lock in session.info.pop(_HELD_KEY, {}).values():
+            lock.release()
@@ -1,9 +1,34 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from routes import user, service, booking, review, auth
-import models.user, models.booking, models.service, models.review
-from database import engine, Base
+from routes import admin, user, service, booking, review, auth
+from database import SessionLocal, dispose_async_engine, init_engine
+from replicas import WriteTrackingMiddleware, init_replicas, read_router
+from scheduler import BookingSweeper
+from settings import settings
+
+
+# Importing the app touches no database: engines are created here (without
+# connecting) and the schema is Alembic's job (`alembic upgrade head`).
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    init_engine()
+    init_replicas()
+    app.state.booking_sweeper = None
+    if settings.BOOKING_SWEEP_ENABLED:
+        app.state.booking_sweeper = BookingSweeper(
+            SessionLocal,
+            interval_seconds=settings.BOOKING_SWEEP_INTERVAL_SECONDS,
+            batch_size=settings.BOOKING_SWEEP_BATCH_SIZE,
+            pending_grace_minutes=settings.PENDING_BOOKING_GRACE_MINUTES,
+        )
+        app.state.booking_sweeper.start()
+    yield
+    if app.state.booking_sweeper is not None:
+        app.state.booking_sweeper.stop()
+    await dispose_async_engine()
+    await read_router.dispose()
 
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     
@@ -11,14 +36,18 @@ app = FastAPI(
     description="API for managing serives, bookings, users, and reviews",
     version="0.1.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan,
     )
 
+app.add_middleware(WriteTrackingMiddleware)
+
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
 app.include_router(user.router, prefix="/users", tags=["users"])
 app.include_router(service.router, prefix="/services", tags=["services"])
 app.include_router(booking.router, prefix="/bookings", tags=["bookings"])
 app.include_router(review.router, prefix="/reviews", tags=["reviews"])
+app.include_router(admin.router, prefix="/admin", tags=["admin"])
 
 
 @app.get("/")
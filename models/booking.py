@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, DateTime, Enum as SQLAlchemyEnum, ForeignKey
+from sqlalchemy import Column, Integer, DateTime, Enum as SQLAlchemyEnum, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from database import Base
 from datetime import datetime
@@ -20,7 +20,19 @@ class Booking(Base):
     end_time = Column(DateTime)
     status = Column(SQLAlchemyEnum(BookingStatus), default=BookingStatus.pending)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     user = relationship("User", back_populates="bookings")
     service = relationship("Service", back_populates="bookings")
     review = relationship("Review", back_populates="booking", uselist=False)
+
+    __table_args__ = (
+        # Conflict checks, availability and the interval index warm-up
+        Index("ix_bookings_service_id_start_time_end_time", "service_id", "start_time", "end_time"),
+        # A user's own bookings
+        Index("ix_bookings_user_id_start_time", "user_id", "start_time"),
+        # Admin filtering by status and date window
+        Index("ix_bookings_status_start_time", "status", "start_time"),
+        # Keyset pagination over all bookings
+        Index("ix_bookings_start_time_id", "start_time", "id"),
+    )
@@ -7,9 +7,17 @@ class Review(Base):
     __tablename__ = "reviews"
 
     id = Column(Integer, primary_key=True, index=True)
-    booking_id = Column(Integer, ForeignKey("bookings.id"))
+    booking_id = Column(Integer, ForeignKey("bookings.id"), index=True)
     rating = Column(Integer)
     comment = Column(String)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     booking = relationship("Booking", back_populates="review")
+
+    @property
+    def booking_date(self):
+        return self.booking.start_time
+
+    @property
+    def reviewer_name(self) -> str | None:
+        return self.booking.user.name if self.booking.user else None
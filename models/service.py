@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Index, DDL, event
 from sqlalchemy.orm import relationship
 from database import Base
 from datetime import datetime
@@ -13,5 +13,50 @@ class Service(Base):
     duration_minutes = Column(Integer)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Kept in step by CRUDReview; rating_score is the average, 0 when unrated,
+    # stored so the rating filter and sort can use an index.
+    rating_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_sum = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_score = Column(Float, nullable=False, default=0.0, server_default="0")
 
     bookings = relationship("Booking", back_populates="service")
+
+    __table_args__ = (
+        # Keyset pagination
+        Index("ix_services_created_at_id", "created_at", "id"),
+        # ?min_rating= and ?sort=rating
+        Index("ix_services_rating_score_rating_count_id", "rating_score", "rating_count", "id"),
+    )
+
+    @property
+    def rating_average(self) -> float | None:
+        return self.rating_sum / self.rating_count if self.rating_count else None
+
+
+# Full-text search (see search.py). PostgreSQL keeps a generated tsvector
+# column with a GIN index; SQLite keeps an FTS5 table that CRUDService
+# updates alongside the row.
+event.listen(
+    Service.__table__,
+    "after_create",
+    DDL(
+        "ALTER TABLE services ADD COLUMN search_vector tsvector GENERATED ALWAYS AS "
+        "(to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, ''))) STORED"
+    ).execute_if(dialect="postgresql"),
+)
+event.listen(
+    Service.__table__,
+    "after_create",
+    DDL("CREATE INDEX ix_services_search_vector ON services USING gin (search_vector)").execute_if(dialect="postgresql"),
+)
+event.listen(
+    Service.__table__,
+    "after_create",
+    DDL("CREATE VIRTUAL TABLE IF NOT EXISTS services_fts USING fts5(title, description)").execute_if(dialect="sqlite"),
+)
+event.listen(
+    Service.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS services_fts").execute_if(dialect="sqlite"),
+)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Enum as SQLAlchemyEnum
+from sqlalchemy import Column, Integer, String, DateTime, Enum as SQLAlchemyEnum, Index
 from sqlalchemy.orm import relationship
 from database import Base
 from datetime import datetime
@@ -19,3 +19,8 @@ class User(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
     bookings = relationship("Booking", back_populates="user")
+
+    __table_args__ = (
+        # Keyset pagination
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
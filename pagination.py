@@ -0,0 +1,77 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(item, order_by) -> str:
+    values = []
+    for column in order_by:
+        value = getattr(item, column.key)
+        values.append(value.isoformat() if isinstance(value, datetime) else value)
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, order_by) -> tuple:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+    if not isinstance(values, list) or len(values) != len(order_by):
+        raise InvalidCursor("Invalid cursor")
+    try:
+        return tuple(
+            datetime.fromisoformat(value) if column.type.python_type is datetime else value
+            for column, value in zip(order_by, values)
+        )
+    except (TypeError, ValueError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+
+
+def paginate(
+    query: Query,
+    order_by,
+    cursor: str | None = None,
+    skip: int = 0,
+    limit: int = 100,
+    descending: bool = False,
+):
+    """Order ``query`` by the ``order_by`` columns and return one page of it.
+
+    With a ``cursor`` the page starts right after the row it was made from
+    (keyset pagination, constant cost at any depth); without one ``skip`` is
+    applied as a plain OFFSET for older clients. ``descending`` reverses
+    every column, so an index on them is walked backwards.
+    """
+    if descending:
+        query = query.order_by(*(column.desc() for column in order_by))
+    else:
+        query = query.order_by(*order_by)
+    if cursor:
+        position, after = tuple_(*order_by), tuple_(*decode_cursor(cursor, order_by))
+        query = query.filter(position < after if descending else position > after)
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit).all()
+
+
+def next_cursor(items: list, order_by, limit: int) -> str | None:
+    """Cursor for the page after ``items``, or ``None`` if it was not full."""
+    if not items or len(items) < limit:
+        return None
+    return encode_cursor(items[-1], order_by)
+
+
+def set_next_cursor(response, items: list, order_by, limit: int):
+    cursor = next_cursor(items, order_by, limit)
+    if cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
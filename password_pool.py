@@ -0,0 +1,50 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class PasswordPoolBusy(RuntimeError):
+    pass
+
+
+class PasswordPool:
+    """Dedicated threads for bcrypt, so hashing cannot starve the request pool.
+
+    bcrypt releases the GIL while it works, so threads hash in parallel. At
+    most ``workers + max_queue`` operations are admitted at a time; beyond
+    that ``submit`` raises PasswordPoolBusy and the caller sheds the request.
+    """
+
+    def __init__(self, context, workers: int = 2, max_queue: int = 32):
+        self.context = context
+        self.capacity = workers + max_queue
+        self.stats = {"completed": 0, "rejected": 0}
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password")
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def submit(self, fn, *args) -> Future:
+        with self._lock:
+            if self._pending >= self.capacity:
+                self.stats["rejected"] += 1
+                raise PasswordPoolBusy("Too many password operations in flight")
+            self._pending += 1
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(self._finished)
+        return future
+
+    def _finished(self, future: Future):
+        with self._lock:
+            self._pending -= 1
+            self.stats["completed"] += 1
+
+    async def hash(self, password: str) -> str:
+        return await asyncio.wrap_future(self.submit(self.context.hash, password))
+
+    async def verify_and_update(self, password: str, hashed: str) -> tuple[bool, str | None]:
+        """``(valid, new_hash)``; ``new_hash`` is set when the stored hash should be replaced."""
+        return await asyncio.wrap_future(self.submit(self.context.verify_and_update, password, hashed))
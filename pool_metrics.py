@@ -0,0 +1,130 @@
+import bisect
+import threading
+import time
+from itertools import accumulate
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool, QueuePool
+
+# Upper bounds (seconds) of the checkout wait histogram; the last bucket is open.
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+
+class PoolMetrics:
+    """Connection pool counters for one engine, fed by pool events.
+
+    Checkout waits are timed by the pool class from ``timed_pool_class``,
+    and waits for a ThreadedSession connection slot (which come before the
+    checkout) by ``database.ThreadedSession``; every other counter comes
+    from SQLAlchemy pool events, so they survive ``engine.dispose()``.
+    ``overflow_checkouts`` counts checkouts that found the core pool
+    exhausted, i.e. that needed ``max_overflow``.
+    """
+
+    def __init__(self):
+        self.stats = {
+            "checkouts": 0,
+            "checkins": 0,
+            "connects": 0,
+            "invalidations": 0,
+            "soft_invalidations": 0,
+            "timeouts": 0,
+            "slot_timeouts": 0,
+            "overflow_checkouts": 0,
+            "peak_checked_out": 0,
+        }
+        # Per histogram: bucket counts, total seconds, max seconds
+        self._waits = {
+            name: ([0] * (len(WAIT_BUCKETS) + 1), [0.0, 0.0]) for name in ("wait_seconds", "slot_wait_seconds")
+        }
+        self._checked_out = 0
+        self._pool: Pool | None = None
+        self._lock = threading.Lock()
+
+    def instrument(self, engine: Engine):
+        self._pool = engine.pool
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        event.listen(engine, "invalidate", self._on_invalidate)
+        event.listen(engine, "soft_invalidate", self._on_soft_invalidate)
+        # dispose() swaps in a fresh pool; keep reporting on the live one
+        event.listen(engine, "engine_disposed", lambda engine: setattr(self, "_pool", engine.pool))
+
+    def record_wait(self, seconds: float, timed_out: bool = False, slot: bool = False):
+        """Record a pool checkout wait, or with ``slot`` a session slot wait."""
+        counts, totals = self._waits["slot_wait_seconds" if slot else "wait_seconds"]
+        with self._lock:
+            counts[bisect.bisect_left(WAIT_BUCKETS, seconds)] += 1
+            totals[0] += seconds
+            totals[1] = max(totals[1], seconds)
+            if timed_out:
+                self.stats["slot_timeouts" if slot else "timeouts"] += 1
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.stats["connects"] += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        pool = self._pool
+        size = pool.size() if isinstance(pool, QueuePool) else None
+        with self._lock:
+            self._checked_out += 1
+            self.stats["checkouts"] += 1
+            self.stats["peak_checked_out"] = max(self.stats["peak_checked_out"], self._checked_out)
+            if size is not None and self._checked_out > size:
+                self.stats["overflow_checkouts"] += 1
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self._checked_out = max(0, self._checked_out - 1)
+            self.stats["checkins"] += 1
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.stats["invalidations"] += 1
+
+    def _on_soft_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.stats["soft_invalidations"] += 1
+
+    def snapshot(self) -> dict:
+        pool = self._pool
+        with self._lock:
+            snapshot = {**self.stats, "checked_out": self._checked_out}
+            for name, (counts, (total, longest)) in self._waits.items():
+                cumulative = list(accumulate(counts))
+                # Cumulative, like Prometheus histograms: le_X counts waits <= X seconds
+                snapshot[name] = {
+                    "count": cumulative[-1],
+                    "total": total,
+                    "max": longest,
+                    "buckets": {
+                        **{f"le_{bound:g}": count for bound, count in zip(WAIT_BUCKETS, cumulative)},
+                        "le_inf": cumulative[-1],
+                    },
+                }
+        if isinstance(pool, QueuePool):
+            snapshot.update(size=pool.size(), checked_in=pool.checkedin(), overflow_in_use=max(0, pool.overflow()))
+        return snapshot
+
+
+def timed_pool_class(base: type[Pool], metrics: PoolMetrics) -> type[Pool]:
+    """``base`` with checkout waits recorded in ``metrics``.
+
+    ``_do_get`` is the hook SQLAlchemy pool implementations override; the
+    subclass keeps working across ``Pool.recreate()``.
+    """
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = base._do_get(self)
+        except exc.TimeoutError:
+            metrics.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        metrics.record_wait(time.perf_counter() - started)
+        return connection
+
+    return type(f"Timed{base.__name__}", (base,), {"_do_get": _do_get})
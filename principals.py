@@ -0,0 +1,112 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from models.user import Role, User
+from settings import settings
+
+_CHANGED_KEY = "principal_cache_changed"
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user as routes see it; a detached copy of the row."""
+
+    id: int
+    name: str
+    email: str
+    role: Role
+    created_at: datetime
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(id=user.id, name=user.name, email=user.email, role=user.role, created_at=user.created_at)
+
+
+class PrincipalCache:
+    """Principals by user id, bounded by size (LRU) and age (TTL).
+
+    Committed ORM updates and deletes of a User drop its entry in this
+    worker; other workers catch up within the TTL. A load that started
+    before an invalidation is not stored.
+    """
+
+    def __init__(self, ttl_seconds: float = 60, max_entries: int = 10_000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+        self.generation = 0
+        self._entries: OrderedDict[int, tuple[float, Principal]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Principal | None:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] >= time.monotonic():
+                self._entries.move_to_end(user_id)
+                self.stats["hits"] += 1
+                return entry[1]
+            self._entries.pop(user_id, None)
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, principal: Principal, generation: int) -> Principal:
+        """Store ``principal`` unless an invalidation happened since ``generation``."""
+        with self._lock:
+            if generation == self.generation:
+                self._entries[principal.id] = (time.monotonic() + self.ttl_seconds, principal)
+                self._entries.move_to_end(principal.id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return principal
+
+    def invalidate(self, user_ids=None):
+        with self._lock:
+            self.generation += 1
+            self.stats["invalidations"] += 1
+            if user_ids is None:
+                self._entries.clear()
+            else:
+                for user_id in user_ids:
+                    self._entries.pop(user_id, None)
+
+
+principal_cache = PrincipalCache(
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+)
+
+
+def stage_user_change(session: Session, user_id: int):
+    """Drop ``user_id``'s principal once ``session`` commits.
+
+    Flushed ORM changes call this themselves; UPDATE statements, which
+    bypass mapper events, must call it.
+    """
+    session.info.setdefault(_CHANGED_KEY, set()).add(user_id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _stage_user_change(mapper, connection, target: User):
+    session = object_session(target)
+    if session is not None:
+        stage_user_change(session, target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session):
+    user_ids = session.info.pop(_CHANGED_KEY, None)
+    if user_ids:
+        principal_cache.invalidate(user_ids)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_changed(session: Session, transaction):
+    if transaction.parent is None:
+        session.info.pop(_CHANGED_KEY, None)
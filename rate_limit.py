@@ -0,0 +1,95 @@
+import math
+import threading
+import time
+from typing import Protocol
+
+from fastapi import HTTPException, Request, status
+
+from settings import settings
+
+
+class RateLimitBackend(Protocol):
+    def acquire(self, key: str, rate: float, burst: int) -> float:
+        """Take a token from ``key``'s bucket.
+
+        Returns 0 when granted, otherwise the seconds until one is available.
+        A shared store (e.g. Redis with a script doing the same arithmetic)
+        can implement this to limit across workers.
+        """
+
+
+class MemoryBackend:
+    """Token buckets in a dict of ``key -> (tokens, updated_at, full_at)``.
+
+    A bucket left idle until ``full_at`` has refilled completely, which is
+    the same as no bucket, so those are swept out every ``sweep_seconds``.
+    """
+
+    def __init__(self, sweep_seconds: float = 60, clock=time.monotonic):
+        self.sweep_seconds = sweep_seconds
+        self._clock = clock
+        self._buckets: dict[str, tuple[float, float, float]] = {}
+        self._next_sweep = clock() + sweep_seconds
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def acquire(self, key: str, rate: float, burst: int) -> float:
+        now = self._clock()
+        with self._lock:
+            if now >= self._next_sweep:
+                self._buckets = {key: bucket for key, bucket in self._buckets.items() if bucket[2] > now}
+                self._next_sweep = now + self.sweep_seconds
+            tokens, updated_at, _ = self._buckets.get(key, (burst, now, now))
+            tokens = min(burst, tokens + (now - updated_at) * rate)
+            granted = tokens >= 1
+            if granted:
+                tokens -= 1
+            self._buckets[key] = (tokens, now, now + (burst - tokens) / rate)
+            return 0.0 if granted else (1 - tokens) / rate
+
+
+class RateLimiter:
+    def __init__(self, name: str, per_minute: float, burst: int, backend: RateLimitBackend):
+        self.name = name
+        self.rate = per_minute / 60
+        self.burst = burst
+        self.backend = backend
+        self.stats = {"allowed": 0, "rejected": 0}
+
+    def check(self, key: str):
+        """Raise 429 with Retry-After when ``key`` is over its limit."""
+        if not settings.AUTH_RATE_LIMIT_ENABLED:
+            return
+        retry_after = self.backend.acquire(f"{self.name}:{key}", self.rate, self.burst)
+        if retry_after:
+            self.stats["rejected"] += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many attempts, try again later",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+        self.stats["allowed"] += 1
+
+
+auth_backend = MemoryBackend()
+auth_ip_limiter = RateLimiter(
+    "auth-ip", settings.AUTH_IP_RATE_PER_MINUTE, settings.AUTH_IP_BURST, auth_backend
+)
+auth_username_limiter = RateLimiter(
+    "auth-username", settings.AUTH_USERNAME_RATE_PER_MINUTE, settings.AUTH_USERNAME_BURST, auth_backend
+)
+
+
+def limit_auth_by_ip(request: Request):
+    """Dependency for the credential endpoints.
+
+    Keyed on the client address; behind a proxy, run uvicorn with
+    ``--proxy-headers`` so that is the forwarded one (see README).
+    """
+    auth_ip_limiter.check(request.client.host if request.client else "unknown")
+
+
+def limit_auth_by_username(username: str):
+    auth_username_limiter.check(username.strip().lower())
@@ -0,0 +1,226 @@
+import hashlib
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+
+from fastapi import Depends, Request
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+import database
+from database import async_database_url, engine_options, get_async_db, threaded_session
+from pool_metrics import PoolMetrics
+from settings import settings
+
+# Who the current request is, so commits can pin that client's reads.
+_client_key: ContextVar[bytes | None] = ContextVar("client_key", default=None)
+# Session.info key marking sessions on a replica
+_REPLICA_KEY = "replica"
+
+
+def from_replica(session: Session) -> bool:
+    """Whether ``session`` reads from a replica.
+
+    A lagging replica can return rows older than the primary's, so what it
+    renders must not fill the shared in-process caches: a client pinned to
+    the primary after a write would be served that stale copy.
+    """
+    return _REPLICA_KEY in session.info
+
+
+def client_key(request: Request) -> bytes:
+    """The bearer token, or the client address when there is none."""
+    identity = request.headers.get("authorization") or (request.client.host if request.client else "")
+    return hashlib.sha256(identity.encode()).digest()
+
+
+class WriteLog:
+    """Clients that committed a write within the last ``window_seconds``.
+
+    Their reads stay on the primary for that long, so they see their own
+    writes however far the replicas lag (up to the window).
+    """
+
+    def __init__(self, window_seconds: float = 5, max_entries: int = 100_000):
+        self.window_seconds = window_seconds
+        self.max_entries = max_entries
+        self._writes: OrderedDict[bytes, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def mark(self, key: bytes):
+        with self._lock:
+            self._writes[key] = time.monotonic() + self.window_seconds
+            self._writes.move_to_end(key)
+            while len(self._writes) > self.max_entries:
+                self._writes.popitem(last=False)
+
+    def is_recent(self, key: bytes) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            # Entries are in expiry order, so expired ones are at the front.
+            while self._writes and next(iter(self._writes.values())) < now:
+                self._writes.popitem(last=False)
+            return key in self._writes
+
+
+class Replica:
+    def __init__(self, engine: Engine, metrics: PoolMetrics):
+        self.engine = engine
+        self.metrics = metrics
+        self.name = engine.url.render_as_string(hide_password=True)
+        self.down_until = 0.0
+        self.stats = {"reads": 0, "failures": 0}
+        self._async_engine: AsyncEngine | None = None
+
+    def async_engine(self) -> AsyncEngine:
+        if self._async_engine is None:
+            url = async_database_url(self.engine.url.render_as_string(hide_password=False))
+            options = {**engine_options(url, AsyncAdaptedQueuePool, self.metrics), "pool_pre_ping": True}
+            self._async_engine = create_async_engine(url, **options)
+        return self._async_engine
+
+
+class ReadRouter:
+    """Sends read-only requests to replicas, round-robin, falling back to the primary.
+
+    A replica is health-checked when a read checks out a connection (its
+    pool pre-pings); one that fails is skipped for ``retry_seconds``. Reads
+    of clients in ``write_log`` go to the primary.
+    """
+
+    def __init__(self, replicas: list[Replica], retry_seconds: float = 30, write_log: WriteLog | None = None):
+        self.replicas = replicas
+        self.retry_seconds = retry_seconds
+        self.write_log = write_log or WriteLog()
+        self.stats = {"primary_reads": 0, "pinned_reads": 0, "fallbacks": 0}
+        self._next = itertools.count()
+
+    def add_replicas(self, urls: list[str]):
+        """Create engines for ``urls``; none of them connects until a read needs it."""
+        for url in urls:
+            metrics = PoolMetrics()
+            engine = create_engine(url, **{**engine_options(url, QueuePool, metrics), "pool_pre_ping": True})
+            metrics.instrument(engine)
+            self.replicas.append(Replica(engine, metrics))
+
+    def candidates(self) -> list[Replica]:
+        """Healthy replicas, starting one further along on every call."""
+        if not self.replicas:
+            return []
+        start = next(self._next) % len(self.replicas)
+        now = time.monotonic()
+        rotated = self.replicas[start:] + self.replicas[:start]
+        return [replica for replica in rotated if replica.down_until <= now]
+
+    def mark_down(self, replica: Replica):
+        replica.down_until = time.monotonic() + self.retry_seconds
+        replica.stats["failures"] += 1
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        return {
+            **self.stats,
+            "replicas": {
+                replica.name: {**replica.stats, "healthy": replica.down_until <= now, "pool": replica.metrics.snapshot()}
+                for replica in self.replicas
+            },
+        }
+
+    async def dispose(self):
+        for replica in self.replicas:
+            replica.engine.dispose()
+            if replica._async_engine is not None:
+                await replica._async_engine.dispose()
+
+
+def _replica_urls() -> list[str]:
+    return [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+
+
+# Replicas are added by init_replicas(), from the app's lifespan
+read_router = ReadRouter(
+    [],
+    retry_seconds=settings.DATABASE_REPLICA_RETRY_SECONDS,
+    write_log=WriteLog(settings.DATABASE_READ_YOUR_WRITES_SECONDS),
+)
+
+
+def init_replicas():
+    if not read_router.replicas:
+        read_router.add_replicas(_replica_urls())
+
+
+class WriteTrackingMiddleware:
+    """Remembers who the request is for the commit listener below.
+
+    Pure ASGI, so the context variable is set in the task that runs the
+    endpoint (and is copied into the threadpool with it).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not read_router.replicas:
+            await self.app(scope, receive, send)
+            return
+        token = _client_key.set(client_key(Request(scope)))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _client_key.reset(token)
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_writer(session: Session):
+    key = _client_key.get()
+    if key is not None and read_router.replicas:
+        read_router.write_log.mark(key)
+
+
+@asynccontextmanager
+async def _replica_session(replica: Replica):
+    if settings.DATABASE_ASYNC:
+        async with database.async_session_factory()(bind=replica.async_engine()) as db:
+            db.sync_session.info[_REPLICA_KEY] = replica.name
+            yield db
+    else:
+        async with threaded_session(replica.engine, replica.metrics) as db:
+            db.sync_session.info[_REPLICA_KEY] = replica.name
+            yield db
+
+
+async def get_read_db(request: Request, primary: AsyncSession = Depends(get_async_db)):
+    """A session for read-only routes: a healthy replica, else the primary.
+
+    Without DATABASE_REPLICA_URLS, and for clients that wrote recently,
+    this is the request's ``get_async_db`` session, the one
+    ``get_current_user`` uses too; a second primary session per request
+    could wait forever for a connection slot held by the first. That
+    session opens lazily: it takes no connection (nor slot) until its first
+    query, so a replica read never touches the primary pool.
+    """
+    router = read_router
+    if router.replicas and not router.write_log.is_recent(client_key(request)):
+        for replica in router.candidates():
+            async with _replica_session(replica) as db:
+                try:
+                    # Check out (and pre-ping) now, so a dead replica is skipped
+                    await db.run_sync(Session.connection)
+                except (exc.DBAPIError, exc.TimeoutError):
+                    router.mark_down(replica)
+                    continue
+                replica.stats["reads"] += 1
+                yield db
+                return
+        router.stats["fallbacks"] += 1
+    elif router.replicas:
+        router.stats["pinned_reads"] += 1
+    router.stats["primary_reads"] += 1
+    yield primary
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+
+from database import async_pool_metrics, pool_metrics
+from models.user import Role, User
+from principals import principal_cache
+from replicas import read_router
+from rate_limit import auth_ip_limiter, auth_username_limiter
+from security import get_current_user, password_pool, token_cache
+from service_cache import service_cache
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def get_metrics(request: Request, current_user: User = Depends(get_current_user)):
+    """
+    Counters of this worker, for sizing pools and caches from data.
+    - `database_pool` / `async_database_pool`: checkouts, checkout wait
+      histogram (seconds), overflow use, timeouts and invalidations.
+    - `read_replicas`: reads per replica, health, fallbacks to the primary.
+    - Hit/miss counters of the in-process caches, password pool and rate limits.
+    Admins only.
+    """
+    if current_user.role != Role.admin:
+        raise HTTPException(status_code=403, detail="Not authorized to read metrics")
+    sweeper = getattr(request.app.state, "booking_sweeper", None)
+    return {
+        "database_pool": pool_metrics.snapshot(),
+        "async_database_pool": async_pool_metrics.snapshot(),
+        "read_replicas": read_router.snapshot(),
+        "service_cache": service_cache.snapshot(),
+        "principal_cache": dict(principal_cache.stats),
+        "token_cache": dict(token_cache.stats),
+        "password_pool": dict(password_pool.stats),
+        "rate_limits": {"auth_ip": dict(auth_ip_limiter.stats), "auth_username": dict(auth_username_limiter.stats)},
+        "booking_sweeper": dict(sweeper.stats) if sweeper is not None else None,
+    }
@@ -1,55 +1,109 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from schemas.user import User, UserCreate
-from database import get_db
-from crud.crud_user import user_service
+from database import get_async_db
+from crud.crud_user import async_user_service, user_service
+from rate_limit import limit_auth_by_ip, limit_auth_by_username
 from security import (
-    verify_password, 
+    hash_password_async,
+    verify_password_async,
     create_access_token, 
     create_refresh_token, 
     get_current_user,
-    decode_token
+    oauth2_scheme,
+    revoke_token,
 )
 
 router = APIRouter()
 
-@router.post("/register", response_model=User, tags=["auth"])
-def register(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = user_service.get_user_by_email(db, email=user.email)
+
+def commit_new_user(db: Session, user: UserCreate, password_hash: str):
+    created_user = user_service.create_user(db=db, user=user, password_hash=password_hash)
+    # Serialise before committing so it is not reloaded on the event loop
+    created = User.model_validate(created_user)
+    db.commit()
+    return created
+
+
+def commit_password_hash(db: Session, user_id: int, password_hash: str):
+    user_service.set_password_hash(db, user_service.get_user(db, user_id=user_id), password_hash)
+    db.commit()
+
+
+async def create_user_with_password(db: AsyncSession, user: UserCreate) -> User:
+    """Create ``user`` unless the email is taken, hashing on the password pool.
+
+    Shared by POST /auth/register and POST /users/.
+    """
+    db_user = await async_user_service.get_user_by_email(db, email=user.email)
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered",
         )
+    # Give the connection back while bcrypt runs; the insert takes one again
+    await db.rollback()
+    password_hash = await hash_password_async(user.password)
     try:
-        created_user=user_service.create_user(db=db, user=user)
-        db.commit()
-        return created_user
-
+        return await db.run_sync(commit_new_user, user, password_hash)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/login", tags=["auth"])
-def login(db: Session = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()):
-    user = user_service.get_user_by_email(db, email=form_data.username)
-    if not user or not verify_password(form_data.password, user.password_hash):
+
+@router.post("/register", response_model=User, tags=["auth"], dependencies=[Depends(limit_auth_by_ip)])
+async def register(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    """bcrypt runs in the password pool, so a registration burst is shed
+    with 429 instead of stalling the API."""
+    limit_auth_by_username(user.email)
+    return await create_user_with_password(db, user)
+
+@router.post("/login", tags=["auth"], dependencies=[Depends(limit_auth_by_ip)])
+async def login(db: AsyncSession = Depends(get_async_db), form_data: OAuth2PasswordRequestForm = Depends()):
+    """Verifies on the password pool (429 when saturated) and transparently
+    rehashes passwords stored with an outdated bcrypt cost."""
+    limit_auth_by_username(form_data.username)
+    db_user = await async_user_service.get_user_by_email(db, email=form_data.username)
+    # Read the row, then give the connection back while bcrypt runs; only a
+    # rehash takes one again
+    user = User.model_validate(db_user) if db_user else None
+    password_hash = db_user.password_hash if db_user else None
+    await db.rollback()
+    valid, new_hash = (False, None)
+    if user:
+        valid, new_hash = await verify_password_async(form_data.password, password_hash)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token = create_access_token(sub=user.email, roles=[user.role.value if hasattr(user.role, 'value') else user.role])
-    refresh_token = create_refresh_token(sub=user.email)
+    access_token = create_access_token(
+        sub=user.email, roles=[user.role.value if hasattr(user.role, 'value') else user.role], user_id=user.id
+    )
+    refresh_token = create_refresh_token(sub=user.email, user_id=user.id)
+    if new_hash:
+        await db.run_sync(commit_password_hash, user.id, new_hash)
     return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
 
 @router.post("/token/refresh", tags=["auth"])
-def refresh_token(current_user: User = Depends(get_current_user)):
-    access_token = create_access_token(sub=current_user.email, roles=[current_user.role.value if hasattr(current_user.role, 'value') else current_user.role])
+async def refresh_token(current_user: User = Depends(get_current_user)):
+    access_token = create_access_token(
+        sub=current_user.email,
+        roles=[current_user.role.value if hasattr(current_user.role, 'value') else current_user.role],
+        user_id=current_user.id,
+    )
     return {"access_token": access_token, "token_type": "bearer"}
 
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT, tags=["auth"])
+async def logout(token: str = Depends(oauth2_scheme), current_user: User = Depends(get_current_user)):
+    """Revoke the bearer token used for this request."""
+    revoke_token(token)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
 @router.get("/users/me", response_model=User, tags=["users"])
-def read_users_me(current_user: User = Depends(get_current_user)):
+async def read_users_me(current_user: User = Depends(get_current_user)):
     return current_user
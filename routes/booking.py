@@ -1,94 +1,297 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Literal, Optional
 from datetime import datetime
 
-from database import get_db
+from booking_index import is_active
+from database import get_async_db, get_db
 from schemas import booking as booking_schema
-from crud.crud_booking import booking_service
+from crud.crud_booking import async_booking_service, booking_service
 from models import user as user_model
 from security import get_current_user
+from locks import lock_service, lock_services
+from replicas import get_read_db
+from pagination import NEXT_CURSOR_HEADER, InvalidCursor, next_cursor
+from conditional import last_modified, not_modified, validator_headers, version_etag
+from export import FORMATTERS, MEDIA_TYPES
 
 router = APIRouter()
 
+def _create_booking(db: Session, booking: booking_schema.BookingCreate):
+    # Validate overlaps/conflicts while holding the service's booking lock
+    lock_service(db, booking.service_id)
+    if booking_service.has_conflict(
+        db,
+        start_time=booking.start_time,
+        end_time=booking.end_time,
+        service_id=booking.service_id,
+    ):
+        # Release the service lock now, not at session teardown
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Booking conflict")
+
+    created_booking = booking_schema.Booking.model_validate(booking_service.create_booking(db=db, booking=booking))
+    db.commit()
+    return created_booking
+
+
 @router.post("/", response_model=booking_schema.Booking)
-def create_booking(
+async def create_booking(
     booking: booking_schema.BookingCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: user_model.User = Depends(get_current_user),
 ):
     """
     Create a new booking.
     """
     try:
-        # Validate overlaps/conflicts
-        conflicting_bookings = booking_service.get_conflicting_bookings(
-            db,
-            start_time=booking.start_time,
-            end_time=booking.end_time,
-            service_id=booking.service_id,
-        )
-        if conflicting_bookings:
-            raise HTTPException(status_code=409, detail="Booking conflict")
-
         booking.user_id = current_user.id
-        created_booking= booking_service.create_booking(db=db, booking=booking)
-        db.commit()
-        return created_booking
-    
+        return await db.run_sync(_create_booking, booking)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _create_bookings(db: Session, bookings: list[booking_schema.BookingCreate]):
+    lock_services(db, {booking.service_id for booking in bookings})
+    results = booking_service.create_bookings(db=db, bookings=bookings)
+    # Serialise before committing so expired rows are not reloaded one by one.
+    items = [
+        {
+            "index": i,
+            "created": created is not None,
+            "booking": booking_schema.Booking.model_validate(created) if created is not None else None,
+            "detail": detail,
+        }
+        for i, (created, detail) in enumerate(results)
+    ]
+    db.commit()
+    return items
+
+
+@router.post("/batch", response_model=booking_schema.BookingBatchResult)
+async def create_bookings_batch(
+    batch: booking_schema.BookingBatchCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: user_model.User = Depends(get_current_user),
+):
+    """
+    Create many bookings in one transaction.
+    - Items are checked in order against existing bookings and earlier items.
+    - Conflicting or invalid items are reported and skipped; the rest are created.
+    """
+    try:
+        for booking in batch.bookings:
+            booking.user_id = current_user.id
+        items = await db.run_sync(_create_bookings, batch.bookings)
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+    created_count = sum(item["created"] for item in items)
+    return {"created": created_count, "failed": len(items) - created_count, "results": items}
+
+
 @router.get("/", response_model=List[booking_schema.Booking])
-def get_bookings(
-    status: Optional[str] = Query(None),
+async def get_bookings(
+    response: Response,
+    status: Optional[booking_schema.BookingStatus] = Query(None),
     from_date: Optional[datetime] = Query(None),
     to_date: Optional[datetime] = Query(None),
-    db: Session = Depends(get_db),
+    service_id: Optional[int] = Query(None),
+    user_id: Optional[int] = Query(None),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_db),
     current_user: user_model.User = Depends(get_current_user),
 ):
     """
-    Retrieve bookings.
+    Retrieve bookings ordered by start time.
     - Users can only see their own bookings.
-    - Admins can see all bookings and filter by status, from_date, and to_date.
+    - Admins can see all bookings and filter by status, service_id, user_id,
+      and a from_date/to_date window on the start time.
+    - Pass the X-Next-Cursor response header back as `cursor` for the next page.
+    - Send the page's ETag back as If-None-Match to get 304 if it is unchanged.
     """
     try:
         if current_user.role == user_model.Role.admin:
-            return booking_service.get_all_bookings(db, status=status, from_date=from_date, to_date=to_date)
+            def fetch(versions_only=False):
+                return async_booking_service.get_all_bookings(
+                    db,
+                    status=status,
+                    from_date=from_date,
+                    to_date=to_date,
+                    service_id=service_id,
+                    user_id=user_id,
+                    skip=skip,
+                    limit=limit,
+                    cursor=cursor,
+                    versions_only=versions_only,
+                )
         else:
-            return booking_service.get_bookings(db, user_id=current_user.id)
+            def fetch(versions_only=False):
+                return async_booking_service.get_bookings(
+                    db, user_id=current_user.id, skip=skip, limit=limit, cursor=cursor, versions_only=versions_only
+                )
+
+        if if_none_match:
+            versions = await fetch(versions_only=True)
+            etag = version_etag(versions)
+            # Last-Modified cannot reflect rows leaving the page, so lists
+            # only honour If-None-Match.
+            if not_modified(if_none_match, None, etag, None):
+                headers = validator_headers(etag, last_modified(versions), "private, no-cache")
+                cursor_out = next_cursor(versions, booking_service.order_by, limit)
+                if cursor_out is not None:
+                    headers[NEXT_CURSOR_HEADER] = cursor_out
+                return Response(status_code=304, headers=headers)
+
+        bookings = await fetch()
+        response.headers.update(validator_headers(version_etag(bookings), last_modified(bookings), "private, no-cache"))
+        cursor_out = next_cursor(bookings, booking_service.order_by, limit)
+        if cursor_out is not None:
+            response.headers[NEXT_CURSOR_HEADER] = cursor_out
+        return bookings
+    except HTTPException:
+        raise
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/export")
+def export_bookings(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    status: Optional[booking_schema.BookingStatus] = Query(None),
+    from_date: Optional[datetime] = Query(None),
+    to_date: Optional[datetime] = Query(None),
+    service_id: Optional[int] = Query(None),
+    user_id: Optional[int] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: user_model.User = Depends(get_current_user),
+):
+    """
+    Stream bookings as NDJSON or CSV, ordered by start time.
+    - Accepts the same filters as the admin listing.
+    - Users can only export their own bookings.
+    """
+    if current_user.role != user_model.Role.admin:
+        user_id = current_user.id
+    # Rows are fetched while the response streams, outside any greenlet, so
+    # the export keeps the sync session even when DATABASE_ASYNC is on.
+    rows = booking_service.iter_bookings(
+        db, status=status, from_date=from_date, to_date=to_date, service_id=service_id, user_id=user_id
+    )
+
+    def stream():
+        # The request's session is closed once the endpoint returns; it is
+        # reopened on first use here, so close it again when streaming ends.
+        try:
+            yield from FORMATTERS[export_format](rows)
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        stream(),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="bookings.{export_format}"'},
+    )
+
+
 @router.get("/{booking_id}", response_model=booking_schema.Booking)
-def get_booking(
+async def get_booking(
     booking_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_db),
     current_user: user_model.User = Depends(get_current_user),
 ):
     """
     Retrieve a specific booking.
     - Users can only retrieve their own bookings.
     - Admins can retrieve any booking.
+    - Supports If-None-Match and If-Modified-Since (304 when unchanged).
     """
     try:
-        db_booking = booking_service.get_booking(db, booking_id=booking_id)
-        if db_booking is None:
+        version = await async_booking_service.get_booking_version(db, booking_id=booking_id)
+        if version is None:
             raise HTTPException(status_code=404, detail="Booking not found")
-        if not current_user.role == user_model.Role.admin and db_booking.user_id != current_user.id:
+        if not current_user.role == user_model.Role.admin and version.user_id != current_user.id:
             raise HTTPException(status_code=403, detail="Not authorized to access this booking")
+        etag = version_etag([version])
+        headers = validator_headers(etag, version.updated_at, "private, no-cache")
+        if not_modified(if_none_match, if_modified_since, etag, version.updated_at):
+            return Response(status_code=304, headers=headers)
+
+        db_booking = await async_booking_service.get_booking(db, booking_id=booking_id)
+        if db_booking is None:
+            raise HTTPException(status_code=404, detail="Booking not found")
+        response.headers.update(validator_headers(version_etag([db_booking]), db_booking.updated_at, "private, no-cache"))
         return db_booking
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _update_booking(db: Session, booking_id: int, booking: booking_schema.BookingUpdate, current_user: user_model.User):
+    db_booking = booking_service.get_booking(db, booking_id=booking_id)
+    if db_booking is None:
+        raise HTTPException(status_code=404, detail="Booking not found")
+
+    is_owner = db_booking.user_id == current_user.id
+    is_admin = current_user.role == user_model.Role.admin
+
+    if not is_owner and not is_admin:
+        raise HTTPException(status_code=403, detail="Not authorized to update this booking")
+
+    if is_owner:
+        if db_booking.status not in ["pending", "confirmed"]:
+            raise HTTPException(status_code=403, detail="Booking cannot be rescheduled or cancelled in its current status")
+        if booking.status and booking.status not in ["pending", "cancelled"]:
+            raise HTTPException(status_code=403, detail="You can only change the status to 'pending' or 'cancelled'")
+
+    if is_admin:
+        if booking.status and booking.status not in ["pending", "confirmed", "cancelled"]:
+            raise HTTPException(status_code=403, detail="Invalid status")
+
+    # Validate overlaps/conflicts of the resulting interval if it moves, or if
+    # a cancelled booking becomes active again
+    start_time = booking.start_time or db_booking.start_time
+    end_time = booking.end_time or db_booking.end_time
+    moved = (start_time, end_time) != (db_booking.start_time, db_booking.end_time)
+    reactivated = not is_active(db_booking.status)
+    if is_active(booking.status or db_booking.status) and (moved or reactivated):
+        lock_service(db, db_booking.service_id)
+        if booking_service.has_conflict(
+            db,
+            start_time=start_time,
+            end_time=end_time,
+            service_id=db_booking.service_id,
+            booking_id=booking_id,
+        ):
+            db.rollback()
+            raise HTTPException(status_code=409, detail="Booking conflict")
+
+    updated_booking = booking_schema.Booking.model_validate(
+        booking_service.update_booking(db=db, booking_id=booking_id, booking=booking)
+    )
+    db.commit()
+    return updated_booking
+
+
 @router.patch("/{booking_id}", response_model=booking_schema.Booking)
-def update_booking(
+async def update_booking(
     booking_id: int,
     booking: booking_schema.BookingUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: user_model.User = Depends(get_current_user),
 ):
     """
@@ -97,50 +300,17 @@ def update_booking(
     - Admin can update status.
     """
     try:
-        db_booking = booking_service.get_booking(db, booking_id=booking_id)
-        if db_booking is None:
-            raise HTTPException(status_code=404, detail="Booking not found")
-
-        is_owner = db_booking.user_id == current_user.id
-        is_admin = current_user.role == user_model.Role.admin
-
-        if not is_owner and not is_admin:
-            raise HTTPException(status_code=403, detail="Not authorized to update this booking")
-
-        if is_owner:
-            if db_booking.status not in ["pending", "confirmed"]:
-                raise HTTPException(status_code=403, detail="Booking cannot be rescheduled or cancelled in its current status")
-            if booking.status and booking.status not in ["pending", "cancelled"]:
-                raise HTTPException(status_code=403, detail="You can only change the status to 'pending' or 'cancelled'")
-
-        if is_admin:
-            if booking.status and booking.status not in ["pending", "confirmed", "cancelled"]:
-                raise HTTPException(status_code=403, detail="Invalid status")
-
-        # Validate overlaps/conflicts if rescheduling
-        if booking.start_time and booking.end_time:
-            conflicting_bookings = booking_service.get_conflicting_bookings(
-                db,
-                start_time=booking.start_time,
-                end_time=booking.end_time,
-                service_id=db_booking.service_id,
-                booking_id=booking_id,
-            )
-            if conflicting_bookings:
-                raise HTTPException(status_code=409, detail="Booking conflict")
-
-        updated_booking= booking_service.update_booking(db=db, booking_id=booking_id, booking=booking)
-        db.commit()
-        return updated_booking
-    
+        return await db.run_sync(_update_booking, booking_id, booking, current_user)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.delete("/{booking_id}", response_model=booking_schema.Booking)
-def delete_booking(
+async def delete_booking(
     booking_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: user_model.User = Depends(get_current_user),
 ):
     """
@@ -149,7 +319,7 @@ def delete_booking(
     - Admin can delete anytime.
     """
     try:
-        db_booking = booking_service.get_booking(db, booking_id=booking_id)
+        db_booking = await async_booking_service.get_booking(db, booking_id=booking_id)
         if db_booking is None:
             raise HTTPException(status_code=404, detail="Booking not found")
 
@@ -162,6 +332,8 @@ def delete_booking(
         if is_owner and datetime.utcnow() >= db_booking.start_time:
             raise HTTPException(status_code=403, detail="Cannot delete a booking that has already started")
 
-        return booking_service.delete_booking(db=db, booking_id=booking_id)
+        return await async_booking_service.delete_booking(db, booking_id=booking_id)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
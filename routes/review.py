@@ -1,70 +1,129 @@
 
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from schemas.review import Review, ReviewCreate, ReviewUpdate
-from crud.crud_review import review_service
-from database import get_db
+from schemas.review import Review, ReviewCreate, ReviewExpanded, ReviewUpdate
+from crud.crud_review import async_review_service, review_service
+from database import get_async_db
+from replicas import get_read_db
+from pagination import NEXT_CURSOR_HEADER, InvalidCursor, next_cursor
 from security import get_current_user
-from models.user import User
-from models.booking import Booking
+from models.user import Role, User
+from models.booking import Booking, BookingStatus
 from models.review import Review as ReviewModel
 
 router = APIRouter()
 
+_review_list_json = TypeAdapter(list[Review])
+_review_expanded_list_json = TypeAdapter(list[ReviewExpanded])
+
+def _create_review(db: Session, review: ReviewCreate, user_id: int):
+    booking = db.query(Booking).filter(Booking.id == review.booking_id, Booking.user_id == user_id).first()
+    if not booking:
+        raise HTTPException(status_code=404, detail="Booking not found or you are not the owner")
+    if booking.status != BookingStatus.completed:
+        raise HTTPException(status_code=400, detail="Booking is not completed")
+    existing_review = db.query(ReviewModel).filter(ReviewModel.booking_id == review.booking_id).first()
+    if existing_review:
+        raise HTTPException(status_code=400, detail="A review for this booking already exists")
+    created_review = Review.model_validate(review_service.create_review(db=db, review=review), from_attributes=True)
+    db.commit()
+    return created_review
+
+
+def _update_review(db: Session, review_id: int, review: ReviewUpdate, user_id: int):
+    db_review = review_service.get_review(db, review_id)
+    if not db_review:
+        raise HTTPException(status_code=404, detail="Review not found")
+    if db_review.booking.user_id != user_id:
+        raise HTTPException(status_code=403, detail="Not authorized to update this review")
+    updated_review = Review.model_validate(
+        review_service.update_review(db=db, review_id=review_id, review=review), from_attributes=True
+    )
+    db.commit()
+    return updated_review
+
+
+def _delete_review(db: Session, review_id: int, current_user: User):
+    db_review = review_service.get_review(db, review_id)
+    if not db_review:
+        raise HTTPException(status_code=404, detail="Review not found")
+
+    booking = db.query(Booking).filter(Booking.id == db_review.booking_id).first()
+
+    if booking.user_id != current_user.id and current_user.role != Role.admin:
+        raise HTTPException(status_code=403, detail="Not authorized to delete this review")
+
+    review_service.delete_review(db=db, review_id=review_id)
+    return db_review
+
+
 @router.post("/reviews", response_model=Review)
-def create_review(review: ReviewCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def create_review(
+    review: ReviewCreate, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)
+):
     try:
-        booking = db.query(Booking).filter(Booking.id == review.booking_id, Booking.user_id == current_user.id).first()
-        if not booking:
-            raise HTTPException(status_code=404, detail="Booking not found or you are not the owner")
-        if booking.status != "completed":
-            raise HTTPException(status_code=400, detail="Booking is not completed")
-        existing_review = db.query(ReviewModel).filter(ReviewModel.booking_id == review.booking_id).first()
-        if existing_review:
-            raise HTTPException(status_code=400, detail="A review for this booking already exists")
-        created_review= review_service.create_review(db=db, review=review, user_id=current_user.id)
-        db.commit()
-        return created_review
+        return await db.run_sync(_create_review, review, current_user.id)
+    except HTTPException:
+        raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/services/{service_id}/reviews", response_model=list[Review])
-def read_reviews_for_service(service_id: int, db: Session = Depends(get_db)):
+@router.get("/services/{service_id}/reviews", response_model=list[ReviewExpanded] | list[Review])
+async def read_reviews_for_service(
+    service_id: int,
+    limit: int = Query(100, ge=1, le=100),
+    cursor: str | None = None,
+    sort: Literal["created", "recent", "rating"] = "created",
+    expand: bool = False,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    One page of a service's reviews, oldest first unless `sort` is `recent`
+    or `rating` (highest first).
+    Pass the X-Next-Cursor response header back as `cursor` for the next page.
+    `expand=true` adds `reviewer_name` and `booking_date` to each review.
+    """
     try:
-        reviews = review_service.get_reviews_by_service(db, service_id=service_id)
-        return reviews
+        reviews = await async_review_service.get_reviews_by_service(
+            db, service_id=service_id, limit=limit, cursor=cursor, sort=sort, expand=expand
+        )
+        adapter = _review_expanded_list_json if expand else _review_list_json
+        body = adapter.dump_json(adapter.validate_python(reviews, from_attributes=True))
+        cursor_out = next_cursor(reviews, review_service.sorts[sort][0], limit)
+        headers = {NEXT_CURSOR_HEADER: cursor_out} if cursor_out else None
+        return Response(content=body, media_type="application/json", headers=headers)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.patch("/reviews/{review_id}", response_model=Review)
-def update_review(review_id: int, review: ReviewUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def update_review(
+    review_id: int,
+    review: ReviewUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
     try:
-        db_review = review_service.get_review(db, review_id)
-        if not db_review:
-            raise HTTPException(status_code=404, detail="Review not found")
-        if db_review.user_id != current_user.id:
-            raise HTTPException(status_code=403, detail="Not authorized to update this review")
-        updated_review= review_service.update_review(db=db, review_id=review_id, review=review)
-        db.commit()
-        return updated_review
+        return await db.run_sync(_update_review, review_id, review, current_user.id)
+    except HTTPException:
+        raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/reviews/{review_id}", response_model=Review)
-def delete_review(review_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def delete_review(
+    review_id: int, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)
+):
     try:
-        db_review = review_service.get_review(db, review_id)
-        if not db_review:
-            raise HTTPException(status_code=404, detail="Review not found")
-        
-        booking = db.query(Booking).filter(Booking.id == db_review.booking_id).first()
-
-        if booking.user_id != current_user.id and not current_user.is_admin:
-            raise HTTPException(status_code=403, detail="Not authorized to delete this review")
-            
-        review_service.delete_review(db=db, review_id=review_id)
-        return db_review
+        return await db.run_sync(_delete_review, review_id, current_user)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,74 +1,250 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from typing import Literal
 
-from crud.crud_service import service_service
-from database import get_db
-from schemas.service import Service, ServiceCreate, ServiceUpdate
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from availability import availability_cache
+from calendar_feed import FEED_HISTORY, feed_response, render_calendar
+from conditional import content_etag, last_modified, not_modified, validator_headers, version_etag
+from crud.crud_booking import booking_service
+from crud.crud_service import DEFAULT_PRICE_EDGES, async_service_service, service_service
+from database import get_async_db
+from replicas import from_replica, get_read_db
+from pagination import NEXT_CURSOR_HEADER, InvalidCursor, next_cursor
+from schemas.service import Availability, Service, ServiceCreate, ServicePage, ServiceUpdate
+from service_cache import service_cache
 
 router = APIRouter()
 
+_service_json = TypeAdapter(Service)
+_service_list_json = TypeAdapter(list[Service])
+_service_page_json = TypeAdapter(ServicePage)
+
+MAX_PRICE_EDGES = 20
 
-@router.get("/", response_model=list[Service])
-def get_services(
-    db: Session = Depends(get_db),
+
+@router.get("/", response_model=list[Service] | ServicePage)
+async def get_services(
+    db: AsyncSession = Depends(get_read_db),
     skip: int = 0,
     limit: int = 100,
     q: str | None = None,
     price_min: float | None = None,
     price_max: float | None = None,
     active: bool | None = None,
+    cursor: str | None = None,
+    search: Literal["substring", "fulltext"] = "substring",
+    min_rating: float | None = None,
+    sort: Literal["created", "rating"] = "created",
+    facets: bool = False,
+    price_edges: list[float] | None = Query(None),
+    if_none_match: str | None = Header(None),
 ):
+    """
+    List services ordered by creation time.
+    Pass the X-Next-Cursor response header back as `cursor` for the next page.
+    With `search=fulltext`, `q` is matched word by word (prefixes included)
+    and results are ranked by relevance; page through them with `skip`.
+    `sort=rating` lists the best rated services first (also paged with `skip`)
+    and `min_rating` keeps services whose average rating is at least that.
+    Send the page's ETag back as If-None-Match to get 304 if it is unchanged.
+
+    With `facets=true` the body is `{"items": [...], "facets": {...}}`: the
+    total match count, active/inactive counts and a price histogram whose
+    buckets start at each of `price_edges` (the last one is open-ended).
+    """
+    q = q or None
+    edges = tuple(price_edges) if price_edges else DEFAULT_PRICE_EDGES
+    if facets and (len(edges) > MAX_PRICE_EDGES or any(low >= high for low, high in zip(edges, edges[1:]))):
+        raise HTTPException(
+            status_code=400, detail=f"price_edges must be increasing and at most {MAX_PRICE_EDGES} values"
+        )
+    ranked = (bool(q) and search == "fulltext") or sort == "rating"
+    if ranked and cursor:
+        raise HTTPException(status_code=400, detail="Ranked results are paginated with skip, not cursor")
+
+    def render(session):
+        read_service = service_service.get_services(
+            db=session, skip=skip, limit=limit, q=q, price_min=price_min, price_max=price_max, active=active,
+            cursor=cursor, search=search, min_rating=min_rating, sort=sort,
+        )
+        if facets:
+            page = {
+                "items": read_service,
+                "facets": service_service.get_facets(
+                    db=session, q=q, price_min=price_min, price_max=price_max, active=active, search=search,
+                    min_rating=min_rating, price_edges=edges,
+                ),
+            }
+            body = _service_page_json.dump_json(_service_page_json.validate_python(page, from_attributes=True))
+            # Facet counts can change without any row on this page changing
+            etag = content_etag(body)
+        else:
+            body = _service_list_json.dump_json(_service_list_json.validate_python(read_service, from_attributes=True))
+            etag = version_etag(read_service)
+        headers = validator_headers(etag, last_modified(read_service))
+        if not ranked:
+            cursor_out = next_cursor(read_service, service_service.order_by, limit)
+            if cursor_out is not None:
+                headers[NEXT_CURSOR_HEADER] = cursor_out
+        return body, headers
+
+    key = (
+        "services", skip, limit, q, price_min, price_max, active, cursor, search if q else "substring", min_rating, sort,
+        edges if facets else None,
+    )
     try: 
-        read_service= service_service.get_services(
-        db=db, skip=skip, limit=limit, q=q, price_min=price_min, price_max=price_max, active=active
+        body, headers = await db.run_sync(
+            lambda session: service_cache.get_or_render(key, lambda: render(session), store=not from_replica(session))
         )
-        return read_service
+        # Last-Modified cannot reflect rows leaving the page, so lists only
+        # honour If-None-Match.
+        if not_modified(if_none_match, None, headers["ETag"], None):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
 
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/{service_id}", response_model=Service)
-def get_service(service_id: int, db: Session = Depends(get_db)):
-    db_service = service_service.get_service(db, service_id=service_id)
+async def get_service(
+    service_id: int,
+    if_none_match: str | None = Header(None),
+    if_modified_since: str | None = Header(None),
+    db: AsyncSession = Depends(get_read_db),
+):
+    def render(session):
+        db_service = service_service.get_service(session, service_id=service_id)
+        if db_service is None:
+            return None
+        body = _service_json.dump_json(_service_json.validate_python(db_service, from_attributes=True))
+        return body, version_etag([db_service]), db_service.updated_at
+
+    cached = await db.run_sync(
+        lambda session: service_cache.get_or_render(
+            ("service", service_id), lambda: render(session), store=not from_replica(session)
+        )
+    )
+    if cached is None:
+        raise HTTPException(status_code=404, detail="Service not found")
+    body, etag, modified = cached
+    headers = validator_headers(etag, modified)
+    if not_modified(if_none_match, if_modified_since, etag, modified):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/{service_id}/availability", response_model=Availability)
+async def get_availability(
+    service_id: int,
+    from_time: datetime = Query(..., alias="from"),
+    to_time: datetime = Query(..., alias="to"),
+    granularity: int = Query(15, gt=0, le=1440),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    List the open slots of the service's duration between `from` and `to`.
+    Slot starts are aligned to `granularity` minutes from midnight UTC.
+    """
+    if to_time <= from_time:
+        raise HTTPException(status_code=400, detail="'to' must be after 'from'")
+    if to_time - from_time > timedelta(days=31):
+        raise HTTPException(status_code=400, detail="Availability window cannot exceed 31 days")
+    db_service = await async_service_service.get_service(db, service_id=service_id)
     if db_service is None:
         raise HTTPException(status_code=404, detail="Service not found")
-    return db_service
+    if not db_service.duration_minutes or db_service.duration_minutes <= 0:
+        raise HTTPException(status_code=400, detail="Service has no bookable duration")
+
+    slots = await db.run_sync(
+        lambda session: availability_cache.find_slots(
+            session,
+            service_id=service_id,
+            from_time=from_time,
+            to_time=to_time,
+            duration_minutes=db_service.duration_minutes,
+            granularity=granularity,
+            store=not from_replica(session),
+        )
+    )
+    return {
+        "service_id": service_id,
+        "duration_minutes": db_service.duration_minutes,
+        "slots": [{"start_time": start, "end_time": end} for start, end in slots],
+    }
+
+
+@router.get("/{service_id}/calendar.ics")
+async def get_service_calendar(
+    service_id: int,
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    iCalendar feed of the service's booked slots (no customer details).
+    Polls with a matching If-None-Match get 304 without touching the database.
+    """
+    def render(session):
+        db_service = service_service.get_service(session, service_id=service_id)
+        if db_service is None:
+            raise HTTPException(status_code=404, detail="Service not found")
+        bookings = booking_service.get_calendar_bookings(
+            session, since=datetime.utcnow() - FEED_HISTORY, service_id=service_id
+        )
+        return render_calendar(db_service.title or "BookIt service", bookings, summary="Booked")
+
+    return await db.run_sync(
+        lambda session: feed_response(
+            ("service", service_id), if_none_match, lambda: render(session), store=not from_replica(session)
+        )
+    )
 
 
 @router.post("/", response_model=Service)
-def create_service(service: ServiceCreate, db: Session = Depends(get_db)):
+async def create_service(service: ServiceCreate, db: AsyncSession = Depends(get_async_db)):
+    def create(session):
+        created_service = service_service.create_service(db=session, service=service)
+        created = Service.model_validate(created_service)
+        session.commit()
+        return created
+
     try:
-        created_service= service_service.create_service(db=db, service=service)
-        db.commit()
-        return created_service
+        return await db.run_sync(create)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.patch("/{service_id}", response_model=Service)
-def update_service(
-    service_id: int, service: ServiceUpdate, db: Session = Depends(get_db)
+async def update_service(
+    service_id: int, service: ServiceUpdate, db: AsyncSession = Depends(get_async_db)
 ):
-    db_service = service_service.get_service(db, service_id=service_id)
-    if db_service is None:
-        raise HTTPException(status_code=404, detail="Service not found")
-    try: 
-        updated_service= service_service.update_service(
-        db=db, db_service=db_service, service_in=service
-        )
-        db.commit()
-        return updated_service
+    def update(session):
+        updated_service = service_service.update_service(db=session, service_id=service_id, service_in=service)
+        if updated_service is None:
+            raise HTTPException(status_code=404, detail="Service not found")
+        updated = Service.model_validate(updated_service)
+        session.commit()
+        return updated
+
+    try:
+        return await db.run_sync(update)
+    except HTTPException:
+        raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.delete("/{service_id}", response_model=Service)
-def delete_service(service_id: int, db: Session = Depends(get_db)):
-    db_service = service_service.get_service(db, service_id=service_id)
+async def delete_service(service_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_service = await async_service_service.get_service(db, service_id=service_id)
     if db_service is None:
         raise HTTPException(status_code=404, detail="Service not found")
-    return service_service.delete_service(db=db, db_service=db_service)
+    return await async_service_service.delete_service(db, db_service=db_service)
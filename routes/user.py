@@ -1,55 +1,95 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
-from crud.crud_user import user_service
-from database import get_db
+from calendar_feed import FEED_HISTORY, feed_response, render_calendar
+from crud.crud_booking import booking_service
+from crud.crud_user import async_user_service, user_service
+from database import get_async_db
+from pagination import InvalidCursor, set_next_cursor
+from replicas import from_replica, get_read_db
 from schemas.user import User, UserCreate, UserUpdate
+from routes.auth import create_user_with_password
+from security import get_current_user
 
 router = APIRouter()
 
 @router.post("/", response_model=User)
-def create_user(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = user_service.get_user_by_email(db, email=user.email)
-    if db_user:
-        raise HTTPException(status_code=400, detail="Email already registered")
-    try: 
-        created_user= user_service.create_user(db=db, user=user)
-        db.commit()
-        return created_user
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(status_code=500, detail=str(e))
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    return await create_user_with_password(db, user)
 
 
 @router.get("/", response_model=List[User])
-def get_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    users = user_service.get_users(db, skip=skip, limit=limit)
+async def get_users(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    List users ordered by creation time.
+    Pass the X-Next-Cursor response header back as `cursor` for the next page.
+    """
+    try:
+        users = await async_user_service.get_users(db, skip=skip, limit=limit, cursor=cursor)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    set_next_cursor(response, users, user_service.order_by, limit)
     return users
 
+@router.get("/me/calendar.ics")
+async def get_my_calendar(
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    iCalendar feed of the current user's bookings.
+    Polls with a matching If-None-Match get 304 without re-rendering.
+    """
+    def render(session):
+        bookings = booking_service.get_calendar_bookings(
+            session, since=datetime.utcnow() - FEED_HISTORY, user_id=current_user.id
+        )
+        return render_calendar("My BookIt bookings", bookings)
+
+    return await db.run_sync(
+        lambda session: feed_response(
+            ("user", current_user.id), if_none_match, lambda: render(session), store=not from_replica(session)
+        )
+    )
+
 @router.get("/{user_id}", response_model=User)
-def get_user(user_id: int, db: Session = Depends(get_db)):
-    db_user = user_service.get_user(db, user_id=user_id)
+async def get_user(user_id: int, db: AsyncSession = Depends(get_read_db)):
+    db_user = await async_user_service.get_user(db, user_id=user_id)
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return db_user
 
 @router.put("/{user_id}", response_model=User)
-def update_user(user_id: int, user: UserUpdate, db: Session = Depends(get_db)):
-    db_user = user_service.get_user(db, user_id=user_id)
-    if db_user is None:
-        raise HTTPException(status_code=404, detail="User not found")
-    try: 
-        updated_user=user_service.update_user(db=db, db_user=db_user, user_in=user)
-        db.commit()
-        return updated_user
+async def update_user(user_id: int, user: UserUpdate, db: AsyncSession = Depends(get_async_db)):
+    def update(session):
+        updated_user = user_service.update_user(db=session, user_id=user_id, user_in=user)
+        if updated_user is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        updated = User.model_validate(updated_user)
+        session.commit()
+        return updated
+
+    try:
+        return await db.run_sync(update)
+    except HTTPException:
+        raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
-    
+
 @router.delete("/{user_id}", response_model=User)
-def delete_user(user_id: int, db: Session = Depends(get_db)):
-    db_user = user_service.get_user(db, user_id=user_id)
+async def delete_user(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_user = await async_user_service.get_user(db, user_id=user_id)
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
-    return user_service.delete_user(db=db, db_user=db_user)
+    return await async_user_service.delete_user(db, db_user=db_user)
@@ -0,0 +1,91 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+
+from crud.crud_booking import booking_service
+
+logger = logging.getLogger(__name__)
+
+
+class BookingSweeper:
+    """Background thread that moves past bookings to their final status.
+
+    Each run completes confirmed bookings that have ended and cancels pending
+    bookings whose start time has passed, ``batch_size`` rows per UPDATE and
+    one short transaction per batch, so no long locks are held. It runs on
+    its own thread rather than the request threadpool.
+    """
+
+    def __init__(
+        self,
+        session_factory,
+        interval_seconds: float = 60,
+        batch_size: int = 500,
+        pending_grace_minutes: int = 0,
+        pause_seconds: float = 0.05,
+    ):
+        self.session_factory = session_factory
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.pending_grace = timedelta(minutes=pending_grace_minutes)
+        self.pause_seconds = pause_seconds
+        self.stats = {
+            "runs": 0,
+            "failures": 0,
+            "completed": 0,
+            "cancelled": 0,
+            "last_run_at": None,
+            "last_run_seconds": None,
+        }
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _drain(self, step) -> int:
+        total = 0
+        while not self._stop.is_set():
+            with self.session_factory() as db:
+                count = step(db)
+                db.commit()
+            total += count
+            if count < self.batch_size:
+                break
+            # Leave room for request traffic between batches.
+            self._stop.wait(self.pause_seconds)
+        return total
+
+    def run_once(self, now: datetime | None = None) -> tuple[int, int]:
+        """Run one sweep; returns ``(completed, cancelled)`` row counts."""
+        now = now or datetime.utcnow()
+        started = time.perf_counter()
+        completed = self._drain(lambda db: booking_service.complete_finished_bookings(db, now, self.batch_size))
+        cancelled = self._drain(
+            lambda db: booking_service.cancel_stale_pending_bookings(db, now - self.pending_grace, self.batch_size)
+        )
+        self.stats["runs"] += 1
+        self.stats["completed"] += completed
+        self.stats["cancelled"] += cancelled
+        self.stats["last_run_at"] = now
+        self.stats["last_run_seconds"] = time.perf_counter() - started
+        if completed or cancelled:
+            logger.info("Booking sweep completed %d and cancelled %d bookings", completed, cancelled)
+        return completed, cancelled
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.run_once()
+            except Exception:
+                self.stats["failures"] += 1
+                logger.exception("Booking sweep failed")
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="booking-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 5):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
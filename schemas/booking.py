@@ -1,6 +1,13 @@
-from pydantic import BaseModel
+from pydantic import AfterValidator, BaseModel, Field
 from datetime import datetime
 from enum import Enum
+from typing import Annotated
+
+from timeutil import to_naive_utc
+
+# Bookings are stored as naive UTC. Offsets are converted once, here, so the
+# stored row, the conflict checks and the response all see the same value.
+UTCDatetime = Annotated[datetime, AfterValidator(to_naive_utc)]
 
 class BookingStatus(str, Enum):
     pending = "pending"
@@ -11,15 +18,15 @@ class BookingStatus(str, Enum):
 class BookingBase(BaseModel):
     user_id: int
     service_id: int
-    start_time: datetime
-    end_time: datetime
+    start_time: UTCDatetime
+    end_time: UTCDatetime
 
 class BookingCreate(BookingBase):
     pass
 
 class BookingUpdate(BaseModel):
-    start_time: datetime | None = None
-    end_time: datetime | None = None
+    start_time: UTCDatetime | None = None
+    end_time: UTCDatetime | None = None
     status: BookingStatus | None = None
 
 class Booking(BookingBase):
@@ -29,3 +36,17 @@ class Booking(BookingBase):
 
     class Config:
         from_attributes = True
+
+class BookingBatchCreate(BaseModel):
+    bookings: list[BookingCreate] = Field(..., min_length=1, max_length=1000)
+
+class BookingBatchItem(BaseModel):
+    index: int
+    created: bool
+    booking: Booking | None = None
+    detail: str | None = None
+
+class BookingBatchResult(BaseModel):
+    created: int
+    failed: int
+    results: list[BookingBatchItem]
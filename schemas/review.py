@@ -18,3 +18,7 @@ class Review(ReviewBase):
 
     class Config:
         orm_mode = True
+
+class ReviewExpanded(Review):
+    reviewer_name: str | None
+    booking_date: datetime
@@ -21,6 +21,32 @@ class ServiceUpdate(BaseModel):
 class Service(ServiceBase):
     id: int
     created_at: datetime
+    rating_count: int = 0
+    rating_average: float | None = None
 
     class Config:
         from_attributes = True
+
+class PriceBucket(BaseModel):
+    min: float
+    max: float | None
+    count: int
+
+class ServiceFacets(BaseModel):
+    total: int
+    active: int
+    inactive: int
+    price_histogram: list[PriceBucket]
+
+class ServicePage(BaseModel):
+    items: list[Service]
+    facets: ServiceFacets
+
+class AvailabilitySlot(BaseModel):
+    start_time: datetime
+    end_time: datetime
+
+class Availability(BaseModel):
+    service_id: int
+    duration_minutes: int
+    slots: list[AvailabilitySlot]
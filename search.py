@@ -0,0 +1,61 @@
+import re
+
+from sqlalchemy import column, delete, false, func, insert, literal_column, table, text
+from sqlalchemy.orm import Query, Session
+
+from models.service import Service
+
+# Longer queries are cut to this many terms.
+MAX_TERMS = 16
+
+_WORD = re.compile(r"\w+")
+services_fts = table("services_fts", column("rowid"), column("title"), column("description"))
+
+
+def search_terms(q: str) -> list[str]:
+    return [term.lower() for term in _WORD.findall(q)][:MAX_TERMS]
+
+
+def _dialect(db: Session) -> str:
+    return db.get_bind().dialect.name
+
+
+def index_service(db: Session, service: Service):
+    """Refresh the search entry of ``service`` (PostgreSQL does this itself)."""
+    if _dialect(db) != "sqlite":
+        return
+    db.execute(delete(services_fts).where(services_fts.c.rowid == service.id))
+    db.execute(
+        insert(services_fts).values(rowid=service.id, title=service.title or "", description=service.description or "")
+    )
+
+
+def remove_service(db: Session, service_id: int):
+    if _dialect(db) == "sqlite":
+        db.execute(delete(services_fts).where(services_fts.c.rowid == service_id))
+
+
+def apply_search(query: Query, db: Session, q: str) -> Query:
+    """Restrict a Service query to full-text matches of ``q``, best match first.
+
+    Every term must match, and the last characters of each term may be the
+    start of a longer word ("mass" finds "massage").
+    """
+    terms = search_terms(q)
+    if not terms:
+        return query.filter(false())
+    dialect = _dialect(db)
+    if dialect == "postgresql":
+        tsquery = func.to_tsquery("english", " & ".join(f"{term}:*" for term in terms))
+        vector = literal_column("services.search_vector")
+        return query.filter(vector.op("@@")(tsquery)).order_by(func.ts_rank(vector, tsquery).desc(), Service.id)
+    if dialect == "sqlite":
+        match = " ".join(f'"{term}"*' for term in terms)
+        return (
+            query.join(services_fts, services_fts.c.rowid == Service.id)
+            .filter(text("services_fts MATCH :match").bindparams(match=match))
+            .order_by(text("bm25(services_fts)"), Service.id)
+        )
+    for term in terms:
+        query = query.filter(Service.title.contains(term) | Service.description.contains(term))
+    return query.order_by(Service.id)
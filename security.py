@@ -4,12 +4,25 @@ from datetime import datetime, timedelta
 from typing import Optional, List
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from settings import settings
-from database import get_db
+from database import get_async_db
+from password_pool import PasswordPool, PasswordPoolBusy
+from token_cache import TokenCache
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min/max pin the cost, so needs_update flags hashes made with any other one
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+password_pool = PasswordPool(
+    pwd_context, workers=settings.PASSWORD_HASH_WORKERS, max_queue=settings.PASSWORD_HASH_MAX_QUEUE
+)
+token_cache = TokenCache(max_entries=settings.TOKEN_CACHE_MAX_ENTRIES)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 def verify_password(plain_password, hashed_password):
@@ -18,33 +31,77 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+def _too_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many login attempts in progress, try again shortly",
+        headers={"Retry-After": "1"},
+    )
+
+async def hash_password_async(password: str) -> str:
+    """Hash on the password pool; 429 when it is saturated."""
+    try:
+        return await password_pool.hash(password)
+    except PasswordPoolBusy:
+        raise _too_busy()
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """``(valid, new_hash)`` from the password pool; 429 when it is saturated."""
+    try:
+        return await password_pool.verify_and_update(plain_password, hashed_password)
+    except PasswordPoolBusy:
+        raise _too_busy()
+
 def create_token(data: dict, expires_delta: timedelta) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + expires_delta
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
-def create_access_token(sub: str, roles: List[str]) -> str:
-    return create_token(
-        {"sub": sub, "roles": roles, "type": "access"},
-        timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
-    )
+def create_access_token(sub: str, roles: List[str], user_id: Optional[int] = None) -> str:
+    claims = {"sub": sub, "roles": roles, "type": "access"}
+    if user_id is not None:
+        claims["uid"] = user_id
+    return create_token(claims, timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
 
-def create_refresh_token(sub: str) -> str:
-    return create_token(
-        {"sub": sub, "type": "refresh"},
-        timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
-    )
+def create_refresh_token(sub: str, user_id: Optional[int] = None) -> str:
+    claims = {"sub": sub, "type": "refresh"}
+    if user_id is not None:
+        claims["uid"] = user_id
+    return create_token(claims, timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS))
 
 def decode_token(token: str):
+    """Verified claims of ``token``, or None if it is invalid, expired or revoked.
+
+    Verified claims are cached until the token expires, so a session's
+    token is only parsed and HMAC-checked once per worker.
+    """
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+    if token_cache.is_revoked(token):
+        return None
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
     except JWTError:
         return None
+    token_cache.put(token, payload)
+    return payload
+
+def revoke_token(token: str):
+    """Refuse ``token`` from now on in this worker, e.g. at logout."""
+    payload = decode_token(token)
+    if payload is not None:
+        token_cache.revoke(token, payload["exp"])
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    """The token's user as a Principal.
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    from crud.crud_user import user_service
+    Tokens carry the user id (``uid``), so a warm principal cache answers
+    without touching the users table; older tokens are looked up by email.
+    """
+    from crud.crud_user import async_user_service
+    from principals import Principal, principal_cache
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -56,7 +113,18 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     email: str = payload.get("sub")
     if email is None:
         raise credentials_exception
-    user = user_service.get_user_by_email(db, email=email)
-    if user is None:
+    user_id = payload.get("uid")
+    principal = principal_cache.get(user_id) if isinstance(user_id, int) else None
+    if principal is None:
+        generation = principal_cache.generation
+        if isinstance(user_id, int):
+            user = await async_user_service.get_user(db, user_id=user_id)
+        else:
+            user = await async_user_service.get_user_by_email(db, email=email)
+        if user is None:
+            raise credentials_exception
+        principal = principal_cache.put(Principal.from_user(user), generation)
+    # An email change invalidates tokens issued for the old address
+    if principal.email != email:
         raise credentials_exception
-    return user
+    return principal
@@ -0,0 +1,97 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from settings import settings
+
+_DIRTY_KEY = "service_cache_dirty"
+
+
+class ServiceCache:
+    """Pre-serialised catalogue responses, bounded by size (LRU) and age (TTL).
+
+    Values are whatever ``render`` returns, normally the response bytes plus
+    the headers that go with them, so a hit skips the database and pydantic.
+
+    Entries remember the generation they were rendered under; a write bumps
+    the generation when it commits, so a render that raced with the write is
+    never stored. Other workers only see the write once their entries expire.
+    """
+
+    def __init__(self, ttl_seconds: float = 30, max_entries: int = 1000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+        self._generation = 0
+        self._entries: OrderedDict[Hashable, tuple[int, float, tuple]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_render(self, key: Hashable, render: Callable[[], tuple | None], store: bool = True) -> tuple | None:
+        """The cached value for ``key``; ``render()`` runs on a miss.
+
+        ``render`` returns None for a response that must not be cached, and
+        nothing is cached without ``store`` (e.g. for replica reads).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                generation, expires_at, value = entry
+                if generation == self._generation and expires_at >= time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return value
+                del self._entries[key]
+                self.stats["expirations"] += 1
+            self.stats["misses"] += 1
+            generation = self._generation
+
+        rendered = render()
+        if rendered is None or not store:
+            return rendered
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = (generation, time.monotonic() + self.ttl_seconds, rendered)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.stats["evictions"] += 1
+        return rendered
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {**self.stats, "entries": len(self._entries), "max_entries": self.max_entries}
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self.stats["invalidations"] += 1
+
+    def invalidate_on_commit(self, db: Session):
+        """Drop every entry once ``db`` commits its current transaction."""
+        db.info[_DIRTY_KEY] = True
+
+
+service_cache = ServiceCache(
+    ttl_seconds=settings.SERVICE_CACHE_TTL_SECONDS,
+    max_entries=settings.SERVICE_CACHE_MAX_ENTRIES,
+)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session):
+    if session.info.pop(_DIRTY_KEY, False):
+        service_cache.invalidate()
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_dirty(session: Session, transaction):
+    if transaction.parent is None:
+        session.info.pop(_DIRTY_KEY, None)
@@ -1,10 +1,69 @@
+from pydantic import PositiveFloat, PositiveInt
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
+    # Serve routes from an AsyncSession (asyncpg / aiosqlite) instead of a
+    # sync Session in the threadpool.
+    DATABASE_ASYNC: bool = False
+    # Connection pool of each engine, per worker: at most POOL_SIZE +
+    # MAX_OVERFLOW connections, waiting up to POOL_TIMEOUT seconds for one.
+    # Connections older than POOL_RECYCLE seconds are replaced (-1: never);
+    # PRE_PING checks each connection before handing it out.
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT: float = 30
+    DATABASE_POOL_RECYCLE: int = -1
+    DATABASE_POOL_PRE_PING: bool = False
+    # Comma-separated read replicas for read-only routes. A replica that
+    # fails its health check is skipped for RETRY_SECONDS; clients that
+    # wrote within READ_YOUR_WRITES_SECONDS read from the primary.
+    DATABASE_REPLICA_URLS: str = ""
+    DATABASE_REPLICA_RETRY_SECONDS: float = 30
+    DATABASE_READ_YOUR_WRITES_SECONDS: float = 5
     SECRET_KEY: str = "your-secret-key"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # "index" answers conflict checks from the in-process interval index,
+    # "verify" also runs the database query and logs any disagreement,
+    # "db" always queries the database (use with several workers).
+    # Unset: "db" on PostgreSQL, "index" otherwise (single-process SQLite).
+    BOOKING_INDEX_MODE: str | None = None
+    # Background sweep that completes finished bookings and cancels pending
+    # ones whose start time passed more than the grace period ago.
+    BOOKING_SWEEP_ENABLED: bool = True
+    BOOKING_SWEEP_INTERVAL_SECONDS: int = 60
+    BOOKING_SWEEP_BATCH_SIZE: int = 500
+    PENDING_BOOKING_GRACE_MINUTES: int = 0
+    # Upper bound on how stale a cached calendar feed can be when another
+    # worker changed the bookings behind it.
+    CALENDAR_FEED_TTL_SECONDS: int = 300
+    # Same bound for the per-day availability bitmaps.
+    AVAILABILITY_CACHE_TTL_SECONDS: int = 60
+    # In-process cache of GET /services responses. Writes through this
+    # worker clear it on commit; other workers catch up within the TTL.
+    SERVICE_CACHE_TTL_SECONDS: int = 30
+    SERVICE_CACHE_MAX_ENTRIES: int = 1000
+    # bcrypt cost; stored hashes with another cost are rehashed at login.
+    BCRYPT_ROUNDS: int = 12
+    # Threads dedicated to bcrypt, and how many more operations may wait
+    # for them before logins and registrations are answered with 429.
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 32
+    # Authenticated users cached by id, so requests skip the users table.
+    # Bounds how long another worker's role change or deletion goes unseen.
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+    # Verified bearer tokens remembered per worker (entries expire with the token).
+    TOKEN_CACHE_MAX_ENTRIES: int = 10000
+    # Token buckets on /auth/login and /auth/register, per client IP and
+    # per username (email). Rates must be positive; turn the limiter off
+    # with AUTH_RATE_LIMIT_ENABLED instead.
+    AUTH_RATE_LIMIT_ENABLED: bool = True
+    AUTH_IP_RATE_PER_MINUTE: PositiveFloat = 60
+    AUTH_IP_BURST: PositiveInt = 20
+    AUTH_USERNAME_RATE_PER_MINUTE: PositiveFloat = 10
+    AUTH_USERNAME_BURST: PositiveInt = 5
 
     class Config:
         env_file = ".env"
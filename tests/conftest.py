@@ -2,13 +2,16 @@ import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from database import Base, get_db
+from database import Base, ThreadedSession, get_async_db, get_db
 from main import app
+from replicas import get_read_db
 from models.user import User
 from models.service import Service
 from schemas.user import UserCreate
 from crud.crud_user import CRUDUser
+from settings import settings
 from datetime import datetime, timedelta
+import uuid
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 
@@ -33,7 +36,21 @@ def override_get_db():
         db.close()
 
 
+async def override_get_async_db():
+    db = ThreadedSession(TestingSessionLocal())
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_async_db] = override_get_async_db
+app.dependency_overrides[get_read_db] = override_get_async_db
+# The sweeper would run against DATABASE_URL rather than the test database.
+settings.BOOKING_SWEEP_ENABLED = False
+# Every test registers from the same client address.
+settings.AUTH_RATE_LIMIT_ENABLED = False
 
 
 @pytest.fixture(scope="module")
@@ -69,4 +86,56 @@ def test_service(client, test_user):
     service_data = {"name": "Test Service", "description": "A service for testing", "price": 100.0}
     response = client.post("/services/", json=service_data, headers=headers)
     assert response.status_code == 200
-    return response.json()
\ No newline at end of file
+    return response.json()
+
+
+def booking_payload(service_id, start_time, hours=1):
+    """JSON body for POST /bookings/ (the route fills in user_id)."""
+    return {
+        "user_id": 0,
+        "service_id": service_id,
+        "start_time": start_time.isoformat(),
+        "end_time": (start_time + timedelta(hours=hours)).isoformat(),
+    }
+
+
+def _register_and_login(client, role=None):
+    email = f"{uuid.uuid4().hex[:12]}@example.com"
+    response = client.post("/auth/register", json={"name": "Test User", "email": email, "password": "password"})
+    assert response.status_code == 200
+    if role is not None:
+        db = TestingSessionLocal()
+        db.query(User).filter(User.email == email).update({User.role: role})
+        db.commit()
+        db.close()
+    login_response = client.post("/auth/login", data={"username": email, "password": "password"})
+    assert login_response.status_code == 200
+    return {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+
+
+@pytest.fixture
+def db_session():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture(scope="module")
+def user_headers(client):
+    return _register_and_login(client)
+
+
+@pytest.fixture(scope="module")
+def admin_headers(client):
+    from models.user import Role
+    return _register_and_login(client, role=Role.admin)
+
+
+@pytest.fixture(scope="module")
+def service_id(client):
+    service_data = {"title": "Haircut", "description": "A service for testing", "price": 100.0, "duration_minutes": 60}
+    response = client.post("/services/", json=service_data)
+    assert response.status_code == 200
+    return response.json()["id"]
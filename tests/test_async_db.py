@@ -0,0 +1,81 @@
+import asyncio
+from datetime import datetime
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from conftest import SQLALCHEMY_DATABASE_URL, booking_payload, override_get_async_db
+from database import async_database_url, get_async_db
+from main import app
+from models.booking import Booking, BookingStatus
+
+
+@pytest.fixture
+def async_db():
+    """Serve get_async_db from AsyncSessions on aiosqlite for one test."""
+    # NullPool: TestClient and asyncio.run each bring their own event loop
+    async_engine = create_async_engine(async_database_url(SQLALCHEMY_DATABASE_URL), poolclass=NullPool)
+    factory = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    async def get_db():
+        async with factory() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = get_db
+    yield
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    asyncio.run(async_engine.dispose())
+
+
+def test_async_database_url_picks_async_driver():
+    assert async_database_url("sqlite:///./dev.db") == "sqlite+aiosqlite:///./dev.db"
+    assert async_database_url("postgresql://u:p@db/bookit") == "postgresql+asyncpg://u:p@db/bookit"
+    with pytest.raises(ValueError):
+        async_database_url("mysql://u:p@db/bookit")
+
+
+def test_routes_on_async_session(client: TestClient, user_headers, admin_headers, db_session, async_db):
+    service = client.post("/services/", json={"title": "Async", "description": "", "price": 0.25, "duration_minutes": 60})
+    assert service.status_code == 200
+    service_id = service.json()["id"]
+    assert client.get(f"/services/{service_id}").json()["title"] == "Async"
+    assert [item["id"] for item in client.get("/services/", params={"price_min": 0.2, "price_max": 0.3}).json()] == [service_id]
+
+    start_time = datetime(2037, 5, 1, 9)
+    payload = booking_payload(service_id, start_time)
+    booking = client.post("/bookings/", json=payload, headers=user_headers)
+    assert booking.status_code == 200
+    booking_id = booking.json()["id"]
+    assert client.post("/bookings/", json=payload, headers=user_headers).status_code == 409
+    assert [item["id"] for item in client.get("/bookings/", params={"service_id": service_id}, headers=admin_headers).json()] == [booking_id]
+
+    response = client.patch(f"/bookings/{booking_id}", json={"status": "confirmed"}, headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json()["status"] == "confirmed"
+
+    db_session.query(Booking).filter(Booking.id == booking_id).update({Booking.status: BookingStatus.completed})
+    db_session.commit()
+    review = client.post("/reviews/reviews", json={"booking_id": booking_id, "rating": 4, "comment": ""}, headers=user_headers)
+    assert review.status_code == 200
+    assert client.get(f"/reviews/services/{service_id}/reviews").json()[0]["rating"] == 4
+    assert client.get(f"/services/{service_id}").json()["rating_count"] == 1
+
+
+def test_concurrent_bookings_on_async_session(client: TestClient, user_headers, async_db):
+    service_id = client.post("/services/", json={"title": "Contended", "description": "", "price": 0.25, "duration_minutes": 60}).json()["id"]
+    start_time = datetime(2037, 6, 1, 9)
+    payload = booking_payload(service_id, start_time)
+
+    async def book_all():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as async_client:
+            responses = await asyncio.gather(
+                *(async_client.post("/bookings/", json=payload, headers=user_headers) for _ in range(10))
+            )
+        return sorted(response.status_code for response in responses)
+
+    # The service lock is held across awaits; waiters must yield, not block the loop
+    assert asyncio.run(book_all()) == [200] + [409] * 9
@@ -0,0 +1,95 @@
+from fastapi.testclient import TestClient
+from datetime import datetime, timedelta, timezone
+
+from availability import AvailabilityCache, free_starts
+from conftest import booking_payload, engine
+from models.booking import Booking, BookingStatus
+
+
+def slot_starts(response):
+    assert response.status_code == 200
+    return [slot["start_time"][11:16] for slot in response.json()["slots"]]
+
+
+def test_free_starts_respects_duration_and_grid():
+    occupied = ((1 << 60) - 1) << 60  # minutes 60-119 taken
+    assert free_starts(occupied, 0, 240, 60, 30) == [0, 120, 150, 180]
+    assert free_starts(0, 10, 100, 45, 15) == [15, 30, 45]
+
+
+def test_availability_tracks_bookings(client: TestClient, user_headers, service_id):
+    day = datetime(2032, 5, 3)
+    params = {"from": (day + timedelta(hours=9)).isoformat(), "to": (day + timedelta(hours=13)).isoformat(), "granularity": 30}
+    url = f"/services/{service_id}/availability"
+
+    assert slot_starts(client.get(url, params=params)) == ["09:00", "09:30", "10:00", "10:30", "11:00", "11:30", "12:00"]
+
+    created = client.post("/bookings/", json=booking_payload(service_id, day + timedelta(hours=10)), headers=user_headers)
+    assert created.status_code == 200
+    assert slot_starts(client.get(url, params=params)) == ["09:00", "11:00", "11:30", "12:00"]
+
+    deleted = client.delete(f"/bookings/{created.json()['id']}", headers=user_headers)
+    assert deleted.status_code == 200
+    assert len(slot_starts(client.get(url, params=params))) == 7
+
+
+def test_offset_booking_blocks_its_utc_slot(client: TestClient, user_headers, service_id):
+    day = datetime(2032, 5, 4)
+    params = {"from": (day + timedelta(hours=9)).isoformat(), "to": (day + timedelta(hours=13)).isoformat(), "granularity": 60}
+    url = f"/services/{service_id}/availability"
+    assert slot_starts(client.get(url, params=params)) == ["09:00", "10:00", "11:00", "12:00"]
+
+    # 12:00+02:00 is 10:00 UTC
+    local = datetime(2032, 5, 4, 12, tzinfo=timezone(timedelta(hours=2)))
+    created = client.post("/bookings/", json=booking_payload(service_id, local), headers=user_headers)
+    assert created.status_code == 200
+    assert slot_starts(client.get(url, params=params)) == ["09:00", "11:00", "12:00"]
+
+
+def _insert_behind_cache(service_id, start_time):
+    """A booking written without this worker's commit hooks, as another worker would."""
+    with engine.begin() as conn:
+        conn.execute(
+            Booking.__table__.insert().values(
+                user_id=1, service_id=service_id, start_time=start_time,
+                end_time=start_time + timedelta(hours=1), status=BookingStatus.pending,
+            )
+        )
+
+
+def test_cached_days_expire_after_ttl(db_session, service_id):
+    day = datetime(2032, 5, 5)
+    cached, expiring = AvailabilityCache(ttl_seconds=60), AvailabilityCache(ttl_seconds=0)
+    for cache in (cached, expiring):
+        assert cache.occupancy(db_session, service_id, day.date(), day.date()) == 0
+
+    _insert_behind_cache(service_id, day + timedelta(hours=9))
+
+    assert cached.occupancy(db_session, service_id, day.date(), day.date()) == 0
+    assert expiring.occupancy(db_session, service_id, day.date(), day.date()) != 0
+
+
+def test_load_overtaken_by_a_change_is_not_stored(db_session, service_id):
+    day = datetime(2032, 5, 6)
+    cache = AvailabilityCache()
+    load = cache._load
+
+    def load_then_invalidate(*args):
+        loaded = load(*args)
+        cache.invalidate(service_id)
+        return loaded
+
+    cache._load = load_then_invalidate
+    assert cache.occupancy(db_session, service_id, day.date(), day.date()) == 0
+    cache._load = load
+
+    _insert_behind_cache(service_id, day + timedelta(hours=9))
+    assert cache.occupancy(db_session, service_id, day.date(), day.date()) != 0
+
+
+def test_availability_rejects_bad_window(client: TestClient, service_id):
+    day = datetime(2032, 5, 3)
+    url = f"/services/{service_id}/availability"
+    assert client.get(url, params={"from": day.isoformat(), "to": day.isoformat()}).status_code == 400
+    assert client.get(url, params={"from": day.isoformat(), "to": (day + timedelta(days=40)).isoformat()}).status_code == 400
+    assert client.get("/services/999999/availability", params={"from": day.isoformat(), "to": (day + timedelta(days=1)).isoformat()}).status_code == 404
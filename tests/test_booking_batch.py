@@ -0,0 +1,44 @@
+from fastapi.testclient import TestClient
+from datetime import datetime, timedelta, timezone
+
+from conftest import booking_payload
+
+
+def test_batch_create_reports_conflicts(client: TestClient, user_headers, service_id):
+    start_time = datetime(2031, 6, 1, 9)
+    existing = client.post("/bookings/", json=booking_payload(service_id, start_time), headers=user_headers)
+    assert existing.status_code == 200
+
+    batch = [
+        booking_payload(service_id, start_time + timedelta(minutes=30)),
+        booking_payload(service_id, start_time + timedelta(hours=1)),
+        booking_payload(service_id, start_time + timedelta(hours=1, minutes=30)),
+        booking_payload(service_id, start_time + timedelta(hours=2)),
+        booking_payload(999999, start_time),
+    ]
+    response = client.post("/bookings/batch", json={"bookings": batch}, headers=user_headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["created"] == 2
+    assert [item["created"] for item in body["results"]] == [False, True, False, True, False]
+    assert [item["detail"] for item in body["results"]] == [
+        "Booking conflict", None, "Booking conflict", None, "Service not found"
+    ]
+
+    again = client.post("/bookings/", json=booking_payload(service_id, start_time + timedelta(hours=2)), headers=user_headers)
+    assert again.status_code == 409
+
+
+def test_batch_checks_offset_times_as_stored(client: TestClient, user_headers, service_id):
+    local = datetime(2031, 7, 1, 10, tzinfo=timezone(timedelta(hours=2)))
+    batch = [
+        booking_payload(service_id, local),
+        booking_payload(service_id, datetime(2031, 7, 1, 8, 30)),
+        booking_payload(service_id, datetime(2031, 7, 1, 10)),
+    ]
+    response = client.post("/bookings/batch", json={"bookings": batch}, headers=user_headers)
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [item["created"] for item in results] == [True, False, True]
+    assert results[0]["booking"]["start_time"] == "2031-07-01T08:00:00"
+    assert results[2]["booking"]["start_time"] == "2031-07-01T10:00:00"
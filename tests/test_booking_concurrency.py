@@ -0,0 +1,66 @@
+import random
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from conftest import TestingSessionLocal
+from crud.crud_booking import booking_service
+from locks import lock_service
+from models.service import Service
+from schemas.booking import BookingCreate
+
+BASE = datetime(2033, 1, 1)
+SLOT = timedelta(minutes=30)
+
+
+def book(service_id, slot):
+    db = TestingSessionLocal()
+    try:
+        start_time = BASE + slot * SLOT
+        lock_service(db, service_id)
+        if booking_service.has_conflict(db, start_time, start_time + SLOT, service_id):
+            return False
+        booking_service.create_booking(
+            db, BookingCreate(user_id=1, service_id=service_id, start_time=start_time, end_time=start_time + SLOT)
+        )
+        db.commit()
+        return True
+    finally:
+        db.close()
+
+
+def test_concurrent_bookings_never_overlap(client, db_session):
+    service_ids = []
+    for i in range(2):
+        service = Service(title=f"Stress {i}", description="", price=1.0, duration_minutes=30)
+        db_session.add(service)
+        db_session.flush()
+        service_ids.append(service.id)
+    db_session.commit()
+
+    work = [(service_id, slot) for service_id in service_ids for slot in range(15)]
+    created = []
+
+    def worker(seed):
+        items = work[:]
+        random.Random(seed).shuffle(items)
+        created.append(sum(book(service_id, slot) for service_id, slot in items))
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(created) == len(work)
+    overlaps = db_session.execute(
+        text(
+            "SELECT COUNT(*) FROM bookings a JOIN bookings b"
+            " ON a.service_id = b.service_id AND a.id < b.id"
+            " AND a.start_time < b.end_time AND a.end_time > b.start_time"
+            " WHERE a.service_id IN (:first, :second)"
+        ),
+        {"first": service_ids[0], "second": service_ids[1]},
+    ).scalar()
+    assert overlaps == 0
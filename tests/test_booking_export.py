@@ -0,0 +1,29 @@
+import csv
+import io
+import json
+from fastapi.testclient import TestClient
+from datetime import datetime, timedelta
+
+from conftest import booking_payload
+
+
+def test_export_streams_filtered_bookings(client: TestClient, user_headers, admin_headers, service_id):
+    day = datetime(2036, 3, 1)
+    ids = []
+    for hours, headers in ((9, user_headers), (12, user_headers), (15, admin_headers)):
+        start_time = day + timedelta(hours=hours)
+        payload = booking_payload(service_id, start_time)
+        ids.append(client.post("/bookings/", json=payload, headers=headers).json()["id"])
+    window = {"from_date": day.isoformat(), "to_date": (day + timedelta(days=1)).isoformat()}
+
+    response = client.get("/bookings/export", params=window, headers=admin_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == ids
+    assert rows[0]["status"] == "pending"
+
+    response = client.get("/bookings/export", params={**window, "format": "csv"}, headers=user_headers)
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [int(row["id"]) for row in rows] == ids[:2]
@@ -0,0 +1,28 @@
+from fastapi.testclient import TestClient
+from datetime import datetime, timedelta
+
+from conftest import booking_payload
+from models.booking import Booking, BookingStatus
+
+
+def test_admin_filters_are_combined(client: TestClient, user_headers, admin_headers, db_session):
+    service = client.post("/services/", json={"title": "Filtered", "description": "", "price": 10.0, "duration_minutes": 60}).json()
+    day = datetime(2035, 7, 1)
+    ids = []
+    for hours in (9, 11, 13):
+        start_time = day + timedelta(hours=hours)
+        payload = booking_payload(service["id"], start_time)
+        ids.append(client.post("/bookings/", json=payload, headers=user_headers).json()["id"])
+    db_session.query(Booking).filter(Booking.id.in_(ids[:2])).update({Booking.status: BookingStatus.confirmed})
+    db_session.commit()
+
+    params = {"status": "confirmed", "from_date": day.isoformat(), "to_date": (day + timedelta(days=1)).isoformat()}
+    response = client.get("/bookings/", params=params, headers=admin_headers)
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()] == ids[:2]
+
+    params = {"service_id": service["id"], "from_date": (day + timedelta(hours=10)).isoformat()}
+    response = client.get("/bookings/", params=params, headers=admin_headers)
+    assert [item["id"] for item in response.json()] == ids[1:]
+
+    assert client.get("/bookings/", params={"status": "bogus"}, headers=admin_headers).status_code == 422
@@ -0,0 +1,157 @@
+import random
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from datetime import datetime, timedelta, timezone
+
+import locks
+from booking_index import ServiceIntervals, booking_index
+from conftest import booking_payload
+from crud.crud_booking import booking_index_mode, booking_service
+from routes.booking import _create_booking
+from schemas.booking import BookingCreate
+from settings import settings
+
+
+def test_service_intervals_overlap():
+    base = datetime(2030, 1, 1, 9)
+    intervals = ServiceIntervals()
+    intervals.add(1, base, base + timedelta(hours=1))
+    intervals.add(2, base + timedelta(hours=2), base + timedelta(hours=5))
+
+    assert intervals.overlapping(base + timedelta(minutes=30), base + timedelta(minutes=90)) == [1]
+    assert intervals.overlapping(base + timedelta(hours=1), base + timedelta(hours=2)) == []
+    assert intervals.overlapping(base + timedelta(hours=4), base + timedelta(hours=6)) == [2]
+    assert intervals.overlapping(base, base + timedelta(hours=1), exclude_id=1) == []
+
+    intervals.remove(2)
+    assert intervals.overlapping(base + timedelta(hours=4), base + timedelta(hours=6)) == []
+    assert len(intervals) == 1
+
+
+def test_service_intervals_match_a_linear_scan():
+    base = datetime(2030, 1, 1)
+    rng = random.Random(7)
+    bookings = {}
+    for booking_id in range(400):
+        start = base + timedelta(minutes=rng.randrange(10_000))
+        bookings[booking_id] = (start, start + timedelta(minutes=rng.choice([15, 60, 600, 5000])))
+    intervals = ServiceIntervals.from_bookings((i, start, end) for i, (start, end) in list(bookings.items())[:200])
+    for booking_id, (start, end) in list(bookings.items())[200:]:
+        intervals.add(booking_id, start, end)
+    for booking_id in rng.sample(sorted(bookings), 150):
+        intervals.remove(booking_id)
+        del bookings[booking_id]
+
+    assert len(intervals) == len(bookings)
+    for _ in range(300):
+        start = base + timedelta(minutes=rng.randrange(10_000))
+        end = start + timedelta(minutes=rng.randrange(1, 300))
+        expected = sorted(
+            (booking_start, booking_id)
+            for booking_id, (booking_start, booking_end) in bookings.items()
+            if booking_start < end and booking_end > start
+        )
+        assert intervals.overlapping(start, end) == [booking_id for _, booking_id in expected]
+
+
+def test_postgres_checks_conflicts_in_the_database_by_default(monkeypatch):
+    monkeypatch.setattr(settings, "BOOKING_INDEX_MODE", None)
+    assert booking_index_mode("postgresql") == "db"
+    assert booking_index_mode("sqlite") == "index"
+    monkeypatch.setattr(settings, "BOOKING_INDEX_MODE", "verify")
+    assert booking_index_mode("postgresql") == "verify"
+
+
+def test_index_only_sees_committed_bookings(client: TestClient, db_session, service_id):
+    start_time = datetime(2031, 3, 1, 10)
+    end_time = start_time + timedelta(hours=1)
+    assert not booking_service.has_conflict(db_session, start_time, end_time, service_id)
+
+    booking = BookingCreate(user_id=0, service_id=service_id, start_time=start_time, end_time=end_time)
+    booking_service.create_booking(db_session, booking)
+    db_session.rollback()
+    assert booking_index.overlapping(db_session, service_id, start_time, end_time) == []
+
+    created = booking_service.create_booking(db_session, booking)
+    db_session.commit()
+    assert booking_index.overlapping(db_session, service_id, start_time, end_time) == [created.id]
+
+
+def test_create_and_reschedule_conflict(client: TestClient, user_headers, service_id):
+    start_time = datetime(2031, 4, 1, 10)
+    first = client.post("/bookings/", json=booking_payload(service_id, start_time), headers=user_headers)
+    assert first.status_code == 200
+
+    conflict = client.post("/bookings/", json=booking_payload(service_id, start_time + timedelta(minutes=30)), headers=user_headers)
+    assert conflict.status_code == 409
+    assert conflict.json()["detail"] == "Booking conflict"
+
+    second = client.post("/bookings/", json=booking_payload(service_id, start_time + timedelta(hours=2)), headers=user_headers)
+    assert second.status_code == 200
+
+    booking_id = first.json()["id"]
+    response = client.delete(f"/bookings/{booking_id}", headers=user_headers)
+    assert response.status_code == 200
+    retry = client.post("/bookings/", json=booking_payload(service_id, start_time), headers=user_headers)
+    assert retry.status_code == 200
+
+
+
+def test_conflict_releases_the_service_lock(client: TestClient, db_session, service_id):
+    start_time = datetime(2031, 4, 4, 9)
+    booking = BookingCreate(user_id=0, service_id=service_id, start_time=start_time, end_time=start_time + timedelta(hours=1))
+    _create_booking(db_session, booking)
+
+    with pytest.raises(HTTPException) as conflict:
+        _create_booking(db_session, booking)
+    assert conflict.value.status_code == 409
+    assert not locks._process_lock(service_id).locked()
+
+
+def test_partial_reschedule_checks_the_resulting_interval(client: TestClient, user_headers, admin_headers, service_id):
+    start_time = datetime(2031, 4, 2, 9)
+    first = client.post("/bookings/", json=booking_payload(service_id, start_time), headers=user_headers)
+    second = client.post("/bookings/", json=booking_payload(service_id, start_time + timedelta(hours=2)), headers=user_headers)
+    assert first.status_code == second.status_code == 200
+
+    # Only one end moves, into the other booking
+    url = f"/bookings/{second.json()['id']}"
+    moved_start = client.patch(url, json={"start_time": (start_time + timedelta(minutes=30)).isoformat()}, headers=admin_headers)
+    assert moved_start.status_code == 409
+    url = f"/bookings/{first.json()['id']}"
+    moved_end = client.patch(url, json={"end_time": (start_time + timedelta(hours=2, minutes=30)).isoformat()}, headers=admin_headers)
+    assert moved_end.status_code == 409
+
+    extended = client.patch(url, json={"end_time": (start_time + timedelta(hours=2)).isoformat()}, headers=admin_headers)
+    assert extended.status_code == 200
+
+
+def test_reactivating_a_cancelled_booking_checks_conflicts(client: TestClient, user_headers, admin_headers, service_id):
+    start_time = datetime(2031, 4, 3, 9)
+    first = client.post("/bookings/", json=booking_payload(service_id, start_time), headers=user_headers)
+    url = f"/bookings/{first.json()['id']}"
+    assert client.patch(url, json={"status": "cancelled"}, headers=admin_headers).status_code == 200
+    taken = client.post("/bookings/", json=booking_payload(service_id, start_time), headers=user_headers)
+    assert taken.status_code == 200
+
+    reactivated = client.patch(url, json={"status": "confirmed"}, headers=admin_headers)
+    assert reactivated.status_code == 409
+
+    assert client.delete(f"/bookings/{taken.json()['id']}", headers=user_headers).status_code == 200
+    assert client.patch(url, json={"status": "confirmed"}, headers=admin_headers).status_code == 200
+
+
+def test_offset_times_are_checked_as_stored(client: TestClient, user_headers, service_id):
+    # 10:00+02:00 is stored, and indexed, as 08:00 UTC
+    local = datetime(2031, 5, 1, 10, tzinfo=timezone(timedelta(hours=2)))
+    created = client.post("/bookings/", json=booking_payload(service_id, local), headers=user_headers)
+    assert created.status_code == 200
+    stored = client.get(f"/bookings/{created.json()['id']}", headers=user_headers).json()
+    assert (stored["start_time"], stored["end_time"]) == ("2031-05-01T08:00:00", "2031-05-01T09:00:00")
+
+    same_slot = client.post("/bookings/", json=booking_payload(service_id, datetime(2031, 5, 1, 8)), headers=user_headers)
+    assert same_slot.status_code == 409
+    wall_clock = client.post("/bookings/", json=booking_payload(service_id, datetime(2031, 5, 1, 10)), headers=user_headers)
+    assert wall_clock.status_code == 200
@@ -0,0 +1,38 @@
+from datetime import datetime, timedelta
+
+from booking_index import booking_index
+from conftest import TestingSessionLocal
+from models.booking import Booking, BookingStatus
+from scheduler import BookingSweeper
+
+
+def test_sweep_completes_and_expires_in_batches(client, db_session, service_id):
+    # Earlier than every other booking in the shared test database
+    now = datetime(1995, 1, 10, 12)
+    hour = timedelta(hours=1)
+    bookings = {
+        "finished": Booking(service_id=service_id, start_time=now - 3 * hour, end_time=now - 2 * hour, status=BookingStatus.confirmed),
+        "finished_too": Booking(service_id=service_id, start_time=now - 5 * hour, end_time=now - 4 * hour, status=BookingStatus.confirmed),
+        "running": Booking(service_id=service_id, start_time=now - hour, end_time=now + hour, status=BookingStatus.confirmed),
+        "stale": Booking(service_id=service_id, start_time=now - 7 * hour, end_time=now - 6 * hour, status=BookingStatus.pending),
+        "upcoming": Booking(service_id=service_id, start_time=now + 2 * hour, end_time=now + 3 * hour, status=BookingStatus.pending),
+    }
+    db_session.add_all(bookings.values())
+    db_session.commit()
+    stale = bookings["stale"]
+    assert booking_index.overlapping(db_session, service_id, stale.start_time, stale.end_time) == [stale.id]
+
+    sweeper = BookingSweeper(TestingSessionLocal, batch_size=1, pause_seconds=0)
+    completed, cancelled = sweeper.run_once(now=now)
+
+    assert (completed, cancelled) == (2, 1)
+    db_session.expire_all()
+    assert {name: booking.status for name, booking in bookings.items()} == {
+        "finished": BookingStatus.completed,
+        "finished_too": BookingStatus.completed,
+        "running": BookingStatus.confirmed,
+        "stale": BookingStatus.cancelled,
+        "upcoming": BookingStatus.pending,
+    }
+    assert booking_index.overlapping(db_session, service_id, stale.start_time, stale.end_time) == []
+    assert sweeper.stats["runs"] == 1 and sweeper.stats["completed"] == 2
@@ -0,0 +1,36 @@
+from fastapi.testclient import TestClient
+from datetime import datetime, timedelta
+
+from conftest import booking_payload
+
+
+def test_service_feed_revalidates_with_etag(client: TestClient, user_headers, service_id):
+    url = f"/services/{service_id}/calendar.ics"
+    first = client.get(url)
+    assert first.status_code == 200
+    assert first.headers["content-type"].startswith("text/calendar")
+    assert first.text.startswith("BEGIN:VCALENDAR\r\n")
+    etag = first.headers["etag"]
+
+    unchanged = client.get(url, headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.content == b""
+
+    start_time = datetime.utcnow() + timedelta(days=400)
+    payload = booking_payload(service_id, start_time)
+    booking_id = client.post("/bookings/", json=payload, headers=user_headers).json()["id"]
+
+    changed = client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert f"UID:booking-{booking_id}@bookit" in changed.text
+    assert "SUMMARY:Booked" in changed.text
+
+    mine = client.get("/users/me/calendar.ics", headers=user_headers)
+    assert mine.status_code == 200
+    assert f"UID:booking-{booking_id}@bookit" in mine.text
+    assert client.get("/users/me/calendar.ics", headers={**user_headers, "If-None-Match": mine.headers["etag"]}).status_code == 304
+
+
+def test_unknown_service_feed_is_404(client: TestClient):
+    assert client.get("/services/999999/calendar.ics").status_code == 404
@@ -0,0 +1,40 @@
+from fastapi.testclient import TestClient
+from datetime import datetime
+
+from conftest import booking_payload
+
+
+def test_service_etag_and_last_modified(client: TestClient):
+    created = client.post("/services/", json={"title": "Conditional", "description": "", "price": 0.5, "duration_minutes": 30}).json()
+    url = f"/services/{created['id']}"
+    window = {"price_min": 0.4, "price_max": 0.8}
+
+    response = client.get(url)
+    etag, modified = response.headers["ETag"], response.headers["Last-Modified"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    assert client.get(url, headers={"If-Modified-Since": modified}).status_code == 304
+
+    listing = client.get("/services/", params=window)
+    assert client.get("/services/", params=window, headers={"If-None-Match": listing.headers["ETag"]}).status_code == 304
+
+    client.patch(url, json={"price": 0.75})
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 200
+    response = client.get("/services/", params=window, headers={"If-None-Match": listing.headers["ETag"]})
+    assert response.status_code == 200
+    assert response.json()[0]["price"] == 0.75
+
+
+def test_booking_etag_changes_with_status(client: TestClient, user_headers, admin_headers, service_id):
+    start_time = datetime(2037, 5, 1, 10)
+    payload = booking_payload(service_id, start_time)
+    booking = client.post("/bookings/", json=payload, headers=user_headers).json()
+    url = f"/bookings/{booking['id']}"
+
+    etag = client.get(url, headers=user_headers).headers["ETag"]
+    assert client.get(url, headers={**user_headers, "If-None-Match": etag}).status_code == 304
+    list_etag = client.get("/bookings/", headers=user_headers).headers["ETag"]
+    assert client.get("/bookings/", headers={**user_headers, "If-None-Match": list_etag}).status_code == 304
+
+    assert client.patch(url, json={"status": "confirmed"}, headers=admin_headers).status_code == 200
+    assert client.get(url, headers={**user_headers, "If-None-Match": etag}).status_code == 200
+    assert client.get("/bookings/", headers={**user_headers, "If-None-Match": list_etag}).status_code == 200
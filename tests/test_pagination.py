@@ -0,0 +1,44 @@
+from fastapi.testclient import TestClient
+from datetime import datetime, timedelta
+
+from conftest import booking_payload
+
+
+def collect_pages(client, url, headers=None, **params):
+    ids, cursor = [], None
+    while True:
+        response = client.get(url, params={**params, "limit": 2, **({"cursor": cursor} if cursor else {})}, headers=headers)
+        assert response.status_code == 200
+        ids += [item["id"] for item in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return ids
+
+
+def test_services_cursor_pages_match_offset_listing(client: TestClient):
+    for i in range(5):
+        response = client.post("/services/", json={"title": f"Paged {i}", "description": "", "price": 500.0 + i, "duration_minutes": 30})
+        assert response.status_code == 200
+
+    full = [item["id"] for item in client.get("/services/", params={"price_min": 500, "limit": 1000}).json()]
+    assert len(full) == 5
+    assert collect_pages(client, "/services/", price_min=500) == full
+    assert [item["id"] for item in client.get("/services/", params={"price_min": 500, "skip": 3}).json()] == full[3:]
+
+
+def test_bookings_cursor_pages_in_start_order(client: TestClient, user_headers, service_id):
+    base = datetime(2034, 2, 1, 8)
+    for hours in (4, 0, 2, 6, 8):
+        start_time = base + timedelta(hours=hours)
+        payload = booking_payload(service_id, start_time)
+        assert client.post("/bookings/", json=payload, headers=user_headers).status_code == 200
+
+    listing = client.get("/bookings/", params={"limit": 1000}, headers=user_headers).json()
+    starts = [item["start_time"] for item in listing]
+    assert starts == sorted(starts)
+    assert collect_pages(client, "/bookings/", headers=user_headers) == [item["id"] for item in listing]
+
+
+def test_invalid_cursor_is_rejected(client: TestClient):
+    assert client.get("/services/", params={"cursor": "not-a-cursor"}).status_code == 400
+    assert client.get("/users/", params={"cursor": "WyJ4Il0"}).status_code == 400
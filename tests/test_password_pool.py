@@ -0,0 +1,64 @@
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from passlib.context import CryptContext
+
+import routes.auth
+import security
+from conftest import engine
+from models.user import User
+from password_pool import PasswordPool, PasswordPoolBusy
+from settings import settings
+
+
+def test_pool_sheds_work_beyond_its_queue(client: TestClient, monkeypatch):
+    pool = PasswordPool(security.pwd_context, workers=1, max_queue=0)
+    gate = threading.Event()
+    blocked = pool.submit(gate.wait)
+    with pytest.raises(PasswordPoolBusy):
+        pool.submit(gate.wait)
+
+    monkeypatch.setattr(security, "password_pool", pool)
+    response = client.post("/auth/login", data={"username": "nobody@example.com", "password": "x"})
+    assert response.status_code == 401  # unknown users never reach the pool
+    response = client.post("/auth/register", json={"name": "Shed", "email": "shed@example.com", "password": "password"})
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+
+    gate.set()
+    blocked.result()
+    assert pool.stats == {"completed": 1, "rejected": 2}
+
+
+def test_login_rehashes_outdated_cost(client: TestClient, db_session):
+    cheap = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4)
+    user = User(name="Old Hash", email="old-hash@example.com", password_hash=cheap.hash("password"))
+    db_session.add(user)
+    db_session.commit()
+
+    response = client.post("/auth/login", data={"username": user.email, "password": "password"})
+    assert response.status_code == 200
+    db_session.refresh(user)
+    assert user.password_hash.startswith(f"$2b${settings.BCRYPT_ROUNDS:02d}$")
+    assert client.post("/auth/login", data={"username": user.email, "password": "password"}).status_code == 200
+
+
+def test_no_connection_held_while_hashing(client: TestClient, monkeypatch):
+    checked_out = []
+
+    def holding_no_connection(work):
+        async def run(*args):
+            checked_out.append(engine.pool.checkedout())
+            return await work(*args)
+        return run
+
+    monkeypatch.setattr(routes.auth, "hash_password_async", holding_no_connection(security.hash_password_async))
+    monkeypatch.setattr(routes.auth, "verify_password_async", holding_no_connection(security.verify_password_async))
+
+    credentials = {"name": "Unheld", "email": "unheld@example.com", "password": "password"}
+    assert client.post("/auth/register", json=credentials).status_code == 200
+    login = client.post("/auth/login", data={"username": credentials["email"], "password": "password"})
+    assert login.status_code == 200
+    assert client.post("/users/", json={**credentials, "email": "unheld2@example.com"}).status_code == 200
+    assert checked_out == [0, 0, 0]
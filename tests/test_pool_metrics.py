@@ -0,0 +1,107 @@
+import anyio
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.pool import QueuePool
+
+from database import engine_options, threaded_session
+from pool_metrics import PoolMetrics
+from settings import settings
+
+
+@pytest.fixture
+def small_pool(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_POOL_SIZE", 1)
+    monkeypatch.setattr(settings, "DATABASE_MAX_OVERFLOW", 1)
+    monkeypatch.setattr(settings, "DATABASE_POOL_TIMEOUT", 0.05)
+    monkeypatch.setattr(settings, "DATABASE_POOL_PRE_PING", True)
+    metrics = PoolMetrics()
+    url = f"sqlite:///{tmp_path}/pool.db"
+    engine = create_engine(url, **engine_options(url, QueuePool, metrics))
+    metrics.instrument(engine)
+    yield engine, metrics
+    engine.dispose()
+
+
+def test_pool_settings_and_counters(small_pool):
+    engine, metrics = small_pool
+    assert engine.pool.size() == 1
+    first, second = engine.connect(), engine.connect()
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    snapshot = metrics.snapshot()
+    assert snapshot["checked_out"] == 2
+    assert snapshot["overflow_in_use"] == 1
+    assert snapshot["overflow_checkouts"] == 1
+    assert snapshot["timeouts"] == 1
+    # The timed-out wait lands in the 0.05-0.1s bucket
+    assert snapshot["wait_seconds"]["count"] == 3
+    assert snapshot["wait_seconds"]["buckets"]["le_0.01"] == 2
+    assert snapshot["wait_seconds"]["buckets"]["le_0.1"] == 3
+
+    second.invalidate()
+    first.close()
+    second.close()
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    snapshot = metrics.snapshot()
+    assert snapshot["invalidations"] == 1
+    assert snapshot["checkouts"] == 3
+    assert snapshot["checkins"] == 3
+    assert snapshot["peak_checked_out"] == 2
+
+    engine.dispose()
+    with engine.connect():
+        assert metrics.snapshot()["checked_out"] == 1
+
+
+def select_one(session):
+    session.execute(text("SELECT 1"))
+
+
+def test_threaded_session_holds_a_slot_only_with_a_connection(small_pool):
+    engine, metrics = small_pool
+
+    async def scenario():
+        async with threaded_session(engine) as first, threaded_session(engine) as second, threaded_session(engine) as third:
+            await first.run_sync(select_one)
+            await second.run_sync(select_one)
+            # Both slots are taken until first gives its connection back
+            await first.rollback()
+            with anyio.fail_after(5):
+                await third.run_sync(select_one)
+
+    anyio.run(scenario)
+    assert metrics.snapshot()["timeouts"] == 0
+
+
+def test_threaded_session_slot_wait_times_out_like_the_pool(small_pool):
+    engine, metrics = small_pool
+
+    async def scenario():
+        sessions = [threaded_session(engine, metrics) for _ in range(3)]
+        async with sessions[0] as first, sessions[1] as second, sessions[2] as third:
+            await first.run_sync(select_one)
+            await second.run_sync(select_one)
+            with pytest.raises(exc.TimeoutError):
+                await third.run_sync(select_one)
+
+    anyio.run(scenario)
+    snapshot = metrics.snapshot()
+    assert snapshot["slot_timeouts"] == 1
+    assert snapshot["timeouts"] == 0
+    # Two immediate slots, then the timed-out wait in the 0.05-0.1s bucket
+    assert snapshot["slot_wait_seconds"]["count"] == 3
+    assert snapshot["slot_wait_seconds"]["buckets"]["le_0.01"] == 2
+    assert snapshot["slot_wait_seconds"]["buckets"]["le_0.1"] == 3
+
+
+def test_metrics_endpoint_is_admin_only(client: TestClient, user_headers, admin_headers):
+    assert client.get("/admin/metrics").status_code == 401
+    assert client.get("/admin/metrics", headers=user_headers).status_code == 403
+    response = client.get("/admin/metrics", headers=admin_headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert set(body["database_pool"]["wait_seconds"]) == {"count", "total", "max", "buckets"}
+    assert set(body["database_pool"]["slot_wait_seconds"]) == {"count", "total", "max", "buckets"}
+    assert "hits" in body["service_cache"]
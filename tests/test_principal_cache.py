@@ -0,0 +1,39 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from conftest import _register_and_login, engine
+from models.user import Role, User
+from security import decode_token
+
+
+def users_table_selects(client, url, headers) -> int:
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "FROM users" in statement:
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        assert client.get(url, headers=headers).status_code == 200
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    return len(statements)
+
+
+def test_warm_requests_skip_the_users_table(client: TestClient, db_session):
+    headers = _register_and_login(client)
+    claims = decode_token(headers["Authorization"].removeprefix("Bearer "))
+    assert isinstance(claims["uid"], int)
+
+    users_table_selects(client, "/bookings/", headers)
+    assert users_table_selects(client, "/bookings/", headers) == 0
+
+    user = db_session.get(User, claims["uid"])
+    user.role = Role.admin
+    db_session.commit()
+    assert client.get("/auth/users/me", headers=headers).json()["role"] == "admin"
+
+    db_session.delete(user)
+    db_session.commit()
+    assert client.get("/bookings/", headers=headers).status_code == 401
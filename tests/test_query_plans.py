@@ -0,0 +1,90 @@
+"""Fail when a hot CRUD query stops using an index.
+
+Each query is run against the SQLite test database while its SQL is captured,
+then replayed through ``EXPLAIN QUERY PLAN``; any ``SCAN <table>`` step means a
+full table (or full index) scan. Virtual tables report every lookup as a
+``SCAN``; an FTS5 step driven by a MATCH constraint (``INDEX 0:M...``) uses
+the full-text index and is allowed.
+"""
+import re
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from availability import availability_cache
+from booking_index import booking_index
+from conftest import engine
+from crud.crud_booking import booking_service
+from crud.crud_review import review_service
+from crud.crud_service import service_service
+from crud.crud_user import user_service
+from pagination import encode_cursor
+from models.booking import Booking
+
+START = datetime(2030, 1, 1, 9)
+END = START + timedelta(hours=1)
+FTS_MATCH = re.compile(r"VIRTUAL TABLE INDEX \d+:M")
+BOOKING_CURSOR = encode_cursor(Booking(start_time=START, id=1), booking_service.order_by)
+
+
+def warm_booking_index(db):
+    booking_index.invalidate(1)
+    booking_index.overlapping(db, 1, START, END)
+
+
+def load_availability(db):
+    availability_cache.invalidate(1)
+    availability_cache.occupancy(db, 1, date(2030, 1, 1), date(2030, 1, 7))
+
+
+HOT_QUERIES = {
+    "get_user_by_email": lambda db: user_service.get_user_by_email(db, email="someone@example.com"),
+    "get_service": lambda db: service_service.get_service(db, service_id=1),
+    "get_booking": lambda db: booking_service.get_booking(db, booking_id=1),
+    "get_bookings": lambda db: booking_service.get_bookings(db, user_id=1),
+    "get_booking_version": lambda db: booking_service.get_booking_version(db, booking_id=1),
+    "get_bookings_versions": lambda db: booking_service.get_bookings(db, user_id=1, versions_only=True),
+    "get_bookings_after_cursor": lambda db: booking_service.get_bookings(db, user_id=1, cursor=BOOKING_CURSOR),
+    "get_all_bookings_after_cursor": lambda db: booking_service.get_all_bookings(db, cursor=BOOKING_CURSOR),
+    "admin_status_and_day": lambda db: booking_service.get_all_bookings(db, status="confirmed", from_date=START, to_date=END),
+    "admin_service_window": lambda db: booking_service.get_all_bookings(db, service_id=1, from_date=START, to_date=END),
+    "admin_user": lambda db: booking_service.get_all_bookings(db, user_id=1, cursor=BOOKING_CURSOR),
+    "admin_date_window": lambda db: booking_service.get_all_bookings(db, from_date=START, to_date=END),
+    "get_conflicting_bookings": lambda db: booking_service.get_conflicting_bookings(db, START, END, service_id=1),
+    "booking_index_warm_up": warm_booking_index,
+    "availability_load": load_availability,
+    "service_fulltext_search": lambda db: service_service.get_services(db, q="massage oil", search="fulltext", active=True),
+    "services_by_rating": lambda db: service_service.get_services(db, min_rating=4, sort="rating"),
+    "get_review": lambda db: review_service.get_review(db, review_id=1),
+    "get_reviews_by_service": lambda db: review_service.get_reviews_by_service(db, service_id=1),
+    "get_reviews_by_service_expanded": lambda db: review_service.get_reviews_by_service(db, service_id=1, sort="rating", expand=True),
+}
+
+
+@contextmanager
+def captured_selects():
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+
+@pytest.mark.parametrize("name", HOT_QUERIES)
+def test_hot_query_uses_index(db_session, name):
+    with captured_selects() as statements:
+        HOT_QUERIES[name](db_session)
+    assert statements, f"{name} issued no SELECT"
+
+    for statement, parameters in statements:
+        plan = db_session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+        scans = [row[-1] for row in plan if row[-1].startswith("SCAN ") and not FTS_MATCH.search(row[-1])]
+        assert not scans, f"{name} does a full scan: {scans}\n{statement}"
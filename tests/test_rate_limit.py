@@ -0,0 +1,64 @@
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
+
+from main import app
+from rate_limit import MemoryBackend, auth_ip_limiter, auth_username_limiter
+from settings import Settings, settings
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_buckets_refill_and_idle_ones_are_swept():
+    clock = FakeClock()
+    backend = MemoryBackend(sweep_seconds=10, clock=clock)
+    assert [backend.acquire("a", rate=1, burst=2) for _ in range(3)] == [0, 0, 1.0]
+    clock.now = 0.5
+    assert backend.acquire("a", rate=1, burst=2) == 0.5
+    clock.now = 1.0
+    assert backend.acquire("a", rate=1, burst=2) == 0
+    backend.acquire("b", rate=1, burst=2)
+    clock.now = 11.5
+    backend.acquire("c", rate=1, burst=2)
+    assert len(backend) == 1
+
+
+def test_rate_limits_must_be_positive():
+    with pytest.raises(ValidationError):
+        Settings(AUTH_IP_RATE_PER_MINUTE=0)
+    with pytest.raises(ValidationError):
+        Settings(AUTH_USERNAME_BURST=0)
+
+
+def test_login_attempts_per_username_get_429(client: TestClient, monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_RATE_LIMIT_ENABLED", True)
+    rejected = auth_username_limiter.stats["rejected"]
+    credentials = {"username": "Stuffed@Example.com", "password": "wrong"}
+    statuses = [client.post("/auth/login", data=credentials).status_code for _ in range(settings.AUTH_USERNAME_BURST + 1)]
+    assert statuses == [401] * settings.AUTH_USERNAME_BURST + [429]
+    response = client.post("/auth/login", data={**credentials, "username": "stuffed@example.com "})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert auth_username_limiter.stats["rejected"] == rejected + 2
+
+
+def test_ip_limit_keys_on_forwarded_client_behind_proxy(client: TestClient, monkeypatch):
+    # What `uvicorn --proxy-headers --forwarded-allow-ips='*'` (README) installs
+    proxied = TestClient(ProxyHeadersMiddleware(app, trusted_hosts="*"))
+    monkeypatch.setattr(settings, "AUTH_RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(auth_ip_limiter, "burst", 1)
+
+    def login(client_ip, username):
+        credentials = {"username": username, "password": "wrong"}
+        return proxied.post("/auth/login", data=credentials, headers={"X-Forwarded-For": client_ip}).status_code
+
+    assert login("203.0.113.1", "proxied-a@example.com") == 401
+    assert login("203.0.113.1", "proxied-b@example.com") == 429
+    assert login("203.0.113.2", "proxied-c@example.com") == 401
@@ -0,0 +1,157 @@
+import asyncio
+import time
+from datetime import datetime
+
+import pytest
+from fastapi import Request
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+import replicas
+from conftest import booking_payload, engine
+from database import Base
+from main import app
+from models.service import Service
+from models.user import User
+from pool_metrics import PoolMetrics
+from replicas import ReadRouter, Replica, WriteLog, get_read_db
+
+REPLICA_ONLY_USER_ID = 900001
+
+
+def _replica(url: str) -> Replica:
+    return Replica(create_engine(url, connect_args={"check_same_thread": False}), PoolMetrics())
+
+
+@pytest.fixture
+def read_router(monkeypatch):
+    """Route reads through a ReadRouter for one test; the primary is the test database."""
+    monkeypatch.delitem(app.dependency_overrides, get_read_db)
+
+    def install(*replica_list: Replica) -> ReadRouter:
+        router = ReadRouter(list(replica_list), retry_seconds=60, write_log=WriteLog(window_seconds=60))
+        monkeypatch.setattr(replicas, "read_router", router)
+        return router
+
+    return install
+
+
+@pytest.fixture
+def replica(tmp_path):
+    """A replica holding a user the primary does not have."""
+    replica = _replica(f"sqlite:///{tmp_path}/replica.db")
+    Base.metadata.create_all(bind=replica.engine)
+    with Session(replica.engine) as session:
+        session.add(User(id=REPLICA_ONLY_USER_ID, name="Replica", email="replica@example.com"))
+        session.commit()
+    yield replica
+    replica.engine.dispose()
+
+
+def test_reads_go_to_replica_until_client_writes(client: TestClient, user_headers, admin_headers, service_id, replica, read_router):
+    router = read_router(replica)
+
+    response = client.get(f"/users/{REPLICA_ONLY_USER_ID}", headers=user_headers)
+    assert response.status_code == 200
+    assert response.json()["name"] == "Replica"
+    assert replica.stats["reads"] == 1
+
+    start_time = datetime(2038, 3, 1, 9)
+    booking = client.post(
+        "/bookings/",
+        json=booking_payload(service_id, start_time),
+        headers=user_headers,
+    )
+    assert booking.status_code == 200
+
+    # The writer reads its own booking from the primary...
+    assert client.get(f"/users/{REPLICA_ONLY_USER_ID}", headers=user_headers).status_code == 404
+    assert client.get(f"/bookings/{booking.json()['id']}", headers=user_headers).status_code == 200
+    assert router.stats["pinned_reads"] == 2
+    # ...while other clients keep reading from the replica.
+    assert client.get(f"/users/{REPLICA_ONLY_USER_ID}", headers=admin_headers).status_code == 200
+    assert replica.stats["reads"] == 2
+    assert router.stats["primary_reads"] == 2
+
+
+def test_replica_reads_take_no_primary_connection(client: TestClient, user_headers, replica, read_router):
+    read_router(replica)
+    # Cache the principal, so authentication needs no primary query either
+    assert client.get("/auth/users/me", headers=user_headers).status_code == 200
+    checkouts = []
+
+    def count(*args):
+        checkouts.append(args)
+
+    event.listen(engine, "checkout", count)
+    try:
+        response = client.get(f"/users/{REPLICA_ONLY_USER_ID}", headers=user_headers)
+    finally:
+        event.remove(engine, "checkout", count)
+    assert response.status_code == 200
+    assert replica.stats["reads"] == 1
+    assert checkouts == []
+
+
+def test_lagging_replica_reads_are_not_cached(client: TestClient, user_headers, admin_headers, replica, read_router):
+    read_router(replica)
+    created = client.post("/services/", json={"title": "Before", "description": "", "price": 1.0, "duration_minutes": 60})
+    service_id = created.json()["id"]
+    with Session(replica.engine) as session:
+        session.add(Service(id=service_id, title="Before", description="", price=1.0, duration_minutes=60))
+        session.commit()
+
+    assert client.patch(f"/services/{service_id}", json={"title": "After"}, headers=user_headers).status_code == 200
+
+    # Another client reads the replica, which has not caught up yet...
+    assert client.get(f"/services/{service_id}", headers=admin_headers).json()["title"] == "Before"
+    # ...and the writer, pinned to the primary, still sees its own write
+    assert client.get(f"/services/{service_id}", headers=user_headers).json()["title"] == "After"
+
+
+def test_primary_reads_share_the_request_session():
+    primary = object()
+    sessions = get_read_db(Request({"type": "http", "headers": []}), primary)
+
+    assert asyncio.run(anext(sessions)) is primary
+
+
+def test_unhealthy_replica_falls_back_to_primary(client: TestClient, user_headers, read_router, tmp_path):
+    dead = _replica(f"sqlite:///{tmp_path}/missing/replica.db")
+    router = read_router(dead)
+
+    for _ in range(2):
+        response = client.get("/users/", headers=user_headers)
+        assert response.status_code == 200
+        assert response.json()
+
+    # Marked down by the first read, skipped by the second
+    assert dead.stats == {"reads": 0, "failures": 1}
+    assert router.stats["fallbacks"] == 2
+    assert router.snapshot()["replicas"][dead.name]["healthy"] is False
+
+
+def test_candidates_round_robin_over_healthy_replicas(tmp_path):
+    first, second, third = (_replica(f"sqlite:///{tmp_path}/{name}.db") for name in ("first", "second", "third"))
+    router = ReadRouter([first, second, third], retry_seconds=60)
+
+    assert router.candidates() == [first, second, third]
+    assert router.candidates() == [second, third, first]
+    router.mark_down(third)
+    assert router.candidates() == [first, second]
+    assert router.candidates() == [first, second]
+
+
+def test_write_log_forgets_after_window():
+    write_log = WriteLog(window_seconds=0.01)
+    write_log.mark(b"client")
+    assert write_log.is_recent(b"client")
+    time.sleep(0.02)
+    assert not write_log.is_recent(b"client")
+
+    write_log = WriteLog(window_seconds=60, max_entries=1)
+    write_log.mark(b"first")
+    write_log.mark(b"second")
+    assert not write_log.is_recent(b"first")
+    assert write_log.is_recent(b"second")
@@ -0,0 +1,56 @@
+from fastapi.testclient import TestClient
+from datetime import datetime, timedelta
+from sqlalchemy import event
+
+from conftest import booking_payload, engine
+from models.booking import Booking, BookingStatus
+
+
+def collect_pages(client, url, **params):
+    reviews, cursor = [], None
+    while True:
+        response = client.get(url, params={**params, "limit": 2, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        reviews += response.json()
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return reviews
+
+
+def test_reviews_page_by_rating_and_recency(client: TestClient, user_headers, db_session):
+    service_id = client.post("/services/", json={"title": "Reviewed", "description": "", "price": 10.0, "duration_minutes": 60}).json()["id"]
+    booking_ids = []
+    for i in range(5):
+        start_time = datetime(2039, 4, 1, 9) + timedelta(hours=2 * i)
+        payload = booking_payload(service_id, start_time)
+        booking_ids.append(client.post("/bookings/", json=payload, headers=user_headers).json()["id"])
+    db_session.query(Booking).filter(Booking.id.in_(booking_ids)).update({Booking.status: BookingStatus.completed})
+    db_session.commit()
+    ratings = [3, 5, 1, 5, 4]
+    for booking_id, rating in zip(booking_ids, ratings):
+        client.post("/reviews/reviews", json={"booking_id": booking_id, "rating": rating, "comment": ""}, headers=user_headers)
+
+    url = f"/reviews/services/{service_id}/reviews"
+    oldest_first = collect_pages(client, url)
+    assert [review["booking_id"] for review in oldest_first] == booking_ids
+    assert collect_pages(client, url, sort="recent") == oldest_first[::-1]
+    by_rating = collect_pages(client, url, sort="rating")
+    assert [review["rating"] for review in by_rating] == sorted(ratings, reverse=True)
+    assert by_rating[0]["booking_id"] == booking_ids[3]
+
+    selects = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            selects.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        expanded = client.get(url, params={"expand": True, "limit": 5}).json()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    assert len(selects) == 1
+    assert expanded[0]["reviewer_name"] == "Test User"
+    assert expanded[0]["booking_date"] == "2039-04-01T09:00:00"
+    assert "reviewer_name" not in oldest_first[0]
+    assert client.get(url, params={"limit": 101}).status_code == 422
@@ -0,0 +1,38 @@
+from fastapi.testclient import TestClient
+
+from service_cache import ServiceCache, service_cache
+
+
+def test_service_reads_are_cached_until_a_write_commits(client: TestClient):
+    created = client.post("/services/", json={"title": "Cached", "description": "", "price": 1500.0, "duration_minutes": 30}).json()
+    params = {"price_min": 1500}
+
+    before = service_cache.snapshot()
+    first = client.get("/services/", params=params)
+    second = client.get("/services/", params=params)
+    assert first.content == second.content
+    assert [item["id"] for item in second.json()] == [created["id"]]
+    assert client.get(f"/services/{created['id']}").json() == client.get(f"/services/{created['id']}").json()
+    after = service_cache.snapshot()
+    assert after["hits"] - before["hits"] == 2
+    assert after["misses"] - before["misses"] == 2
+
+    client.patch(f"/services/{created['id']}", json={"title": "Renamed"})
+    assert client.get(f"/services/{created['id']}").json()["title"] == "Renamed"
+    assert client.get("/services/", params=params).json()[0]["title"] == "Renamed"
+    assert client.get("/services/999999").status_code == 404
+
+
+def test_lru_eviction_and_render_racing_a_write():
+    cache = ServiceCache(ttl_seconds=60, max_entries=2)
+    for key in "abc":
+        cache.get_or_render(key, lambda: (key,))
+    assert len(cache) == 2
+    assert cache.stats["evictions"] == 1
+
+    def render_during_write():
+        cache.invalidate()
+        return ("stale",)
+
+    assert cache.get_or_render("d", render_during_write) == ("stale",)
+    assert cache.get_or_render("d", lambda: ("fresh",)) == ("fresh",)
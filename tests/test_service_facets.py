@@ -0,0 +1,40 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from conftest import engine
+
+
+def test_facets_come_with_the_page_from_one_aggregate_query(client: TestClient):
+    for price, active in ((10.0, True), (30.0, True), (30.0, False), (120.0, True), (600.0, True)):
+        service = {"title": "Facetable", "description": "", "price": price, "duration_minutes": 30, "is_active": active}
+        assert client.post("/services/", json=service).status_code == 200
+
+    selects = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            selects.append(statement)
+
+    params = {"q": "Facetable", "active": True, "price_max": 100, "facets": True, "price_edges": [0, 50, 500]}
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        response = client.get("/services/", params=params)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    assert response.status_code == 200
+    assert len(selects) == 2
+
+    page = response.json()
+    assert [item["price"] for item in page["items"]] == [10.0, 30.0]
+    assert page["facets"] == {
+        "total": 2,
+        "active": 2,
+        "inactive": 1,
+        "price_histogram": [
+            {"min": 0, "max": 50, "count": 2},
+            {"min": 50, "max": 500, "count": 1},
+            {"min": 500, "max": None, "count": 1},
+        ],
+    }
+    assert client.get("/services/", params=params, headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+    assert client.get("/services/", params={**params, "price_edges": [50, 0]}).status_code == 400
@@ -0,0 +1,41 @@
+from fastapi.testclient import TestClient
+from datetime import datetime, timedelta
+
+from conftest import booking_payload
+from models.booking import Booking, BookingStatus
+
+
+def completed_bookings(client, headers, db_session, service_id, count):
+    ids = []
+    for i in range(count):
+        start_time = datetime(2038, 1, 1, 9) + timedelta(hours=2 * i)
+        payload = booking_payload(service_id, start_time)
+        ids.append(client.post("/bookings/", json=payload, headers=headers).json()["id"])
+    db_session.query(Booking).filter(Booking.id.in_(ids)).update({Booking.status: BookingStatus.completed})
+    db_session.commit()
+    return ids
+
+
+def test_rating_aggregates_follow_review_changes(client: TestClient, user_headers, admin_headers, db_session):
+    new_service = {"description": "", "price": 0.01, "duration_minutes": 60}
+    rated, unrated = (client.post("/services/", json={**new_service, "title": title}).json()["id"] for title in ("Rated", "Unrated"))
+    bookings = completed_bookings(client, user_headers, db_session, rated, 3)
+
+    review_ids = []
+    for booking_id, rating in zip(bookings, (5, 3, 1)):
+        response = client.post("/reviews/reviews", json={"booking_id": booking_id, "rating": rating, "comment": ""}, headers=user_headers)
+        assert response.status_code == 200
+        review_ids.append(response.json()["id"])
+    service = client.get(f"/services/{rated}").json()
+    assert (service["rating_count"], service["rating_average"]) == (3, 3.0)
+
+    client.patch(f"/reviews/reviews/{review_ids[1]}", json={"rating": 4, "comment": "better"}, headers=user_headers)
+    assert client.delete(f"/reviews/reviews/{review_ids[2]}", headers=admin_headers).status_code == 200
+    service = client.get(f"/services/{rated}").json()
+    assert (service["rating_count"], service["rating_average"]) == (2, 4.5)
+    assert client.get(f"/services/{unrated}").json()["rating_average"] is None
+
+    window = {"price_max": 0.01}
+    assert [item["id"] for item in client.get("/services/", params={**window, "sort": "rating"}).json()] == [rated, unrated]
+    assert [item["id"] for item in client.get("/services/", params={**window, "min_rating": 4.5}).json()] == [rated]
+    assert client.get("/services/", params={**window, "min_rating": 4.6}).json() == []
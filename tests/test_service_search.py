@@ -0,0 +1,30 @@
+from fastapi.testclient import TestClient
+
+
+def test_fulltext_search_ranks_prefix_matches(client: TestClient):
+    services = [
+        {"title": "Deep tissue massage", "description": "Massage for sore shoulders", "price": 900.0, "duration_minutes": 60},
+        {"title": "Haircut", "description": "Includes a quick scalp massage", "price": 910.0, "duration_minutes": 30},
+        {"title": "Massage chair rental", "description": "", "price": 50.0, "duration_minutes": 60},
+        {"title": "Manicure", "description": "Hands only", "price": 920.0, "duration_minutes": 45},
+    ]
+    ids = [client.post("/services/", json=service).json()["id"] for service in services]
+    params = {"search": "fulltext", "price_min": 800}
+
+    response = client.get("/services/", params={**params, "q": "MASSA"})
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()] == ids[:2]
+    assert "X-Next-Cursor" not in response.headers
+
+    response = client.get("/services/", params={**params, "q": "scalp mass"})
+    assert [item["id"] for item in response.json()] == [ids[1]]
+
+    client.patch(f"/services/{ids[3]}", json={"description": "Hands and a short massage"})
+    response = client.get("/services/", params={**params, "q": "massage hands"})
+    assert [item["id"] for item in response.json()] == [ids[3]]
+
+    client.delete(f"/services/{ids[0]}")
+    response = client.get("/services/", params={**params, "q": "massage", "limit": 1, "skip": 1})
+    assert [item["id"] for item in response.json()] == [ids[3]]
+
+    assert client.get("/services/", params={**params, "q": "massage", "cursor": "x"}).status_code == 400
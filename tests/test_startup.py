@@ -0,0 +1,31 @@
+from sqlalchemy import create_engine
+
+import models  # noqa: F401 - registers the tables on Base.metadata
+from benchmarks.bench_startup import measure
+from database import Base
+
+# Generous, so only a real regression (e.g. DDL or heavy work at import) trips them
+IMPORT_BUDGET_SECONDS = 5.0
+FIRST_REQUEST_BUDGET_SECONDS = 2.0
+
+
+def test_startup_touches_no_database(tmp_path):
+    database = tmp_path / "never-created.db"
+
+    result = measure(f"sqlite:///{database}", path="/")
+
+    assert result["status"] == 200
+    assert not database.exists()
+
+
+def test_startup_within_budget(tmp_path):
+    database_url = f"sqlite:///{tmp_path}/startup.db"
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+
+    result = measure(database_url)
+
+    assert result["status"] == 200
+    assert result["import_seconds"] < IMPORT_BUDGET_SECONDS
+    assert result["first_request_seconds"] < FIRST_REQUEST_BUDGET_SECONDS
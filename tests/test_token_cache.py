@@ -0,0 +1,30 @@
+import time
+
+from fastapi.testclient import TestClient
+
+from conftest import _register_and_login
+from security import decode_token, token_cache
+from token_cache import TokenCache
+
+
+def test_cached_claims_expire_with_the_token():
+    cache = TokenCache(max_entries=2)
+    cache.put("live", {"sub": "a", "exp": time.time() + 60})
+    cache.put("stale", {"sub": "b", "exp": time.time() - 1})
+    cache.put("no-exp", {"sub": "c"})
+    assert cache.get("live")["sub"] == "a"
+    assert cache.get("stale") is None
+    assert cache.get("no-exp") is None
+
+
+def test_logout_revokes_the_token(client: TestClient):
+    headers = _register_and_login(client)
+    token = headers["Authorization"].removeprefix("Bearer ")
+    assert client.get("/auth/users/me", headers=headers).status_code == 200
+    hits = token_cache.stats["hits"]
+    assert decode_token(token) is decode_token(token)
+    assert token_cache.stats["hits"] == hits + 2
+
+    assert client.post("/auth/logout", headers=headers).status_code == 204
+    assert decode_token(token) is None
+    assert client.get("/auth/users/me", headers=headers).status_code == 401
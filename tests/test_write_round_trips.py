@@ -0,0 +1,128 @@
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from conftest import _register_and_login, booking_payload, engine
+from models.booking import Booking, BookingStatus
+
+
+def round_trips(send) -> tuple[object, list[str]]:
+    """The response of ``send()`` and the verb of every statement it ran, in order."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split(None, 1)[0])
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        response = send()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    return response, statements
+
+
+def test_write_endpoints_round_trips(client: TestClient, user_headers, admin_headers, db_session):
+    # Cache both principals, so authentication costs no statement below
+    for headers in (user_headers, admin_headers):
+        assert client.get("/auth/users/me", headers=headers).status_code == 200
+
+    # Email check, INSERT
+    response, statements = round_trips(
+        lambda: client.post("/auth/register", json={"name": "Trips", "email": "trips@example.com", "password": "password"})
+    )
+    assert response.status_code == 200
+    assert statements == ["SELECT", "INSERT"]
+    user_id = response.json()["id"]
+
+    response, statements = round_trips(
+        lambda: client.post("/users/", json={"name": "Trips", "email": "trips2@example.com", "password": "password"})
+    )
+    assert response.status_code == 200
+    assert statements == ["SELECT", "INSERT"]
+
+    # UPDATE ... RETURNING, no prior load
+    response, statements = round_trips(lambda: client.put(f"/users/{user_id}", json={"name": "Renamed"}))
+    assert response.status_code == 200
+    assert response.json()["name"] == "Renamed"
+    assert statements == ["UPDATE"]
+
+    # INSERT, then the SQLite full-text entry
+    response, statements = round_trips(
+        lambda: client.post("/services/", json={"title": "Trips", "description": "", "price": 3.0, "duration_minutes": 60})
+    )
+    assert response.status_code == 200
+    assert statements == ["INSERT", "DELETE", "INSERT"]
+    service_id = response.json()["id"]
+
+    response, statements = round_trips(lambda: client.patch(f"/services/{service_id}", json={"title": "Round trips"}))
+    assert response.status_code == 200
+    assert response.json()["title"] == "Round trips"
+    assert statements == ["UPDATE", "DELETE", "INSERT"]
+
+    # Conflict check, INSERT
+    start_time = datetime(2039, 2, 1, 9)
+    payload = booking_payload(service_id, start_time)
+    response, statements = round_trips(lambda: client.post("/bookings/", json=payload, headers=user_headers))
+    assert response.status_code == 200
+    assert statements == ["SELECT", "INSERT"]
+    booking_id = response.json()["id"]
+
+    # Load to authorise, UPDATE
+    response, statements = round_trips(
+        lambda: client.patch(f"/bookings/{booking_id}", json={"status": "confirmed"}, headers=admin_headers)
+    )
+    assert response.status_code == 200
+    assert statements == ["SELECT", "UPDATE"]
+
+    db_session.query(Booking).filter(Booking.id == booking_id).update({Booking.status: BookingStatus.completed})
+    db_session.commit()
+
+    # Booking, existing review, INSERT, rating aggregates
+    response, statements = round_trips(
+        lambda: client.post("/reviews/reviews", json={"booking_id": booking_id, "rating": 4, "comment": ""}, headers=user_headers)
+    )
+    assert response.status_code == 200
+    assert statements == ["SELECT", "SELECT", "INSERT", "UPDATE"]
+    review_id = response.json()["id"]
+
+    # Review and its booking to authorise, UPDATE, rating aggregates
+    response, statements = round_trips(
+        lambda: client.patch(f"/reviews/reviews/{review_id}", json={"rating": 5, "comment": "Great"}, headers=user_headers)
+    )
+    assert response.status_code == 200
+    assert response.json()["rating"] == 5
+    assert statements == ["SELECT", "SELECT", "UPDATE", "UPDATE"]
+
+
+def test_created_booking_echoes_the_stored_row(client: TestClient, user_headers, service_id):
+    assert client.get("/auth/users/me", headers=user_headers).status_code == 200
+    local = datetime(2039, 3, 1, 11, tzinfo=timezone(timedelta(hours=2)))
+
+    response, statements = round_trips(
+        lambda: client.post("/bookings/", json=booking_payload(service_id, local), headers=user_headers)
+    )
+    assert response.status_code == 200
+    assert statements == ["SELECT", "INSERT"]
+    assert response.json()["start_time"] == "2039-03-01T09:00:00"
+    stored = client.get(f"/bookings/{response.json()['id']}", headers=user_headers)
+    assert stored.json() == response.json()
+
+
+def test_update_by_primary_key_of_missing_row(client: TestClient):
+    response, statements = round_trips(lambda: client.put("/users/999999", json={"name": "Nobody"}))
+    assert response.status_code == 404
+    assert statements == ["UPDATE"]
+
+    response, statements = round_trips(lambda: client.patch("/services/999999", json={"title": "Nothing"}))
+    assert response.status_code == 404
+    assert statements == ["UPDATE"]
+
+
+def test_user_update_refreshes_cached_principal(client: TestClient):
+    headers = _register_and_login(client)
+    me = client.get("/auth/users/me", headers=headers).json()
+
+    assert client.put(f"/users/{me['id']}", json={"name": "Changed"}).status_code == 200
+
+    assert client.get("/auth/users/me", headers=headers).json()["name"] == "Changed"
@@ -0,0 +1,8 @@
+from datetime import datetime, timezone
+
+
+def to_naive_utc(value: datetime) -> datetime:
+    """``value`` as the naive UTC datetime bookings are stored as."""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
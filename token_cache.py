@@ -0,0 +1,63 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+def _digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+
+class TokenCache:
+    """Claims of verified JWTs by token digest, so a session's token is
+    verified once rather than on every request.
+
+    Entries expire with the token's ``exp``. Revoked tokens are remembered
+    (also until ``exp``) so they are refused even after falling out of the
+    cache. Both are per worker.
+    """
+
+    def __init__(self, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self.stats = {"hits": 0, "misses": 0}
+        self._claims: OrderedDict[bytes, tuple[float, dict]] = OrderedDict()
+        self._revoked: dict[bytes, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> dict | None:
+        key = _digest(token)
+        with self._lock:
+            entry = self._claims.get(key)
+            if entry is not None:
+                if entry[0] > time.time():
+                    self._claims.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return entry[1]
+                del self._claims[key]
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, token: str, claims: dict):
+        expires_at = claims.get("exp")
+        if not isinstance(expires_at, (int, float)):
+            return
+        key = _digest(token)
+        with self._lock:
+            if key in self._revoked:
+                return
+            self._claims[key] = (expires_at, claims)
+            self._claims.move_to_end(key)
+            while len(self._claims) > self.max_entries:
+                self._claims.popitem(last=False)
+
+    def is_revoked(self, token: str) -> bool:
+        with self._lock:
+            return _digest(token) in self._revoked
+
+    def revoke(self, token: str, expires_at: float):
+        now = time.time()
+        key = _digest(token)
+        with self._lock:
+            self._claims.pop(key, None)
+            self._revoked = {k: exp for k, exp in self._revoked.items() if exp > now}
+            self._revoked[key] = expires_at